@@ -8,14 +8,25 @@
     python async_trainer.py --list       # Показать все вопросы
     python async_trainer.py --topic "Основы async/await"  # Вопрос из темы
     python async_trainer.py --type theory  # Только теоретические вопросы
+    python async_trainer.py --rebuild-cache  # Пересобрать бинарный кэш вопросов
+    python async_trainer.py --stream --list  # Потоковое чтение огромного файла
+    python async_trainer.py --serve          # Сервер с вопросами в памяти
+    python async_trainer.py --connect -a 1   # Запрос к серверу (если он запущен)
+    python async_trainer.py --next           # Следующая карточка по интервальным повторениям
+    python async_trainer.py --review 1 4     # Оценка 0..5 для ID=1 после повторения
 """
 
 import json
 import random
 import argparse
+import getpass
 import sys
 from pathlib import Path
 
+from bank_cache import open_bank
+from json_stream import iter_records, reservoir_sample, find_record
+from srs import Scheduler
+
 
 def load_questions(file_path='async_questions.json'):
     """Загрузить вопросы из JSON файла."""
@@ -31,6 +42,18 @@ def load_questions(file_path='async_questions.json'):
         sys.exit(1)
 
 
+def stream_questions(file_path='async_questions.json'):
+    """Отдавать вопросы из JSON файла по одной, не загружая файл целиком."""
+    try:
+        yield from iter_records(file_path, 'questions')
+    except FileNotFoundError:
+        print(f"Ошибка: файл {file_path} не найден!")
+        sys.exit(1)
+    except json.JSONDecodeError:
+        print(f"Ошибка: неверный формат JSON в файле {file_path}!")
+        sys.exit(1)
+
+
 def print_question(question):
     """Красиво вывести вопрос/упражнение."""
     print("=" * 80)
@@ -80,6 +103,60 @@ def print_answer(question):
     print("=" * 80)
 
 
+class QuestionStore:
+    """
+    Индексированное хранилище вопросов для серверного режима.
+
+    Индексы по ID, теме, типу и паре (тема, тип) строятся один раз,
+    поиск по ID и случайный выбор с фильтрами — O(1).
+    """
+
+    def __init__(self, questions):
+        self.questions = list(questions)
+        self.ids = [record['id'] for record in self.questions]
+        self.by_id = {}
+        self.by_topic = {}
+        self.by_type = {}
+        self.by_topic_type = {}
+
+        for question in self.questions:
+            self.by_id[question['id']] = question
+            self.by_topic.setdefault(question['topic'], []).append(question)
+            self.by_type.setdefault(question['type'], []).append(question)
+            key = (question['topic'], question['type'])
+            self.by_topic_type.setdefault(key, []).append(question)
+
+    def __len__(self):
+        return len(self.questions)
+
+    def records(self):
+        """Все вопросы в порядке файла."""
+        return self.questions
+
+    def get(self, question_id):
+        """Получить вопрос по ID или None."""
+        return self.by_id.get(question_id)
+
+    def values(self, field):
+        """Отсортированный список значений поля ('topic' или 'type')."""
+        index = {'topic': self.by_topic, 'type': self.by_type}[field]
+        return sorted(index)
+
+    def random(self, topic=None, type=None):
+        """Случайный вопрос из комбинации фильтров или None, если подходящих нет."""
+        if topic and type:
+            candidates = self.by_topic_type.get((topic, type), [])
+        elif topic:
+            candidates = self.by_topic.get(topic, [])
+        elif type:
+            candidates = self.by_type.get(type, [])
+        else:
+            candidates = self.questions
+        if not candidates:
+            return None
+        return random.choice(candidates)
+
+
 def get_random_question(questions, filter_type=None, filter_topic=None):
     """Получить случайный вопрос с опциональными фильтрами."""
     filtered = questions
@@ -110,20 +187,23 @@ def get_question_by_id(questions, question_id):
 
 
 def list_all_questions(questions):
-    """Вывести список всех вопросов."""
-    print("=" * 80)
-    print("СПИСОК ВСЕХ ВОПРОСОВ И УПРАЖНЕНИЙ")
-    print("=" * 80)
-    
-    # Группировка по типам и темам
+    """
+    Вывести список всех вопросов.
+    Принимает список или любой iterable вопросов (в т.ч. stream_questions):
+    за один проход запоминаются только ID и названия.
+    """
+    # Группировка по типам и темам + статистика по типам за один проход
     by_type_topic = {}
+    type_counts = {}
     for question in questions:
         q_type = question['type']
-        topic = question['topic']
-        key = (q_type, topic)
-        if key not in by_type_topic:
-            by_type_topic[key] = []
-        by_type_topic[key].append(question)
+        key = (q_type, question['topic'])
+        by_type_topic.setdefault(key, []).append((question['id'], question['title']))
+        type_counts[q_type] = type_counts.get(q_type, 0) + 1
+    
+    print("=" * 80)
+    print("СПИСОК ВСЕХ ВОПРОСОВ И УПРАЖНЕНИЙ")
+    print("=" * 80)
     
     # Иконки для типов
     type_icons = {
@@ -136,17 +216,11 @@ def list_all_questions(questions):
     for (q_type, topic), type_questions in sorted(by_type_topic.items()):
         icon = type_icons.get(q_type, '❓')
         print(f"\n{icon} {q_type.upper()} | {topic} ({len(type_questions)} вопросов):")
-        for question in sorted(type_questions, key=lambda x: x['id']):
-            print(f"  [{question['id']:3d}] {question['title']}")
+        for question_id, title in sorted(type_questions):
+            print(f"  [{question_id:3d}] {title}")
     
     print("\n" + "=" * 80)
-    print(f"Всего вопросов: {len(questions)}")
-    
-    # Статистика по типам
-    type_counts = {}
-    for question in questions:
-        q_type = question['type']
-        type_counts[q_type] = type_counts.get(q_type, 0) + 1
+    print(f"Всего вопросов: {sum(type_counts.values())}")
     
     print("\nСтатистика по типам:")
     for q_type, count in sorted(type_counts.items()):
@@ -165,6 +239,110 @@ def get_available_types(questions):
     return sorted(set(q['type'] for q in questions))
 
 
+def get_user():
+    """Пользователь по умолчанию для интервальных повторений."""
+    try:
+        return getpass.getuser()
+    except (KeyError, OSError):
+        return 'default'
+
+
+def run_spaced_repetition(source, args):
+    """--next / --review: выбор и оценка карточек по SM-2 (см. srs.py)."""
+    scheduler = Scheduler(args.progress_file)
+    
+    if args.review is not None:
+        item_id, grade = args.review
+        if source.get(item_id) is None:
+            print(f"Ошибка: вопрос с ID={item_id} не найден!")
+            sys.exit(1)
+        try:
+            card = scheduler.review(args.user, 'questions', item_id, grade)
+        except ValueError as e:
+            print(f"Ошибка: {e}")
+            sys.exit(1)
+        print(f"✓ Оценка {grade} для #{item_id} сохранена. "
+              f"Следующее повторение через {card.interval:g} дн.")
+        return
+    
+    item_id, state = scheduler.next_item(args.user, 'questions', source.ids)
+    if item_id is None:
+        print("Ошибка: нет доступных карточек!")
+        sys.exit(1)
+    print_question(source.get(item_id))
+    stats = scheduler.stats(args.user, 'questions')
+    labels = {'due': 'пора повторить', 'new': 'новая', 'ahead': 'досрочно'}
+    print(f"\n🧠 Карточка: {labels[state]} | к повторению: {stats['due']} | изучается: {stats['learning']}")
+    print(f"   Оцените себя: python {sys.argv[0]} --review {item_id} <0..5>")
+
+
+def run_with_source(source, args):
+    """
+    Выполнить команду (кроме --list) над источником вопросов: бинарным кэшем,
+    QuestionStore или клиентом сервера — у них общий интерфейс
+    get / random / values.
+    """
+    if args.review is not None or args.next:
+        run_spaced_repetition(source, args)
+        return
+    
+    if args.answer is not None:
+        question = source.get(args.answer)
+        if question:
+            print_answer(question)
+        else:
+            print(f"Ошибка: вопрос с ID={args.answer} не найден!")
+            sys.exit(1)
+        return
+    
+    topics = source.values('topic')
+    if args.topic and args.topic not in topics:
+        print(f"Ошибка: тема '{args.topic}' не найдена!")
+        print("\nДоступные темы:")
+        for topic in topics:
+            print(f"  - {topic}")
+        sys.exit(1)
+    
+    question = source.random(topic=args.topic, type=args.type)
+    if question is None:
+        print("Ошибка: нет доступных вопросов с указанными фильтрами!")
+        if args.type:
+            print(f"Тип: {args.type}")
+        if args.topic:
+            print(f"Тема: {args.topic}")
+        sys.exit(1)
+    print_question(question)
+
+
+def run_streaming(args):
+    """Выполнить команду за один проход по файлу, не держа вопросы в памяти."""
+    questions = stream_questions(args.file)
+    
+    if args.list:
+        list_all_questions(questions)
+    elif args.answer is not None:
+        question = find_record(questions, args.answer)
+        if question:
+            print_answer(question)
+        else:
+            print(f"Ошибка: вопрос с ID={args.answer} не найден!")
+            sys.exit(1)
+    else:
+        question = reservoir_sample(
+            questions,
+            lambda q: (not args.type or q['type'] == args.type)
+            and (not args.topic or q['topic'] == args.topic),
+        )
+        if question is None:
+            print("Ошибка: нет доступных вопросов с указанными фильтрами!")
+            if args.type:
+                print(f"Тип: {args.type}")
+            if args.topic:
+                print(f"Тема: {args.topic}")
+            sys.exit(1)
+        print_question(question)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Тренажер по асинхронности и конкурентности для подготовки к собеседованиям',
@@ -214,14 +392,120 @@ def main():
         help='Путь к файлу с вопросами (по умолчанию: async_questions.json)'
     )
     
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Читать файл потоково за один проход (для очень больших файлов)'
+    )
+    
+    parser.add_argument(
+        '--rebuild-cache',
+        action='store_true',
+        help='Пересобрать бинарный кэш (<file>.cache) перед выполнением команды'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Не использовать бинарный кэш, читать JSON напрямую'
+    )
+    
+    parser.add_argument(
+        '--next',
+        action='store_true',
+        help='Следующая карточка по интервальным повторениям (SM-2)'
+    )
+    
+    parser.add_argument(
+        '--review',
+        type=int,
+        nargs=2,
+        metavar=('ID', 'GRADE'),
+        help='Оценить повторение: 0 — не вспомнил, 5 — идеально'
+    )
+    
+    parser.add_argument(
+        '--user',
+        type=str,
+        default=get_user(),
+        help='Пользователь для интервальных повторений (по умолчанию: %(default)s)'
+    )
+    
+    parser.add_argument(
+        '--progress-file',
+        type=str,
+        default='progress.log',
+        help='Лог прогресса интервальных повторений (по умолчанию: progress.log)'
+    )
+    
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        help='Запустить сервер: вопросы в памяти, запросы через Unix-сокет'
+    )
+    
+    parser.add_argument(
+        '--connect',
+        action='store_true',
+        help='Выполнить команду через сервер (если он не запущен — локально)'
+    )
+    
+    parser.add_argument(
+        '--socket',
+        type=str,
+        default=None,
+        help='Путь к Unix-сокету сервера (по умолчанию: <tmp>/algo_test_questions.sock)'
+    )
+    
+    parser.add_argument(
+        '--server-timeout',
+        type=float,
+        default=None,
+        help='Сколько секунд ждать ответа сервера, 0 — без ограничения (по умолчанию: 2)'
+    )
+    
     args = parser.parse_args()
     
+    if args.serve or args.connect:
+        # asyncio и сокеты нужны только здесь — обычный запуск их не импортирует
+        from bank_server import CLIENT_TIMEOUT, run_server, connect, default_socket_path
+        socket_path = args.socket or default_socket_path('questions')
+    
+    if args.serve:
+        run_server(args.file, 'questions', QuestionStore, socket_path)
+        return
+    
+    if args.connect:
+        timeout = CLIENT_TIMEOUT if args.server_timeout is None else args.server_timeout
+        client = connect(socket_path, timeout or None)
+        if client is not None:
+            with client:
+                if args.list:
+                    list_all_questions(client.summaries(('id', 'type', 'topic', 'title')))
+                else:
+                    run_with_source(client, args)
+            return
+    
+    if args.stream and not (args.next or args.review):
+        run_streaming(args)
+        return
+    
+    # Всё, кроме --list, читает одну запись — берём её из бинарного кэша
+    if not args.list and not args.no_cache:
+        bank = open_bank(args.file, 'questions', rebuild=args.rebuild_cache)
+        if bank is not None:
+            with bank:
+                run_with_source(bank, args)
+            return
+    
     # Загрузить вопросы
     questions = load_questions(args.file)
     
     # Обработка команд
     if args.list:
         list_all_questions(questions)
+    elif args.next or args.review is not None:
+        run_spaced_repetition(QuestionStore(questions), args)
     elif args.answer is not None:
         question = get_question_by_id(questions, args.answer)
         if question:
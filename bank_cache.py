@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Бинарный кэш банков задач/вопросов (tasks.json, async_questions.json).
+
+Кэш пишется рядом с исходным JSON (tasks.json -> tasks.json.cache) и
+привязан к mtime, размеру и SHA-1 исходного файла. Внутри:
+
+    заголовок    — magic, версия, mtime_ns, размер и хэш исходника, число записей
+    строки       — таблица уникальных тем/типов/сложностей (utf-8 через \\0)
+    индекс       — колонки: id (int32), тема/тип/сложность (uint16 — номер
+                   в таблице строк), смещение (uint64) и длина (uint32) записи
+    тело         — записи в компактном JSON подряд
+
+Индекс отсортирован по id, поэтому поиск по ID — бинарный поиск, а случайный
+выбор с фильтрами не трогает тело. Сама запись читается через mmap только
+тогда, когда она нужна.
+
+Использование:
+    python bank_cache.py tasks.json            # Пересобрать кэш
+    python bank_cache.py async_questions.json  # То же для вопросов
+"""
+
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+
+MAGIC = b'ALGC'
+VERSION = 1
+CACHE_SUFFIX = '.cache'
+
+# magic, версия, mtime_ns, размер, sha1, число записей, длина таблицы строк
+HEADER = struct.Struct('<4sHqQ20sII')
+# mtime_ns в заголовке — сразу после magic и версии
+HEADER_MTIME = struct.Struct('<q')
+HEADER_MTIME_OFFSET = struct.calcsize('<4sH')
+
+# Поле записи, которое кладём в каждую колонку-метку
+LABEL_FIELDS = ('topic', 'type', 'difficulty')
+NO_LABEL = 0xFFFF
+
+
+def cache_path(source):
+    """Путь к кэшу для исходного JSON файла."""
+    source = Path(source)
+    return source.with_name(source.name + CACHE_SUFFIX)
+
+
+def _file_digest(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.digest()
+
+
+def build_cache(source, key):
+    """
+    Собрать кэш из JSON файла вида {key: [...]}.
+    Возвращает путь к записанному кэшу.
+    """
+    source = Path(source)
+    stat = source.stat()
+    digest = _file_digest(source)
+
+    with open(source, 'r', encoding='utf-8') as f:
+        records = json.load(f).get(key, [])
+    records.sort(key=lambda x: x['id'])
+
+    labels = []
+    label_ix = {}
+
+    def intern(value):
+        if value is None:
+            return NO_LABEL
+        if value not in label_ix:
+            label_ix[value] = len(labels)
+            labels.append(value)
+        return label_ix[value]
+
+    ids = array('i')
+    columns = {field: array('H') for field in LABEL_FIELDS}
+    offsets = array('Q')
+    lengths = array('I')
+    body = bytearray()
+
+    for record in records:
+        ids.append(record['id'])
+        for field in LABEL_FIELDS:
+            columns[field].append(intern(record.get(field)))
+        blob = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        offsets.append(len(body))
+        lengths.append(len(blob))
+        body += blob
+
+    strings = '\0'.join(labels).encode('utf-8')
+    header = HEADER.pack(MAGIC, VERSION, stat.st_mtime_ns, stat.st_size, digest,
+                         len(records), len(strings))
+
+    # Пишем во временный файл и подменяем атомарно
+    target = cache_path(source)
+    tmp = target.with_name(target.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(header)
+        f.write(strings)
+        for column in (ids, *columns.values(), offsets, lengths):
+            f.write(column.tobytes())
+        f.write(body)
+    os.replace(tmp, target)
+    return target
+
+
+class CompiledBank:
+    """
+    Банк записей, открытый из бинарного кэша через mmap.
+
+    Индекс (id, метки, смещения) читается целиком — он компактный,
+    тело записи декодируется только при обращении к ней.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Пустой файл нельзя отобразить в память
+            self._file.close()
+            raise ValueError(f"пустой файл кэша {self.path}")
+
+        (magic, version, self.source_mtime_ns, self.source_size, self.source_digest,
+         count, strings_len) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"неизвестный формат кэша {self.path}")
+
+        pos = HEADER.size
+        strings = bytes(self._mm[pos:pos + strings_len]).decode('utf-8')
+        self.labels = strings.split('\0') if strings else []
+        pos += strings_len
+
+        def read_column(typecode):
+            nonlocal pos
+            column = array(typecode)
+            size = column.itemsize * count
+            column.frombytes(self._mm[pos:pos + size])
+            pos += size
+            return column
+
+        self.ids = read_column('i')
+        self.columns = {field: read_column('H') for field in LABEL_FIELDS}
+        self.offsets = read_column('Q')
+        self.lengths = read_column('I')
+        self._body_start = pos
+        self._filtered = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def _record(self, ix):
+        start = self._body_start + self.offsets[ix]
+        return json.loads(self._mm[start:start + self.lengths[ix]].decode('utf-8'))
+
+    def get(self, record_id):
+        """Получить запись по ID или None (бинарный поиск по индексу)."""
+        ix = bisect.bisect_left(self.ids, record_id)
+        if ix < len(self.ids) and self.ids[ix] == record_id:
+            return self._record(ix)
+        return None
+
+    def values(self, field):
+        """Отсортированный список значений метки (тем, типов, сложностей)."""
+        column = self.columns[field]
+        return sorted({self.labels[i] for i in column if i != NO_LABEL})
+
+    def _matching(self, filters):
+        key = tuple(sorted(filters.items()))
+        if key not in self._filtered:
+            wanted = {}
+            for field, value in filters.items():
+                try:
+                    wanted[field] = self.labels.index(value)
+                except ValueError:
+                    self._filtered[key] = []
+                    return []
+            self._filtered[key] = [
+                ix for ix in range(len(self.ids))
+                if all(self.columns[field][ix] == label for field, label in wanted.items())
+            ]
+        return self._filtered[key]
+
+    def random(self, **filters):
+        """
+        Случайная запись с фильтрами по меткам (topic=..., type=..., difficulty=...)
+        или None, если подходящих нет.
+        """
+        filters = {field: value for field, value in filters.items() if value}
+        if not filters:
+            if not self.ids:
+                return None
+            return self._record(random.randrange(len(self.ids)))
+        matching = self._matching(filters)
+        if not matching:
+            return None
+        return self._record(random.choice(matching))
+
+
+def _is_fresh(bank, source):
+    stat = source.stat()
+    if stat.st_size != bank.source_size:
+        return False
+    if stat.st_mtime_ns == bank.source_mtime_ns:
+        return True
+    # mtime поменялся (например, после checkout) — сверяем содержимое
+    if _file_digest(source) != bank.source_digest:
+        return False
+    # Содержимое то же: запоминаем новый mtime, чтобы следующие запуски не хэшировали файл
+    try:
+        fd = os.open(bank.path, os.O_WRONLY)
+        try:
+            os.pwrite(fd, HEADER_MTIME.pack(stat.st_mtime_ns), HEADER_MTIME_OFFSET)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+    bank.source_mtime_ns = stat.st_mtime_ns
+    return True
+
+
+def open_bank(source, key, rebuild=False):
+    """
+    Открыть кэш для JSON файла, пересобрав его при необходимости.
+
+    Возвращает CompiledBank или None, если кэш недоступен (нет прав на запись,
+    битый JSON и т.п.) — тогда вызывающий код работает с JSON напрямую.
+    """
+    source = Path(source)
+    if not source.exists():
+        return None
+    target = cache_path(source)
+
+    if not rebuild and target.exists():
+        try:
+            bank = CompiledBank(target)
+        except (OSError, ValueError, struct.error):
+            bank = None
+        if bank is not None:
+            if _is_fresh(bank, source):
+                return bank
+            bank.close()
+
+    try:
+        build_cache(source, key)
+        return CompiledBank(target)
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
+
+
+def main():
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+    source = Path(sys.argv[1])
+    key = 'questions' if 'question' in source.name else 'tasks'
+    try:
+        target = build_cache(source, key)
+    except FileNotFoundError:
+        print(f"Ошибка: файл {source} не найден!")
+        sys.exit(1)
+    except json.JSONDecodeError:
+        print(f"Ошибка: неверный формат JSON в файле {source}!")
+        sys.exit(1)
+    with CompiledBank(target) as bank:
+        print(f"✓ {target}: {len(bank)} записей, {target.stat().st_size} байт")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""
+Долгоживущий сервер для task_selector.py и async_trainer.py.
+
+Сервер один раз загружает банк (TaskStore / QuestionStore) и отвечает на
+запросы по Unix-сокету, так что боту не нужно на каждый запрос запускать
+интерпретатор и заново разбирать JSON. Изменения JSON файла подхватываются
+на лету: файл опрашивается раз в reload_interval секунд, а если новая версия
+не парсится, сервер продолжает отдавать старую.
+
+Протокол — JSON построчно, по одному запросу на строку:
+
+    {"op": "get", "id": 5}
+    {"op": "random", "filters": {"topic": "Two pointers"}}
+    {"op": "values", "field": "topic"}
+    {"op": "ids"}
+    {"op": "list", "fields": ["id", "topic", "title"]}
+    {"op": "ping"}
+
+Ответ: {"ok": true, "result": ...} или {"ok": false, "error": "..."}.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+RELOAD_INTERVAL = 1.0
+CLIENT_TIMEOUT = 2.0
+
+
+def default_socket_path(name):
+    """Путь к сокету по умолчанию, например /tmp/algo_test_tasks.sock."""
+    return str(Path(tempfile.gettempdir()) / f'algo_test_{name}.sock')
+
+
+class ServerError(Exception):
+    """Сервер вернул ошибку на запрос."""
+
+
+class BankServer:
+    """
+    Сервер банка записей.
+
+    store_factory(records) строит индексированное хранилище
+    (get / random(**filters) / values(field) / __len__).
+    """
+
+    def __init__(self, file_path, key, store_factory, reload_interval=RELOAD_INTERVAL):
+        self.file_path = Path(file_path)
+        self.key = key
+        self.store_factory = store_factory
+        self.reload_interval = reload_interval
+        self.store = None
+        self.mtime_ns = None
+        self.loaded_at = None
+        self.requests = 0
+
+    def load(self):
+        """Загрузить банк с диска. Исключения пробрасываются вызывающему."""
+        mtime_ns = self.file_path.stat().st_mtime_ns
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            records = json.load(f).get(self.key, [])
+        # Подмена ссылки атомарна — запросы видят либо старый, либо новый банк
+        self.store = self.store_factory(records)
+        self.mtime_ns = mtime_ns
+        self.loaded_at = time.time()
+
+    async def watch(self):
+        """Перезагружать банк при изменении файла."""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                mtime_ns = self.file_path.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+            if mtime_ns == self.mtime_ns:
+                continue
+            try:
+                await asyncio.to_thread(self.load)
+                print(f"↻ {self.file_path} перезагружен: {len(self.store)} записей", flush=True)
+            except Exception as e:
+                # Файл могли поймать посреди записи или store_factory споткнулся
+                # о битую запись — отдаём старый банк и пробуем на следующем тике
+                print(f"Ошибка перезагрузки {self.file_path}: {e!r}", file=sys.stderr, flush=True)
+
+    def handle(self, request):
+        """Выполнить один запрос к текущему банку."""
+        # Корректный JSON, но не той формы ([], "x", 1) — ответ с ошибкой, а не обрыв соединения
+        if not isinstance(request, dict):
+            raise ValueError("запрос должен быть JSON-объектом")
+        store = self.store
+        op = request.get('op')
+        if op == 'get':
+            return store.get(request['id'])
+        if op == 'random':
+            filters = request.get('filters', {})
+            if not isinstance(filters, dict) or not all(isinstance(name, str) for name in filters):
+                raise ValueError("filters должен быть объектом {поле: значение}")
+            return store.random(**filters)
+        if op == 'values':
+            if not isinstance(request['field'], str):
+                raise ValueError("field должен быть строкой")
+            return store.values(request['field'])
+        if op == 'ids':
+            return store.ids
+        if op == 'list':
+            fields = request['fields']
+            if not isinstance(fields, list) or not all(isinstance(field, str) for field in fields):
+                raise ValueError("fields должен быть списком строк")
+            return [{field: record.get(field) for field in fields} for record in store.records()]
+        if op == 'ping':
+            return {'count': len(store), 'loaded_at': self.loaded_at, 'requests': self.requests}
+        raise ValueError(f"неизвестная операция: {op!r}")
+
+    async def on_client(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                self.requests += 1
+                try:
+                    response = {'ok': True, 'result': self.handle(json.loads(line))}
+                except (ValueError, KeyError, TypeError) as e:
+                    response = {'ok': False, 'error': str(e)}
+                writer.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path):
+        self.load()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = await asyncio.start_unix_server(self.on_client, path=socket_path)
+        print(f"✓ {self.file_path}: {len(self.store)} записей, слушаю {socket_path}", flush=True)
+        watcher = asyncio.create_task(self.watch())
+        # SIGTERM останавливает сервер так же, как Ctrl+C, и сокет убирается
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+
+def run_server(file_path, key, store_factory, socket_path):
+    """Запустить сервер до Ctrl+C."""
+    bank = BankServer(file_path, key, store_factory)
+    try:
+        asyncio.run(bank.serve(socket_path))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("\nСервер остановлен")
+
+
+class BankClient:
+    """
+    Синхронный клиент сервера (CLI не тратит время на запуск event loop).
+    Соединение открывается один раз и переиспользуется для всех запросов.
+    """
+
+    def __init__(self, socket_path, timeout=CLIENT_TIMEOUT):
+        """timeout — секунд на ответ (list большого банка дольше); None — без ограничения."""
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(socket_path)
+        except OSError:
+            self.sock.close()
+            raise
+        self.file = self.sock.makefile('rb')
+        self._ids = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def query(self, op, **params):
+        request = dict(params, op=op)
+        self.sock.sendall(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("сервер закрыл соединение")
+        response = json.loads(line)
+        if not response['ok']:
+            raise ServerError(response['error'])
+        return response['result']
+
+    # Тот же интерфейс, что у TaskStore / QuestionStore / CompiledBank
+
+    def get(self, record_id):
+        return self.query('get', id=record_id)
+
+    def random(self, **filters):
+        return self.query('random', filters={k: v for k, v in filters.items() if v})
+
+    def values(self, field):
+        return self.query('values', field=field)
+
+    @property
+    def ids(self):
+        if self._ids is None:
+            self._ids = self.query('ids')
+        return self._ids
+
+    def summaries(self, fields):
+        return self.query('list', fields=list(fields))
+
+
+def connect(socket_path, timeout=CLIENT_TIMEOUT):
+    """Подключиться к серверу или вернуть None, если он не запущен."""
+    try:
+        return BankClient(socket_path, timeout)
+    except OSError:
+        return None
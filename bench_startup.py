@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк холодного старта CLI: JSON (--no-cache) против бинарного кэша.
+
+Каждый замер — настоящий запуск task_selector.py / async_trainer.py
+отдельным процессом (случайная запись и запись по ID), так что в цифры
+входят и импорты скрипта, и загрузка банка — ровно то, что ждёт пользователь.
+
+Использование:
+    python bench_startup.py                 # Банки из репозитория
+    python bench_startup.py --scale 100     # Банки, размноженные в 100 раз
+    python bench_startup.py --runs 30
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bank_cache import build_cache
+
+
+HERE = Path(__file__).resolve().parent
+
+# Файл банка, ключ, скрипт, флаг «запись по ID»
+BANKS = [
+    ('tasks.json', 'tasks', 'task_selector.py', '--solution'),
+    ('async_questions.json', 'questions', 'async_trainer.py', '--answer'),
+]
+
+
+def scale_bank(source, key, factor, target_dir):
+    """Размножить банк в factor раз с уникальными ID."""
+    with open(source, 'r', encoding='utf-8') as f:
+        records = json.load(f)[key]
+    step = max(r['id'] for r in records)
+    scaled = [
+        dict(record, id=record['id'] + copy * step)
+        for copy in range(factor)
+        for record in records
+    ]
+    target = Path(target_dir) / source.name
+    with open(target, 'w', encoding='utf-8') as f:
+        json.dump({key: scaled}, f, ensure_ascii=False, indent=2)
+    return target, len(scaled)
+
+
+def time_command(args, runs):
+    """Медиана и p90 времени запуска процесса с аргументами args, в мс."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=HERE, check=True,
+                       stdout=subprocess.DEVNULL, stdin=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.9) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк холодного старта CLI')
+    parser.add_argument('--runs', type=int, default=15, help='Число запусков на вариант')
+    parser.add_argument('--scale', type=int, default=1, help='Во сколько раз размножить банки')
+    args = parser.parse_args()
+
+    # Базовая линия — пустой интерпретатор
+    baseline, _ = time_command(['-c', 'pass'], args.runs)
+    print(f"Пустой интерпретатор: {baseline:.1f} ms (медиана)\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, key, script, id_flag in BANKS:
+            source = HERE / name
+            count = None
+            if args.scale > 1:
+                source, count = scale_bank(source, key, args.scale, tmp)
+            # Кэш собирается заранее, чтобы первый запуск не платил за сборку
+            cache = build_cache(source, key)
+            if count is None:
+                with open(source, 'r', encoding='utf-8') as f:
+                    count = len(json.load(f)[key])
+
+            commands = [
+                ('случайная', [script, '--file', str(source)]),
+                ('по ID', [script, '--file', str(source), id_flag, str(count // 2)]),
+            ]
+
+            print("=" * 60)
+            print(f"{script} ({name}): {count} записей, JSON {source.stat().st_size} байт, "
+                  f"кэш {cache.stat().st_size} байт")
+            print("-" * 60)
+            for label, command in commands:
+                json_med, json_p90 = time_command([*command, '--no-cache'], args.runs)
+                cache_med, cache_p90 = time_command(command, args.runs)
+                print(f"  {label:<10} --no-cache медиана {json_med:7.1f} ms | p90 {json_p90:7.1f} ms")
+                print(f"  {label:<10} кэш       медиана {cache_med:7.1f} ms | p90 {cache_p90:7.1f} ms")
+                print(f"  {'':<10} без учёта старта интерпретатора: "
+                      f"{json_med - baseline:.1f} ms -> {cache_med - baseline:.1f} ms")
+            print("=" * 60 + "\n")
+
+
+if __name__ == '__main__':
+    main()
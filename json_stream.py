@@ -0,0 +1,142 @@
+"""
+Потоковое чтение больших банков задач/вопросов.
+
+iter_records() читает файл кусками и отдаёт записи массива
+{"tasks": [...]} / {"questions": [...]} по одной, не загружая документ
+целиком: в памяти одновременно лежат только текущий кусок файла и одна запись.
+
+reservoir_sample() выбирает случайную запись за один проход с O(1) памяти.
+"""
+
+import json
+import random
+
+
+CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+_NUMBER_TAIL = '.eE+-0123456789'
+_WHITESPACE = ' \t\n\r'
+
+
+class _Reader:
+    """Буфер поверх текстового файла с подчитыванием по требованию."""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Дочитать следующий кусок. Возвращает False, если файл закончился."""
+        if self.eof:
+            return False
+        # Не меньше, чем уже лежит в буфере: запись больше куска дочитывается
+        # с удвоением буфера, и raw_decode с её начала повторяется O(log n) раз
+        chunk = self.f.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        # Отбрасываем уже разобранную часть буфера
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Следующий значимый символ (пробелы пропускаются) или '' в конце файла."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.buf, self.pos)
+        self.pos += 1
+
+    def value(self):
+        """Разобрать одно JSON значение, подчитывая файл, пока оно не уместится."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # Число в конце буфера могло оборваться на середине: «1.», «2e»,
+            # «-4» без следующей цифры декодируются как более короткое число
+            if (isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and self.buf[end:].strip(_NUMBER_TAIL) == '' and self.fill()):
+                continue
+            self.pos = end
+            return value
+
+
+def iter_records(file_path, key, chunk_size=CHUNK_SIZE):
+    """
+    Отдавать записи массива data[key] из JSON файла по одной.
+
+    Остальные ключи верхнего уровня пропускаются. Если ключа нет,
+    генератор ничего не отдаёт (как data.get(key, [])).
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        reader = _Reader(f, chunk_size)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+
+        while True:
+            name = reader.value()
+            reader.expect(':')
+
+            if name == key and reader.peek() == '[':
+                reader.expect('[')
+                if reader.peek() == ']':
+                    reader.pos += 1
+                else:
+                    while True:
+                        yield reader.value()
+                        if reader.peek() == ',':
+                            reader.pos += 1
+                            continue
+                        reader.expect(']')
+                        break
+            else:
+                reader.value()
+
+            if reader.peek() == ',':
+                reader.pos += 1
+                continue
+            reader.expect('}')
+            return
+
+
+def reservoir_sample(records, predicate=None, rng=random):
+    """
+    Случайная запись из потока за один проход (reservoir sampling, k=1).
+    Каждая подходящая под predicate запись выбирается с равной вероятностью.
+    Возвращает None, если подходящих записей нет.
+    """
+    chosen = None
+    seen = 0
+    for record in records:
+        if predicate is not None and not predicate(record):
+            continue
+        seen += 1
+        if rng.randrange(seen) == 0:
+            chosen = record
+    return chosen
+
+
+def find_record(records, record_id):
+    """Первая запись с указанным ID или None. Чтение прекращается на находке."""
+    for record in records:
+        if record['id'] == record_id:
+            return record
+    return None
@@ -0,0 +1,285 @@
+"""
+Интервальные повторения (SM-2) для task_selector.py и async_trainer.py.
+
+Прогресс хранится в append-only логе (JSON построчно):
+
+    {"t": 1700000000.0, "u": "ilya", "b": "tasks", "i": 42, "g": 4}      # оценка
+    {"s": 1, "u": "ilya", "b": "tasks", "i": 42, "ef": 2.5, "n": 1,
+     "iv": 1.0, "due": 1700086400.0}                         # снимок (старый формат)
+
+Когда оценок накапливается заметно больше, чем карточек, состояния
+сохраняются снимком в соседний файл progress.log.snapshot (один JSON,
+атомарно через временный файл), а лог начинается заново. Снимок помнит,
+какой файл лога (inode) и до какого байта он покрывает, поэтому загрузка —
+снимок плюс хвост лога, а не весь лог с начала. Снимки внутри лога (см.
+выше) — старый формат, он по-прежнему читается.
+
+Для каждой пары (пользователь, банк) держится куча (due, id) с ленивым
+удалением устаревших записей и список ещё не виденных ID с удалением
+перестановкой с последним, поэтому выбор следующей карточки — O(log n).
+"""
+
+import fcntl
+import heapq
+import json
+import os
+import random
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+
+DAY = 24 * 60 * 60
+MIN_EASINESS = 1.3
+DEFAULT_EASINESS = 2.5
+
+# Сжимать лог, когда оценок больше, чем COMPACT_RATIO * карточек (и не меньше COMPACT_MIN)
+COMPACT_RATIO = 2
+COMPACT_MIN = 1000
+
+
+@dataclass
+class Card:
+    """Состояние карточки по SM-2."""
+    easiness: float = DEFAULT_EASINESS
+    repetitions: int = 0
+    interval: float = 0.0
+    due: float = 0.0
+
+    def review(self, grade, now):
+        """Применить оценку 0..5 (меньше 3 — не вспомнил)."""
+        if grade < 3:
+            self.repetitions = 0
+            self.interval = 1.0
+        else:
+            self.repetitions += 1
+            if self.repetitions == 1:
+                self.interval = 1.0
+            elif self.repetitions == 2:
+                self.interval = 6.0
+            else:
+                self.interval = round(self.interval * self.easiness)
+        self.easiness = max(
+            MIN_EASINESS,
+            self.easiness + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02),
+        )
+        self.due = now + self.interval * DAY
+
+
+class Deck:
+    """Карточки одного пользователя в одном банке + куча «кто следующий»."""
+
+    def __init__(self):
+        self.cards = {}
+        self._heap = []
+        # Ещё не виденные ID банка и их позиции в списке
+        self._unseen = []
+        self._unseen_index = {}
+        # Размер банка, для которого построен _unseen
+        self._unseen_source = None
+
+    def push(self, item_id):
+        heapq.heappush(self._heap, (self.cards[item_id].due, item_id))
+
+    def rebuild(self):
+        self._heap = [(card.due, item_id) for item_id, card in self.cards.items()]
+        heapq.heapify(self._heap)
+
+    def peek(self):
+        """(due, id) ближайшей карточки или None. Устаревшие записи выбрасываются."""
+        while self._heap:
+            due, item_id = self._heap[0]
+            if self.cards[item_id].due == due:
+                return due, item_id
+            heapq.heappop(self._heap)
+        return None
+
+    def unseen(self, item_ids):
+        """Ещё не виденные ID; строится заново, только когда меняется размер банка."""
+        if self._unseen_source != len(item_ids):
+            self._unseen = [item_id for item_id in item_ids if item_id not in self.cards]
+            self._unseen_index = {item_id: i for i, item_id in enumerate(self._unseen)}
+            self._unseen_source = len(item_ids)
+        return self._unseen
+
+    def seen(self, item_id):
+        """Убрать ID из не виденных за O(1): на его место встаёт последний."""
+        i = self._unseen_index.pop(item_id, None)
+        if i is None:
+            return
+        last = self._unseen.pop()
+        if last != item_id:
+            self._unseen[i] = last
+            self._unseen_index[last] = i
+
+
+class Scheduler:
+    """
+    Планировщик повторений поверх лога прогресса.
+
+    Использование:
+        scheduler = Scheduler('progress.log')
+        item_id = scheduler.next_item('ilya', 'tasks', store.ids)
+        scheduler.review('ilya', 'tasks', item_id, grade=4)
+    """
+
+    def __init__(self, log_path='progress.log', compact_ratio=COMPACT_RATIO, compact_min=COMPACT_MIN):
+        self.log_path = Path(log_path)
+        self.snapshot_path = self.log_path.with_name(self.log_path.name + '.snapshot')
+        self.compact_ratio = compact_ratio
+        self.compact_min = compact_min
+        self.decks = {}
+        self.reviews_logged = 0
+        self._load()
+
+    def deck(self, user, bank):
+        return self.decks.setdefault((user, bank), Deck())
+
+    def card_count(self):
+        return sum(len(deck.cards) for deck in self.decks.values())
+
+    def _read_log(self):
+        """Снимок и хвост лога с диска: (decks, число оценок после последнего сжатия)."""
+        decks = {}
+        reviews = 0
+        start = 0
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            snapshot = None
+        if snapshot is not None:
+            for user, bank, item_id, easiness, repetitions, interval, due in snapshot['cards']:
+                deck = decks.setdefault((user, bank), Deck())
+                deck.cards[item_id] = Card(easiness, repetitions, interval, due)
+        if not self.log_path.exists():
+            return self._built(decks), reviews
+        with open(self.log_path, 'rb') as f:
+            # Тот же файл лога, что при снимке, — уже учтённое начало пропускаем;
+            # другой файл — лог после сжатия, целиком новее снимка
+            if snapshot is not None and os.fstat(f.fileno()).st_ino == snapshot['log_ino']:
+                start = snapshot['log_size']
+            f.seek(start)
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Оборванная последняя строка после падения — пропускаем
+                    continue
+                deck = decks.setdefault((entry['u'], entry['b']), Deck())
+                if entry.get('s'):
+                    deck.cards[entry['i']] = Card(entry['ef'], entry['n'], entry['iv'], entry['due'])
+                else:
+                    card = deck.cards.setdefault(entry['i'], Card())
+                    card.review(entry['g'], entry['t'])
+                    reviews += 1
+        return self._built(decks), reviews
+
+    @staticmethod
+    def _built(decks):
+        for deck in decks.values():
+            deck.rebuild()
+        return decks
+
+    def _load(self):
+        self.decks, self.reviews_logged = self._read_log()
+        self.maybe_compact()
+
+    def _append(self, entry):
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        while True:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                # Пока ждали блокировку, другой процесс мог сжать лог и подменить файл
+                if os.fstat(f.fileno()).st_ino != os.stat(self.log_path).st_ino:
+                    continue
+                f.write(line)
+                return
+
+    def review(self, user, bank, item_id, grade, now=None):
+        """Записать оценку 0..5 и пересчитать карточку."""
+        if not 0 <= grade <= 5:
+            raise ValueError(f"оценка должна быть от 0 до 5, получено {grade}")
+        now = time.time() if now is None else now
+        deck = self.deck(user, bank)
+        card = deck.cards.get(item_id)
+        if card is None:
+            card = deck.cards[item_id] = Card()
+            deck.seen(item_id)
+        card.review(grade, now)
+        deck.push(item_id)
+        self._append({'t': now, 'u': user, 'b': bank, 'i': item_id, 'g': grade})
+        self.reviews_logged += 1
+        self.maybe_compact()
+        return card
+
+    def next_item(self, user, bank, item_ids, now=None, rng=random):
+        """
+        Следующая карточка: просроченная с самым ранним сроком, иначе новая
+        (ещё не виденная) из item_ids, иначе ближайшая по сроку.
+        Возвращает (id, состояние), где состояние — 'due', 'new' или 'ahead'.
+        """
+        now = time.time() if now is None else now
+        deck = self.deck(user, bank)
+
+        top = deck.peek()
+        if top is not None and top[0] <= now:
+            return top[1], 'due'
+
+        new_id = self._new_item(deck, item_ids, rng)
+        if new_id is not None:
+            return new_id, 'new'
+
+        if top is not None:
+            return top[1], 'ahead'
+        return None, None
+
+    def _new_item(self, deck, item_ids, rng):
+        unseen = deck.unseen(item_ids)
+        return rng.choice(unseen) if unseen else None
+
+    def stats(self, user, bank, now=None):
+        """Сколько карточек просрочено и сколько всего изучается."""
+        now = time.time() if now is None else now
+        deck = self.deck(user, bank)
+        due = sum(1 for card in deck.cards.values() if card.due <= now)
+        return {'due': due, 'learning': len(deck.cards)}
+
+    def maybe_compact(self):
+        threshold = max(self.compact_min, self.compact_ratio * self.card_count())
+        if self.reviews_logged > threshold:
+            self.compact()
+
+    def compact(self):
+        """
+        Сохранить снимок текущих состояний карточек и начать лог заново.
+        Под блокировкой лог перечитывается, чтобы не потерять оценки,
+        дописанные другими процессами.
+
+        Снимок помнит inode и размер старого лога: если процесс упадёт до
+        замены лога, при загрузке старый лог дочитается с этого места.
+        """
+        snapshot_tmp = self.snapshot_path.with_name(self.snapshot_path.name + '.tmp')
+        log_tmp = self.log_path.with_name(self.log_path.name + '.tmp')
+        while True:
+            with open(self.log_path, 'a', encoding='utf-8') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                log_stat = os.fstat(lock.fileno())
+                # Как и в _append: блокировка старого файла не защищает новый лог
+                if log_stat.st_ino != os.stat(self.log_path).st_ino:
+                    continue
+                self.decks, _ = self._read_log()
+                log_stat = os.fstat(lock.fileno())
+                cards = [
+                    [user, bank, item_id, card.easiness, card.repetitions, card.interval, card.due]
+                    for (user, bank), deck in self.decks.items()
+                    for item_id, card in deck.cards.items()
+                ]
+                with open(snapshot_tmp, 'w', encoding='utf-8') as f:
+                    json.dump({'log_ino': log_stat.st_ino, 'log_size': log_stat.st_size, 'cards': cards},
+                              f, ensure_ascii=False)
+                os.replace(snapshot_tmp, self.snapshot_path)
+                open(log_tmp, 'w').close()
+                os.replace(log_tmp, self.log_path)
+                break
+        self.reviews_logged = 0
@@ -6,14 +6,26 @@
     python task_selector.py --solution 1 # Показать решение задачи с id=1
     python task_selector.py -s 1         # То же самое
     python task_selector.py --list      # Показать все задачи
+    python task_selector.py --difficulty Easy  # Случайная задача заданной сложности
+    python task_selector.py --rebuild-cache    # Пересобрать бинарный кэш tasks.json
+    python task_selector.py --stream --list    # Потоковое чтение огромного файла
+    python task_selector.py --serve            # Сервер с задачами в памяти
+    python task_selector.py --connect -s 1     # Запрос к серверу (если он запущен)
+    python task_selector.py --next             # Следующая карточка по интервальным повторениям
+    python task_selector.py --review 1 4       # Оценка 0..5 для ID=1 после повторения
 """
 
 import json
 import random
 import argparse
+import getpass
 import sys
 from pathlib import Path
 
+from bank_cache import open_bank
+from json_stream import iter_records, reservoir_sample, find_record
+from srs import Scheduler
+
 
 def load_tasks(file_path='tasks.json'):
     """Загрузить задачи из JSON файла."""
@@ -29,6 +41,18 @@ def load_tasks(file_path='tasks.json'):
         sys.exit(1)
 
 
+def stream_tasks(file_path='tasks.json'):
+    """Отдавать задачи из JSON файла по одной, не загружая файл целиком."""
+    try:
+        yield from iter_records(file_path, 'tasks')
+    except FileNotFoundError:
+        print(f"Ошибка: файл {file_path} не найден!")
+        sys.exit(1)
+    except json.JSONDecodeError:
+        print(f"Ошибка: неверный формат JSON в файле {file_path}!")
+        sys.exit(1)
+
+
 def print_task(task):
     """Красиво вывести задачу."""
     print("=" * 80)
@@ -51,6 +75,85 @@ def print_solution(task):
     print("=" * 80)
 
 
+class TaskStore:
+    """
+    Индексированное хранилище задач.
+
+    Строится один раз из списка задач (см. load_tasks) и держит готовые индексы:
+    по ID, по теме, по сложности и по паре (тема, сложность). Поиск по ID и
+    случайный выбор из любой комбинации фильтров — O(1).
+    """
+
+    def __init__(self, tasks):
+        self.tasks = list(tasks)
+        self.ids = [record['id'] for record in self.tasks]
+        self.by_id = {}
+        self.by_topic = {}
+        self.by_difficulty = {}
+        self.by_topic_difficulty = {}
+
+        for task in self.tasks:
+            self.by_id[task['id']] = task
+            self.by_topic.setdefault(task['topic'], []).append(task)
+            self.by_difficulty.setdefault(task['difficulty'], []).append(task)
+            key = (task['topic'], task['difficulty'])
+            self.by_topic_difficulty.setdefault(key, []).append(task)
+
+        # Списки внутри индексов отсортированы по ID — удобно для --list
+        for index in (self.by_topic, self.by_difficulty, self.by_topic_difficulty):
+            for bucket in index.values():
+                bucket.sort(key=lambda x: x['id'])
+
+    @classmethod
+    def from_file(cls, file_path='tasks.json'):
+        """Загрузить задачи из JSON файла и построить индексы."""
+        return cls(load_tasks(file_path))
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def records(self):
+        """Все задачи в порядке файла."""
+        return self.tasks
+
+    def get(self, task_id):
+        """Получить задачу по ID или None."""
+        return self.by_id.get(task_id)
+
+    def values(self, field):
+        """Отсортированный список значений поля ('topic' или 'difficulty')."""
+        index = {'topic': self.by_topic, 'difficulty': self.by_difficulty}[field]
+        return sorted(index)
+
+    def topics(self):
+        """Отсортированный список тем."""
+        return self.values('topic')
+
+    def difficulties(self):
+        """Отсортированный список уровней сложности."""
+        return self.values('difficulty')
+
+    def filter(self, topic=None, difficulty=None):
+        """
+        Задачи, подходящие под фильтры (готовый список из индекса, не копия).
+        Без фильтров возвращает все задачи.
+        """
+        if topic and difficulty:
+            return self.by_topic_difficulty.get((topic, difficulty), [])
+        if topic:
+            return self.by_topic.get(topic, [])
+        if difficulty:
+            return self.by_difficulty.get(difficulty, [])
+        return self.tasks
+
+    def random(self, topic=None, difficulty=None):
+        """Случайная задача из комбинации фильтров или None, если подходящих нет."""
+        candidates = self.filter(topic, difficulty)
+        if not candidates:
+            return None
+        return random.choice(candidates)
+
+
 def get_random_task(tasks):
     """Получить случайную задачу."""
     if not tasks:
@@ -61,6 +164,8 @@ def get_random_task(tasks):
 
 def get_task_by_id(tasks, task_id):
     """Получить задачу по ID."""
+    if isinstance(tasks, TaskStore):
+        return tasks.get(task_id)
     for task in tasks:
         if task['id'] == task_id:
             return task
@@ -68,29 +173,154 @@ def get_task_by_id(tasks, task_id):
 
 
 def list_all_tasks(tasks):
-    """Вывести список всех задач."""
+    """
+    Вывести список всех задач.
+    Принимает TaskStore или любой iterable задач (в т.ч. stream_tasks) —
+    во втором случае за один проход запоминаются только ID, названия и сложности.
+    """
+    if isinstance(tasks, TaskStore):
+        by_topic = {
+            topic: [(t['id'], t['title'], t['difficulty']) for t in tasks.by_topic[topic]]
+            for topic in tasks.topics()
+        }
+    else:
+        by_topic = {}
+        for task in tasks:
+            by_topic.setdefault(task['topic'], []).append(
+                (task['id'], task['title'], task['difficulty'])
+            )
+
     print("=" * 80)
     print("СПИСОК ВСЕХ ЗАДАЧ")
     print("=" * 80)
     
-    # Группировка по темам
-    by_topic = {}
-    for task in tasks:
-        topic = task['topic']
-        if topic not in by_topic:
-            by_topic[topic] = []
-        by_topic[topic].append(task)
-    
+    total = 0
     for topic, topic_tasks in sorted(by_topic.items()):
         print(f"\n📚 {topic} ({len(topic_tasks)} задач):")
-        for task in sorted(topic_tasks, key=lambda x: x['id']):
-            print(f"  [{task['id']:3d}] {task['title']} ({task['difficulty']})")
+        for task_id, title, difficulty in sorted(topic_tasks):
+            print(f"  [{task_id:3d}] {title} ({difficulty})")
+        total += len(topic_tasks)
     
     print("\n" + "=" * 80)
-    print(f"Всего задач: {len(tasks)}")
+    print(f"Всего задач: {total}")
     print("=" * 80)
 
 
+def run_streaming(args):
+    """Выполнить команду за один проход по файлу, не держа задачи в памяти."""
+    tasks = stream_tasks(args.file)
+    
+    if args.list:
+        list_all_tasks(tasks)
+    elif args.solution is not None:
+        task = find_record(tasks, args.solution)
+        if task:
+            print_solution(task)
+        else:
+            print(f"Ошибка: задача с ID={args.solution} не найдена!")
+            sys.exit(1)
+    else:
+        task = reservoir_sample(
+            tasks,
+            lambda t: (not args.topic or t['topic'] == args.topic)
+            and (not args.difficulty or t['difficulty'] == args.difficulty),
+        )
+        if task is None:
+            print("Ошибка: нет задач с указанными фильтрами!")
+            if args.topic:
+                print(f"Тема: {args.topic}")
+            if args.difficulty:
+                print(f"Сложность: {args.difficulty}")
+            sys.exit(1)
+        print_task(task)
+        if not (args.topic or args.difficulty):
+            print(f"\n💡 Чтобы увидеть решение, выполните: python {sys.argv[0]} --solution {task['id']}")
+
+
+def get_user():
+    """Пользователь по умолчанию для интервальных повторений."""
+    try:
+        return getpass.getuser()
+    except (KeyError, OSError):
+        return 'default'
+
+
+def run_spaced_repetition(source, args):
+    """--next / --review: выбор и оценка карточек по SM-2 (см. srs.py)."""
+    scheduler = Scheduler(args.progress_file)
+    
+    if args.review is not None:
+        item_id, grade = args.review
+        if source.get(item_id) is None:
+            print(f"Ошибка: задача с ID={item_id} не найдена!")
+            sys.exit(1)
+        try:
+            card = scheduler.review(args.user, 'tasks', item_id, grade)
+        except ValueError as e:
+            print(f"Ошибка: {e}")
+            sys.exit(1)
+        print(f"✓ Оценка {grade} для #{item_id} сохранена. "
+              f"Следующее повторение через {card.interval:g} дн.")
+        return
+    
+    item_id, state = scheduler.next_item(args.user, 'tasks', source.ids)
+    if item_id is None:
+        print("Ошибка: нет доступных карточек!")
+        sys.exit(1)
+    print_task(source.get(item_id))
+    stats = scheduler.stats(args.user, 'tasks')
+    labels = {'due': 'пора повторить', 'new': 'новая', 'ahead': 'досрочно'}
+    print(f"\n🧠 Карточка: {labels[state]} | к повторению: {stats['due']} | изучается: {stats['learning']}")
+    print(f"   Оцените себя: python {sys.argv[0]} --review {item_id} <0..5>")
+
+
+def run_with_source(source, args):
+    """
+    Выполнить команду (кроме --list) над источником задач: TaskStore,
+    бинарным кэшем или клиентом сервера — у них общий интерфейс
+    get / random / values.
+    """
+    if args.review is not None or args.next:
+        run_spaced_repetition(source, args)
+        return
+    
+    if args.solution is not None:
+        task = source.get(args.solution)
+        if task:
+            print_solution(task)
+        else:
+            print(f"Ошибка: задача с ID={args.solution} не найдена!")
+            sys.exit(1)
+    elif args.topic or args.difficulty:
+        topics = source.values('topic')
+        if args.topic and args.topic not in topics:
+            print(f"Ошибка: тема '{args.topic}' не найдена!")
+            print("\nДоступные темы:")
+            for topic in topics:
+                print(f"  - {topic}")
+            sys.exit(1)
+        difficulties = source.values('difficulty')
+        if args.difficulty and args.difficulty not in difficulties:
+            print(f"Ошибка: сложность '{args.difficulty}' не найдена!")
+            print("\nДоступные уровни сложности:")
+            for difficulty in difficulties:
+                print(f"  - {difficulty}")
+            sys.exit(1)
+        task = source.random(topic=args.topic, difficulty=args.difficulty)
+        if task is None:
+            print("Ошибка: нет задач с указанными фильтрами!")
+            sys.exit(1)
+        print_task(task)
+    else:
+        # Случайная задача
+        task = source.random()
+        if task is None:
+            print("Ошибка: нет доступных задач!")
+            sys.exit(1)
+        print_task(task)
+        print(f"\n💡 Чтобы увидеть решение, выполните: python {sys.argv[0]} --solution {task['id']}")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Генератор задач по алгоритмам для подготовки к собеседованиям',
@@ -102,6 +332,7 @@ def main():
   %(prog)s -s 42               # То же самое (короткая форма)
   %(prog)s --list              # Показать список всех задач
   %(prog)s --topic "Two pointers"  # Случайная задача из указанной темы
+  %(prog)s --difficulty Medium  # Случайная задача указанной сложности
         """
     )
     
@@ -124,6 +355,12 @@ def main():
         help='Выбрать случайную задачу из указанной темы'
     )
     
+    parser.add_argument(
+        '--difficulty',
+        type=str,
+        help='Выбрать случайную задачу указанной сложности (Easy, Medium, Hard)'
+    )
+    
     parser.add_argument(
         '--file',
         type=str,
@@ -131,38 +368,118 @@ def main():
         help='Путь к файлу с задачами (по умолчанию: tasks.json)'
     )
     
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Читать файл потоково за один проход (для очень больших файлов)'
+    )
+    
+    parser.add_argument(
+        '--rebuild-cache',
+        action='store_true',
+        help='Пересобрать бинарный кэш (<file>.cache) перед выполнением команды'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Не использовать бинарный кэш, читать JSON напрямую'
+    )
+    
+    parser.add_argument(
+        '--next',
+        action='store_true',
+        help='Следующая карточка по интервальным повторениям (SM-2)'
+    )
+    
+    parser.add_argument(
+        '--review',
+        type=int,
+        nargs=2,
+        metavar=('ID', 'GRADE'),
+        help='Оценить повторение: 0 — не вспомнил, 5 — идеально'
+    )
+    
+    parser.add_argument(
+        '--user',
+        type=str,
+        default=get_user(),
+        help='Пользователь для интервальных повторений (по умолчанию: %(default)s)'
+    )
+    
+    parser.add_argument(
+        '--progress-file',
+        type=str,
+        default='progress.log',
+        help='Лог прогресса интервальных повторений (по умолчанию: progress.log)'
+    )
+    
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        help='Запустить сервер: задачи в памяти, запросы через Unix-сокет'
+    )
+    
+    parser.add_argument(
+        '--connect',
+        action='store_true',
+        help='Выполнить команду через сервер (если он не запущен — локально)'
+    )
+    
+    parser.add_argument(
+        '--socket',
+        type=str,
+        default=None,
+        help='Путь к Unix-сокету сервера (по умолчанию: <tmp>/algo_test_tasks.sock)'
+    )
+    
+    parser.add_argument(
+        '--server-timeout',
+        type=float,
+        default=None,
+        help='Сколько секунд ждать ответа сервера, 0 — без ограничения (по умолчанию: 2)'
+    )
+    
     args = parser.parse_args()
     
-    # Загрузить задачи
-    tasks = load_tasks(args.file)
+    if args.serve or args.connect:
+        # asyncio и сокеты нужны только здесь — обычный запуск их не импортирует
+        from bank_server import CLIENT_TIMEOUT, run_server, connect, default_socket_path
+        socket_path = args.socket or default_socket_path('tasks')
     
-    # Обработка команд
+    if args.serve:
+        run_server(args.file, 'tasks', TaskStore, socket_path)
+        return
+    
+    if args.connect:
+        timeout = CLIENT_TIMEOUT if args.server_timeout is None else args.server_timeout
+        client = connect(socket_path, timeout or None)
+        if client is not None:
+            with client:
+                if args.list:
+                    list_all_tasks(client.summaries(('id', 'topic', 'title', 'difficulty')))
+                else:
+                    run_with_source(client, args)
+            return
+    
+    if args.stream and not (args.next or args.review):
+        run_streaming(args)
+        return
+    
+    # Для --list нужны все задачи — грузим JSON и строим индексы
     if args.list:
-        list_all_tasks(tasks)
-    elif args.solution is not None:
-        task = get_task_by_id(tasks, args.solution)
-        if task:
-            print_solution(task)
-        else:
-            print(f"Ошибка: задача с ID={args.solution} не найдена!")
-            sys.exit(1)
-    elif args.topic:
-        topic_tasks = [t for t in tasks if t['topic'] == args.topic]
-        if topic_tasks:
-            task = random.choice(topic_tasks)
-            print_task(task)
-        else:
-            print(f"Ошибка: тема '{args.topic}' не найдена!")
-            print("\nДоступные темы:")
-            topics = set(t['topic'] for t in tasks)
-            for topic in sorted(topics):
-                print(f"  - {topic}")
-            sys.exit(1)
-    else:
-        # Случайная задача
-        task = get_random_task(tasks)
-        print_task(task)
-        print(f"\n💡 Чтобы увидеть решение, выполните: python {sys.argv[0]} --solution {task['id']}")
+        list_all_tasks(TaskStore.from_file(args.file))
+        return
+    
+    # Остальным командам нужна одна задача — читаем её из бинарного кэша,
+    # а если он недоступен, работаем с JSON через TaskStore
+    source = None
+    if not args.no_cache:
+        source = open_bank(args.file, 'tasks', rebuild=args.rebuild_cache)
+    if source is None:
+        source = TaskStore.from_file(args.file)
+    
+    run_with_source(source, args)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк потребителя: по одной записи (как consumer.py) против ConsumerRunner.
+
+Топик заполняется --messages сообщениями {'num': n} с ключами, затем
+каждый подход читает его целиком своей группой. Обработка записи —
+ожидание --work-ms (как запрос в базу или HTTP) плюс json.loads.
+
+Печатает сообщений/с, сколько раз партиции приостанавливались и сколько
+было commit. Для ConsumerRunner дополнительно проверяется, что записи
+каждой партиции (или ключа) обработаны по порядку.
+
+С --dedup добавляется TransactionalRunner (pipeline.dedup): обработка
+poll'а, ключи и смещения в одной транзакции SQLite — без фильтра Блума
+и с ним. Он обрабатывает пачку в одном потоке, commit — на каждый poll.
+
+Использование (из каталога kafka/):
+    python bench_consumer.py --fake
+    python bench_consumer.py --fake --messages 1000000 --work-ms 0 --workers 1 4
+    python bench_consumer.py --fake --ordering key --workers 16
+    python bench_consumer.py --fake --dedup --messages 300000 --work-ms 0
+    python bench_consumer.py --topic bench-consumer      # Kafka из docker-compose.yml
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from pipeline import ConsumerRunner, DedupStore, FakeBroker, TransactionalRunner
+
+
+def fill(broker_or_bootstrap, args):
+    """Записать --messages сообщений в топик."""
+    if isinstance(broker_or_bootstrap, FakeBroker):
+        broker_or_bootstrap.create_topic(args.topic, args.partitions)
+        producer = broker_or_bootstrap.producer(linger_ms=5, batch_size=64 * 1024)
+    else:
+        from kafka import KafkaProducer
+        producer = KafkaProducer(bootstrap_servers=broker_or_bootstrap, linger_ms=5, batch_size=64 * 1024)
+    for n in range(args.messages):
+        producer.send(args.topic, json.dumps({'num': n}).encode('utf-8'), key=b'user-%d' % (n % args.keys))
+    producer.flush()
+    producer.close()
+
+
+def make_consumer(broker, args, **options):
+    options.update(group_id=f'bench-{uuid.uuid4().hex[:8]}', auto_offset_reset='earliest',
+                   max_poll_records=500)
+    if broker is not None:
+        return broker.consumer(args.topic, **options)
+    from kafka import KafkaConsumer
+    return KafkaConsumer(args.topic, bootstrap_servers=args.bootstrap, **options)
+
+
+def work(args):
+    delay = args.work_ms / 1000
+
+    def handle(record):
+        if delay:
+            time.sleep(delay)
+        json.loads(record.value)
+
+    return handle
+
+
+def run_one_by_one(broker, args):
+    """Как consumer.py: цикл по записям и автокоммит."""
+    consumer = make_consumer(broker, args, enable_auto_commit=True, consumer_timeout_ms=1000)
+    handle = work(args)
+    count = 0
+    start = time.perf_counter()
+    for record in consumer:
+        handle(record)
+        count += 1
+        if count >= args.messages:
+            break
+    elapsed = time.perf_counter() - start
+    consumer.close()
+    return {'approach': 'one_by_one', 'workers': 1, 'processed': count, 'elapsed': elapsed,
+            'msgs_per_sec': count / elapsed, 'pauses': 0, 'commits': None, 'ordered': True}
+
+
+def run_runner(broker, args, workers):
+    consumer = make_consumer(broker, args, enable_auto_commit=False)
+    handle = work(args)
+    seen = {}
+    lock = threading.Lock()
+
+    def tracked(record):
+        handle(record)
+        lane = (record.partition, record.key if args.ordering == 'key' else None)
+        with lock:
+            seen.setdefault(lane, []).append(record.offset)
+
+    runner = ConsumerRunner(consumer, tracked, workers, ordering=args.ordering, max_pending=args.max_pending)
+    start = time.perf_counter()
+    m = runner.run(max_records=args.messages, idle_timeout=2.0)
+    elapsed = time.perf_counter() - start
+    consumer.close()
+    ordered = all(offsets == sorted(offsets) for offsets in seen.values())
+    return {'approach': f'runner/{args.ordering}', 'workers': workers, 'processed': m['processed'],
+            'elapsed': elapsed, 'msgs_per_sec': m['processed'] / elapsed, 'pauses': m['pauses'],
+            'commits': m['commits'], 'ordered': ordered}
+
+
+def run_transactional(broker, args, error_rate):
+    consumer = make_consumer(broker, args, enable_auto_commit=False)
+    handle = work(args)
+
+    def handle_batch(records, tx):
+        for record in records:
+            handle(record)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = DedupStore(os.path.join(tmp, 'dedup.sqlite'), window=args.dedup_window, error_rate=error_rate)
+        runner = TransactionalRunner(consumer, handle_batch, store)
+        start = time.perf_counter()
+        m = runner.run(max_records=args.messages, idle_timeout=2.0)
+        elapsed = time.perf_counter() - start
+        store.close()
+    consumer.close()
+    name = 'dedup+bloom' if error_rate is not None else 'dedup'
+    return {'approach': name, 'workers': 1, 'processed': m['processed'], 'elapsed': elapsed,
+            'msgs_per_sec': m['processed'] / elapsed, 'pauses': 0, 'commits': m['batches'], 'ordered': True}
+
+
+def format_row(m):
+    return (f"{m['approach']:<18} {m['workers']:>7} {m['processed']:>10} {m['msgs_per_sec']:>10.0f} "
+            f"{m['pauses']:>6} {str(m['commits']):>6} {'да' if m['ordered'] else 'НЕТ':>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк ConsumerRunner')
+    parser.add_argument('--bootstrap', default='localhost:9092', help='Адрес брокера')
+    parser.add_argument('--fake', action='store_true', help='FakeBroker в процессе вместо Kafka')
+    parser.add_argument('--topic', default='bench-consumer', help='Топик')
+    parser.add_argument('--partitions', type=int, default=8, help='Партиций (для --fake)')
+    parser.add_argument('--messages', type=int, default=20_000, help='Сообщений в топике')
+    parser.add_argument('--keys', type=int, default=1000, help='Разных ключей')
+    parser.add_argument('--no-fill', action='store_true', help='Не заполнять топик (уже заполнен)')
+    parser.add_argument('--work-ms', type=float, default=1.0, help='Время обработки записи, мс')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16], help='Потоков ConsumerRunner')
+    parser.add_argument('--ordering', choices=['partition', 'key'], default='partition',
+                        help='Порядок внутри партиции или внутри ключа')
+    parser.add_argument('--max-pending', type=int, default=1000, help='Записей в работе на партицию')
+    parser.add_argument('--dedup', action='store_true', help='Добавить TransactionalRunner')
+    parser.add_argument('--dedup-window', type=int, default=1_000_000, help='Окно дедупликации, ключей')
+    parser.add_argument('--skip-baseline', action='store_true', help='Не запускать обработку по одной')
+    parser.add_argument('--json', action='store_true', help='Вывести метрики в JSON')
+    args = parser.parse_args()
+
+    if args.messages <= 0 or args.keys <= 0:
+        print("Ошибка: --messages и --keys должны быть положительными")
+        sys.exit(1)
+
+    broker = FakeBroker(num_partitions=args.partitions) if args.fake else None
+    try:
+        if not args.no_fill:
+            start = time.perf_counter()
+            fill(broker if broker else args.bootstrap, args)
+            if not args.json:
+                print(f"топик {args.topic}: {args.messages} сообщений за {time.perf_counter() - start:.1f} с, "
+                      f"обработка {args.work_ms} мс на запись\n")
+        if not args.json:
+            print(f"{'подход':<18} {'потоков':>7} {'записей':>10} {'сообщ/с':>10} "
+                  f"{'pause':>6} {'commit':>6} {'порядок':>8}")
+        results = []
+        runs = [] if args.skip_baseline else [lambda: run_one_by_one(broker, args)]
+        runs += [lambda w=w: run_runner(broker, args, w) for w in args.workers]
+        if args.dedup:
+            runs += [lambda: run_transactional(broker, args, None), lambda: run_transactional(broker, args, 0.01)]
+        for run in runs:
+            m = run()
+            results.append(m)
+            if not args.json:
+                print(format_row(m))
+    finally:
+        if broker:
+            broker.close()
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
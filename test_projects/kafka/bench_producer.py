@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк пропускной способности BatchProducer: linger_ms, batch_size и сжатие.
+
+Для каждого сочетания --linger-ms x --compression отправляет --messages
+сообщений, дожидается подтверждения всех (close) и печатает сообщений/с,
+МБ/с сериализованных значений и p50/p99 задержки от send до подтверждения.
+
+Сообщение — {'num': n} как в producer.py; с --record-bytes к нему
+добавляется поле payload из слов (сжимается примерно как текстовые данные).
+
+Брокер — из docker-compose.yml (docker compose up -d в этом каталоге) или,
+с --fake, FakeBroker в процессе: журналы пишутся во временный каталог
+(или в --data-dir), и туда же упирается пропускная способность.
+
+Использование (из каталога kafka/):
+    python bench_producer.py
+    python bench_producer.py --messages 1000000 --linger-ms 0 5 50 --compression none gzip
+    python bench_producer.py --record-bytes 1024 --batch-size 262144
+    python bench_producer.py --fake --messages 2000000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from pipeline import BatchProducer, FakeBroker, ProducerConfig, kafka_producer
+
+
+WORDS = ('pokemon', 'ability', 'species', 'evolution', 'generation', 'type',
+         'fire', 'water', 'grass', 'electric', 'psychic', 'dragon', 'level', 'move')
+
+
+def make_payloads(record_bytes, count=100, seed=0):
+    """count разных строк примерно по record_bytes байт."""
+    rng = random.Random(seed)
+    payloads = []
+    for _ in range(count):
+        words = []
+        size = 0
+        while size < record_bytes:
+            word = rng.choice(WORDS)
+            words.append(word)
+            size += len(word) + 1
+        payloads.append(' '.join(words))
+    return payloads
+
+
+def run(args, linger_ms, compression, factory=kafka_producer):
+    """Один прогон; возвращает метрики BatchProducer."""
+    config = ProducerConfig(linger_ms=linger_ms, batch_size=args.batch_size, compression=compression,
+                            max_in_flight=args.max_in_flight, acks=args.acks)
+    payloads = make_payloads(args.record_bytes) if args.record_bytes else None
+    producer = BatchProducer(args.bootstrap, config, producer_factory=factory)
+    start = time.perf_counter()
+    try:
+        for n in range(args.messages):
+            value = {'num': n}
+            if payloads:
+                value['payload'] = payloads[n % len(payloads)]
+            producer.send(args.topic, value)
+    finally:
+        producer.close()
+    elapsed = time.perf_counter() - start
+    metrics = producer.metrics()
+    metrics.update(
+        linger_ms=linger_ms,
+        compression=compression,
+        elapsed=elapsed,
+        msgs_per_sec=metrics['delivered'] / elapsed,
+        mb_per_sec=producer.stats.bytes / 2**20 / elapsed,
+    )
+    return metrics
+
+
+def format_row(m):
+    return (f"{m['linger_ms']:>7} {str(m['compression']):>6} {m['delivered']:>10} {m['failed']:>6} "
+            f"{m['msgs_per_sec']:>10.0f} {m['mb_per_sec']:>8.2f} "
+            f"{m['latency_p50'] * 1000:>8.1f} {m['latency_p99'] * 1000:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк BatchProducer')
+    parser.add_argument('--bootstrap', default='localhost:9092', help='Адрес брокера')
+    parser.add_argument('--fake', action='store_true', help='FakeBroker в процессе вместо Kafka')
+    parser.add_argument('--data-dir', default=None, help='Каталог данных FakeBroker (по умолчанию временный)')
+    parser.add_argument('--topic', default='bench-producer', help='Топик')
+    parser.add_argument('--messages', type=int, default=200_000, help='Сообщений на прогон')
+    parser.add_argument('--record-bytes', type=int, default=0,
+                        help='Добавить к {"num": n} текст примерно такого размера')
+    parser.add_argument('--linger-ms', type=int, nargs='+', default=[0, 5, 50], help='Значения linger_ms')
+    parser.add_argument('--compression', nargs='+', default=['none', 'gzip'],
+                        help='Сжатие: none, gzip, snappy, lz4, zstd')
+    parser.add_argument('--batch-size', type=int, default=64 * 1024, help='Размер батча, байт')
+    parser.add_argument('--max-in-flight', type=int, default=10_000,
+                        help='Сообщений без подтверждения, дальше send() ждёт')
+    parser.add_argument('--acks', default='1', help='0, 1 или all')
+    parser.add_argument('--json', action='store_true', help='Вывести метрики в JSON')
+    args = parser.parse_args()
+
+    if args.messages <= 0:
+        print("Ошибка: --messages должно быть положительным")
+        sys.exit(1)
+    if args.acks != 'all':
+        args.acks = int(args.acks)
+
+    broker = FakeBroker(args.data_dir) if args.fake else None
+    factory = broker.producer if broker else kafka_producer
+    results = []
+    if not args.json:
+        where = f"FakeBroker {broker.path}" if broker else f"брокер {args.bootstrap}"
+        print(f"{where}, топик {args.topic}, {args.messages} сообщений\n")
+        print(f"{'linger':>7} {'сжатие':>6} {'доставлено':>10} {'ошибок':>6} "
+              f"{'сообщ/с':>10} {'МБ/с':>8} {'p50, мс':>8} {'p99, мс':>8}")
+    try:
+        for linger_ms in args.linger_ms:
+            for compression in args.compression:
+                try:
+                    m = run(args, linger_ms, None if compression == 'none' else compression, factory)
+                except (ImportError, ValueError, ConnectionError) as e:
+                    print(f"Ошибка: {e}")
+                    sys.exit(1)
+                results.append(m)
+                if not args.json:
+                    print(format_row(m))
+    finally:
+        if broker:
+            broker.close()
+    if args.json:
+        print(json.dumps(results, indent=2, default=str))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Микробенчмарк сериализаторов: байт на сообщение и нс на encode / decode.
+
+Два вида сообщений: {'num': n} из producer.py и запись покемона побольше
+(числа, строки, флаг). Для каждого сериализатора из pipeline.serializers
+печатает средний размер, время encode и decode одного сообщения, и decode
+из memoryview — так читаются значения, лежащие подряд в одном буфере
+(батче), без нарезки на отдельные bytes.
+
+Базовая строка json+decode — как в consumer.py: loads(x.decode('utf-8')).
+
+Использование (из каталога kafka/):
+    python bench_serializers.py
+    python bench_serializers.py --count 200000 --record large
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from pipeline.serializers import MsgpackSerializer, make_serializer
+
+
+SCHEMAS = {
+    'small': [('num', 'int64')],
+    'large': [
+        ('num', 'int64'), ('id', 'int32'), ('base_experience', 'int32'), ('height', 'int16'),
+        ('weight', 'int32'), ('is_default', 'bool'), ('score', 'float64'),
+        ('name', 'str'), ('url', 'str'), ('description', 'str'),
+    ],
+}
+
+
+def make_record(kind, n):
+    if kind == 'small':
+        return {'num': n}
+    return {
+        'num': n, 'id': n % 1025 + 1, 'base_experience': 64 + n % 300, 'height': 7 + n % 20,
+        'weight': 69 + n % 1000, 'is_default': n % 7 != 0, 'score': n / 3,
+        'name': f'pokemon-{n}', 'url': f'https://pokeapi.co/api/v2/pokemon/{n}/',
+        'description': 'When the bulb on its back grows large, it appears to lose the ability '
+                       'to stand on its hind legs.',
+    }
+
+
+class LegacyJson:
+    """Как в producer.py / consumer.py."""
+
+    def encode(self, value):
+        return json.dumps(value).encode('utf-8')
+
+    def decode(self, data):
+        return json.loads(bytes(data).decode('utf-8'))
+
+
+def serializers(kind):
+    result = {'json (как сейчас)': LegacyJson(), 'json': make_serializer('json'),
+              'schema': make_serializer('schema', fields=SCHEMAS[kind])}
+    native = MsgpackSerializer()
+    if native.native:
+        result['msgpack (C)'] = native
+    result['msgpack (python)'] = MsgpackSerializer(native=False)
+    return result
+
+
+def measure(serializer, records):
+    start = time.perf_counter_ns()
+    encoded = [serializer.encode(record) for record in records]
+    encode_ns = (time.perf_counter_ns() - start) / len(records)
+
+    start = time.perf_counter_ns()
+    for data in encoded:
+        serializer.decode(data)
+    decode_ns = (time.perf_counter_ns() - start) / len(records)
+
+    # Все значения в одном буфере, как в батче; decode получает срезы memoryview
+    buffer = memoryview(b''.join(encoded))
+    views = []
+    position = 0
+    for data in encoded:
+        views.append(buffer[position:position + len(data)])
+        position += len(data)
+    start = time.perf_counter_ns()
+    for view in views:
+        serializer.decode(view)
+    view_ns = (time.perf_counter_ns() - start) / len(records)
+
+    assert serializer.decode(encoded[-1]) == records[-1]
+    return {
+        'bytes': sum(map(len, encoded)) / len(encoded),
+        'encode_ns': encode_ns,
+        'decode_ns': decode_ns,
+        'decode_view_ns': view_ns,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Микробенчмарк сериализаторов')
+    parser.add_argument('--count', type=int, default=100_000, help='Сообщений на замер')
+    parser.add_argument('--record', choices=['small', 'large', 'both'], default='both', help='Вид сообщения')
+    parser.add_argument('--json', action='store_true', help='Вывести метрики в JSON')
+    args = parser.parse_args()
+
+    if args.count <= 0:
+        print("Ошибка: --count должно быть положительным")
+        sys.exit(1)
+
+    results = []
+    for kind in (['small', 'large'] if args.record == 'both' else [args.record]):
+        records = [make_record(kind, n) for n in range(args.count)]
+        if not args.json:
+            print(f"\n{kind}: {args.count} сообщений")
+            print(f"{'сериализатор':<18} {'байт':>7} {'encode, нс':>11} {'decode, нс':>11} {'из view, нс':>12}")
+        for name, serializer in serializers(kind).items():
+            m = measure(serializer, records)
+            m.update(record=kind, serializer=name)
+            results.append(m)
+            if not args.json:
+                print(f"{name:<18} {m['bytes']:>7.1f} {m['encode_ns']:>11.0f} {m['decode_ns']:>11.0f} "
+                      f"{m['decode_view_ns']:>12.0f}")
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,31 @@
-from json import loads
 from kafka import KafkaConsumer
 
+from pipeline import ConsumerRunner, make_serializer
 
-# generating the Kafka Consumer
+
+# формат значений должен совпадать с producer.py
+serializer = make_serializer('json')
+
+
+# generating the Kafka Consumer: смещения фиксирует ConsumerRunner,
+# и только для обработанных сообщений
 my_consumer = KafkaConsumer(
     'testnum',
      bootstrap_servers=['localhost: 9092'],
      auto_offset_reset='earliest',
-     enable_auto_commit=True,
+     enable_auto_commit=False,
      group_id='my-group',
-     value_deserializer=lambda x: loads(x.decode('utf-8'))
+     value_deserializer=serializer.decode
 )
 
 
-for message in my_consumer:
-    message = message.value
-    print(f"received message: {message}")
+def handle(message):
+    print(f"received message: {message.value}")
+
+
+# партиции обрабатываются параллельно, сообщения одной партиции — по порядку
+runner = ConsumerRunner(my_consumer, handle, workers=4)
+try:
+    runner.run(on_metrics=print, metrics_interval=10)
+finally:
+    my_consumer.close()
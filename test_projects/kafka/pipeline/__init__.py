@@ -0,0 +1,52 @@
+"""
+Производители и потребители Kafka для конвейеров загрузки данных.
+
+producer.py и consumer.py рядом — минимальные примеры kafka-python;
+здесь то, что нужно под нагрузкой: батчи, сжатие и подтверждения
+доставки (producer.py), параллельная обработка с commit только
+обработанного (consumer.py), почти exactly-once с дедупликацией и
+смещениями в одной транзакции SQLite (dedup.py), компактные форматы
+значений (serializers.py). Без Docker всё это работает с брокером в процессе
+(broker.py): журналы партиций на диске (log.py) и клиенты с интерфейсом
+kafka-python (fake_client.py).
+
+Использование (из каталога kafka/):
+    from pipeline import BatchProducer, ProducerConfig
+
+    with BatchProducer('localhost:9092', ProducerConfig(linger_ms=20, compression='gzip')) as producer:
+        for n in range(500):
+            producer.send('testnum', {'num': n})
+
+    with FakeBroker() as broker:
+        with BatchProducer(config=ProducerConfig(), producer_factory=broker.producer) as producer:
+            ...
+"""
+
+from .broker import FakeBroker, GroupCoordinator
+from .consumer import ConsumerRunner, OffsetTracker
+from .dedup import BloomFilter, DedupStore, TransactionalRunner, record_key
+from .fake_client import (
+    CommitFailedError, ConsumerRecord, DeliveryFuture, FakeConsumer, FakeProducer, OffsetAndMetadata,
+    RecordMetadata, TopicPartition,
+)
+from .log import CODECS, OffsetIndex, PartitionLog, Segment
+from .producer import (
+    COMPRESSION, BatchProducer, DeliveryStats, ProducerBufferFull, ProducerConfig,
+    json_serializer, kafka_producer,
+)
+from .serializers import (
+    SCHEMA_TYPES, SERIALIZERS, JsonSerializer, MsgpackSerializer, SchemaSerializer, make_serializer,
+)
+
+
+__all__ = [
+    'COMPRESSION', 'BatchProducer', 'DeliveryStats', 'ProducerBufferFull', 'ProducerConfig',
+    'json_serializer', 'kafka_producer',
+    'FakeBroker', 'GroupCoordinator', 'FakeProducer', 'FakeConsumer', 'DeliveryFuture',
+    'TopicPartition', 'OffsetAndMetadata', 'RecordMetadata', 'ConsumerRecord', 'CommitFailedError',
+    'CODECS', 'PartitionLog', 'Segment', 'OffsetIndex',
+    'ConsumerRunner', 'OffsetTracker',
+    'DedupStore', 'BloomFilter', 'TransactionalRunner', 'record_key',
+    'SERIALIZERS', 'SCHEMA_TYPES', 'JsonSerializer', 'SchemaSerializer', 'MsgpackSerializer',
+    'make_serializer',
+]
@@ -0,0 +1,249 @@
+"""
+Брокер Kafka в процессе: топики, партиции, смещения, группы потребителей.
+
+producer.py и consumer.py работают только с Zookeeper/Kafka из
+docker-compose.yml. FakeBroker хранит партиции так же, как Kafka (см.
+log.py), и раздаёт клиентов с интерфейсом kafka-python (см. fake_client.py),
+поэтому конвейеры можно гонять на миллионах сообщений без Docker.
+
+Зафиксированные смещения групп дописываются в файл __consumer_offsets
+(строка JSON на commit) и переживают перезапуск брокера с тем же path.
+
+Чего нет: сети и протокола Kafka, репликации, retention, транзакций,
+heartbeat'ов — потребитель выходит из группы только через close().
+
+Использование:
+    with FakeBroker(num_partitions=3) as broker:
+        producer = broker.producer(linger_ms=5, compression_type='gzip')
+        producer.send('testnum', b'{"num": 1}')
+        producer.close()
+        consumer = broker.consumer('testnum', group_id='my-group', auto_offset_reset='earliest')
+        print(consumer.poll(timeout_ms=1000))
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+
+from .fake_client import CommitFailedError, FakeConsumer, FakeProducer, TopicPartition
+from .log import PartitionLog, encode_batch
+
+
+class _Group:
+    def __init__(self):
+        self.generation = 0
+        self.members = {}      # member_id -> топики подписки
+        self.assignment = {}   # member_id -> [TopicPartition]
+
+
+class GroupCoordinator:
+    """Участники групп, распределение партиций и зафиксированные смещения."""
+
+    def __init__(self, path, partitions):
+        self.path = path
+        self._partitions = partitions
+        self._groups = {}
+        self._committed = {}   # (группа, TopicPartition) -> смещение
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Недописанная при аварии строка
+                        continue
+                    for topic, partition, offset in entry['offsets']:
+                        self._committed[entry['group'], TopicPartition(topic, partition)] = offset
+        self._log = open(path, 'a')
+
+    def _rebalance(self, group):
+        """Range assignor: партиции каждого топика — подряд идущими кусками по участникам."""
+        group.generation += 1
+        group.assignment = {member: [] for member in group.members}
+        topics = sorted({topic for subscribed in group.members.values() for topic in subscribed})
+        for topic in topics:
+            members = sorted(member for member, subscribed in group.members.items() if topic in subscribed)
+            count = self._partitions(topic)
+            per_member, extra = divmod(count, len(members))
+            start = 0
+            for i, member in enumerate(members):
+                size = per_member + (1 if i < extra else 0)
+                group.assignment[member] += [TopicPartition(topic, p) for p in range(start, start + size)]
+                start += size
+
+    def join(self, group_id, topics):
+        """Вступить в группу; возвращает member_id."""
+        member = f'{group_id}-{uuid.uuid4().hex[:12]}'
+        with self._lock:
+            group = self._groups.setdefault(group_id, _Group())
+            group.members[member] = tuple(topics)
+            self._rebalance(group)
+        return member
+
+    def leave(self, group_id, member):
+        with self._lock:
+            group = self._groups.get(group_id)
+            if group is not None and group.members.pop(member, None) is not None:
+                self._rebalance(group)
+
+    def assignment(self, group_id, member):
+        """(поколение группы, партиции участника)."""
+        with self._lock:
+            group = self._groups[group_id]
+            return group.generation, list(group.assignment.get(member, []))
+
+    def commit(self, group_id, member, generation, offsets):
+        """Зафиксировать {TopicPartition: смещение}; после перебалансировки — CommitFailedError."""
+        with self._lock:
+            group = self._groups.get(group_id)
+            if group is None or member not in group.members or group.generation != generation:
+                raise CommitFailedError(f"группа {group_id} перебалансирована, commit отклонён")
+            owned = set(group.assignment[member])
+            foreign = [tp for tp in offsets if tp not in owned]
+            if foreign:
+                raise CommitFailedError(f"партиции {foreign} не назначены этому потребителю")
+            for tp, offset in offsets.items():
+                self._committed[group_id, tp] = offset
+            self._log.write(json.dumps({
+                'group': group_id,
+                'offsets': [[tp.topic, tp.partition, offset] for tp, offset in offsets.items()],
+            }) + '\n')
+            self._log.flush()
+
+    def committed(self, group_id, tp):
+        with self._lock:
+            return self._committed.get((group_id, tp))
+
+    def close(self):
+        """Переписать файл смещений одной записью на партицию."""
+        with self._lock:
+            self._log.close()
+            by_group = {}
+            for (group_id, tp), offset in self._committed.items():
+                by_group.setdefault(group_id, []).append([tp.topic, tp.partition, offset])
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as f:
+                for group_id, offsets in by_group.items():
+                    f.write(json.dumps({'group': group_id, 'offsets': offsets}) + '\n')
+            os.replace(tmp, self.path)
+
+
+class FakeBroker:
+    """
+    Брокер в процессе (см. модуль).
+
+    path            — каталог данных (None — временный, удаляется в close)
+    num_partitions  — партиций у автоматически созданного топика
+    segment_bytes, index_interval, index_max_bytes — см. log.PartitionLog
+    """
+
+    def __init__(self, path=None, num_partitions=3, segment_bytes=64 * 2**20, index_interval=4096,
+                 index_max_bytes=2**20):
+        self._tmp = path is None
+        self.path = tempfile.mkdtemp(prefix='fake-kafka-') if path is None else path
+        os.makedirs(self.path, exist_ok=True)
+        self.num_partitions = num_partitions
+        self._log_options = dict(segment_bytes=segment_bytes, index_interval=index_interval,
+                                 index_max_bytes=index_max_bytes)
+        self._topics = {}
+        self._lock = threading.Lock()
+        # Счётчик дописанных батчей: потребители ждут его изменения в poll
+        self._appended = threading.Condition()
+        self.appends = 0
+
+        found = {}
+        for name in os.listdir(self.path):
+            topic, _, partition = name.rpartition('-')
+            if topic and partition.isdigit() and os.path.isdir(os.path.join(self.path, name)):
+                found.setdefault(topic, []).append(int(partition))
+        for topic, partitions in found.items():
+            self.create_topic(topic, max(partitions) + 1)
+        self.groups = GroupCoordinator(os.path.join(self.path, '__consumer_offsets'), self.partitions)
+
+    def create_topic(self, topic, partitions=None):
+        """Создать топик (или вернуть существующий); возвращает число партиций."""
+        with self._lock:
+            if topic not in self._topics:
+                count = partitions or self.num_partitions
+                self._topics[topic] = [
+                    PartitionLog(os.path.join(self.path, f'{topic}-{p}'), **self._log_options)
+                    for p in range(count)
+                ]
+            return len(self._topics[topic])
+
+    def topics(self):
+        with self._lock:
+            return set(self._topics)
+
+    def partitions(self, topic):
+        """Число партиций; неизвестный топик создаётся, как при allow_auto_create_topics."""
+        logs = self._topics.get(topic)
+        return len(logs) if logs is not None else self.create_topic(topic)
+
+    def _log(self, topic, partition):
+        self.partitions(topic)
+        return self._topics[topic][partition]
+
+    def append_batch(self, topic, partition, count, codec_id, payload, timestamp=None):
+        """Дописать батч, собранный log.encode_batch; возвращает смещение первой записи."""
+        base_offset = self._log(topic, partition).append(count, codec_id, payload, timestamp)
+        with self._appended:
+            self.appends += 1
+            self._appended.notify_all()
+        return base_offset
+
+    def append(self, topic, partition, records, compression=None):
+        """Дописать [(key, value)] одним батчем, без производителя."""
+        codec_id, payload = encode_batch(records, compression)
+        return self.append_batch(topic, partition, len(records), codec_id, payload)
+
+    def fetch(self, topic, partition, offset, max_records=500, max_bytes=2**20):
+        """[(смещение, время, key, value)] начиная с offset."""
+        return self._log(topic, partition).read(offset, max_records, max_bytes)
+
+    def wait_for_append(self, seen, timeout):
+        """Ждать, пока appends не станет больше seen (не дольше timeout)."""
+        with self._appended:
+            return self._appended.wait_for(lambda: self.appends != seen, timeout)
+
+    def beginning_offset(self, topic, partition):
+        return self._log(topic, partition).start_offset
+
+    def end_offset(self, topic, partition):
+        return self._log(topic, partition).end_offset
+
+    def producer(self, bootstrap_servers=None, **options):
+        """FakeProducer; подходит как producer_factory для BatchProducer."""
+        return FakeProducer(self, **options)
+
+    def consumer(self, *topics, **options):
+        """FakeConsumer с параметрами KafkaConsumer (group_id, auto_offset_reset...)."""
+        options.pop('bootstrap_servers', None)
+        return FakeConsumer(self, *topics, **options)
+
+    def flush(self):
+        """fsync активных сегментов (по умолчанию данные остаются в page cache, как у Kafka)."""
+        with self._lock:
+            for logs in self._topics.values():
+                for log in logs:
+                    log.flush()
+
+    def close(self):
+        self.groups.close()
+        with self._lock:
+            for logs in self._topics.values():
+                for log in logs:
+                    log.close()
+            self._topics.clear()
+        if self._tmp:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,330 @@
+"""
+Потребитель Kafka: пакетный poll, параллельная обработка, commit только обработанного.
+
+consumer.py читает по одной записи с enable_auto_commit=True: обработка
+идёт в одном потоке, а автокоммит фиксирует смещения записей, которые
+ещё не обработаны (и теряются при падении). ConsumerRunner:
+    poll пачками        — до max_poll_records записей за вызов
+    пул потоков         — записи разных партиций обрабатываются параллельно;
+                          внутри партиции (ordering='partition') или внутри
+                          ключа (ordering='key') — строго по порядку
+    commit по водоразделу — для каждой партиции фиксируется смещение после
+                          непрерывного префикса обработанных записей: запись,
+                          которая ещё в работе, не даёт закоммитить следующие
+    pause / resume      — партиция, у которой в работе max_pending записей,
+                          приостанавливается и возобновляется, когда их
+                          становится вдвое меньше
+    метрики             — lag, записи в работе, скорость обработки
+
+poll, commit и pause вызываются только из потока run(): клиенты Kafka не
+потокобезопасны. Обработчик работает в пуле потоков.
+
+Использование:
+    consumer = KafkaConsumer('testnum', group_id='my-group', enable_auto_commit=False, ...)
+    runner = ConsumerRunner(consumer, handle, workers=8)
+    runner.run(on_metrics=print)
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .fake_client import CommitFailedError
+
+try:
+    from kafka.errors import CommitFailedError as KafkaCommitFailedError
+    from kafka.structs import OffsetAndMetadata
+except ImportError:
+    from .fake_client import OffsetAndMetadata
+    COMMIT_FAILED = (CommitFailedError,)
+else:
+    COMMIT_FAILED = (CommitFailedError, KafkaCommitFailedError)
+
+
+class OffsetTracker:
+    """Смещения партиции в работе и граница непрерывно обработанного префикса."""
+
+    def __init__(self, start):
+        self._pending = deque()  # отданные в обработку — по порядку
+        self._done = set()
+        self.committable = start  # следующее смещение после обработанного префикса
+
+    def add(self, offset):
+        self._pending.append(offset)
+
+    def complete(self, offset):
+        self._done.add(offset)
+        while self._pending and self._pending[0] in self._done:
+            head = self._pending.popleft()
+            self._done.discard(head)
+            self.committable = head + 1
+
+    @property
+    def in_flight(self):
+        return len(self._pending)
+
+
+class _Lane:
+    """Записи, которые обрабатываются строго по очереди."""
+
+    __slots__ = ('records', 'running')
+
+    def __init__(self):
+        self.records = deque()
+        self.running = False
+
+
+class ConsumerRunner:
+    """
+    Цикл потребителя (см. модуль).
+
+    consumer        — KafkaConsumer или FakeConsumer с enable_auto_commit=False
+    handler         — handler(record), вызывается в пуле потоков
+    workers         — потоков в пуле
+    ordering        — 'partition' или 'key' (записи без ключа — без порядка)
+    max_pending     — записей в работе на партицию, дальше pause
+    max_poll_records — записей за один poll
+    commit_interval — как часто фиксировать смещения, с
+    on_error        — on_error(record, error): запись считается обработанной
+                      (например, отправлена в dead letter); без него первая
+                      ошибка останавливает run() и пробрасывается
+    """
+
+    def __init__(self, consumer, handler, workers=4, *, ordering='partition', key_lanes=None,
+                 max_pending=1000, max_poll_records=500, poll_timeout=0.1, commit_interval=1.0,
+                 on_error=None):
+        if ordering not in ('partition', 'key'):
+            raise ValueError("ordering: 'partition' или 'key'")
+        self.consumer = consumer
+        self.handler = handler
+        self.workers = workers
+        self.ordering = ordering
+        self.key_lanes = key_lanes or workers
+        self.max_pending = max_pending
+        self.max_poll_records = max_poll_records
+        self.poll_timeout = poll_timeout
+        self.commit_interval = commit_interval
+        self.on_error = on_error
+
+        self._lock = threading.Lock()
+        self._progress = threading.Condition(self._lock)
+        self._lanes = {}
+        self._trackers = {}
+        self._committed = {}
+        self._paused = set()
+        self._stopping = False
+        self._error = None
+        self._executor = None
+
+        self.processed = 0
+        self.failed = 0
+        self.pauses = 0
+        self.commits = 0
+        self._started = None
+        self._last_sample = (time.perf_counter(), 0)
+
+    def _lane(self, tp, record):
+        if self.ordering == 'partition':
+            key = tp
+        else:
+            # Без ключа порядок не нужен — раскидываем по смещению
+            shard = hash(record.key) if record.key is not None else record.offset
+            key = (tp, shard % self.key_lanes)
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = _Lane()
+        return lane
+
+    def _dispatch(self, tp, records):
+        with self._lock:
+            tracker = self._trackers.get(tp)
+            if tracker is None:
+                tracker = self._trackers[tp] = OffsetTracker(records[0].offset)
+            for record in records:
+                tracker.add(record.offset)
+                lane = self._lane(tp, record)
+                lane.records.append((tracker, record))
+                if not lane.running:
+                    lane.running = True
+                    self._executor.submit(self._drain, lane)
+
+    def _drain(self, lane):
+        while True:
+            with self._lock:
+                if not lane.records or self._stopping:
+                    lane.running = False
+                    self._progress.notify_all()
+                    return
+                tracker, record = lane.records.popleft()
+            failed = False
+            try:
+                self.handler(record)
+            except Exception as e:
+                failed = True
+                try:
+                    if self.on_error is None:
+                        raise
+                    self.on_error(record, e)
+                except Exception as fatal:
+                    with self._lock:
+                        # Запись не обработана: водораздел на ней остановится
+                        self._error = self._error or fatal
+                        self._stopping = True
+                        self.failed += 1
+                        lane.running = False
+                        self._progress.notify_all()
+                    return
+            with self._lock:
+                tracker.complete(record.offset)
+                if failed:
+                    self.failed += 1
+                else:
+                    self.processed += 1
+                self._progress.notify_all()
+
+    def _sync_assignment(self):
+        """Забыть отозванные при перебалансировке партиции."""
+        assigned = self.consumer.assignment()
+        with self._lock:
+            for tp in list(self._trackers):
+                if tp not in assigned:
+                    del self._trackers[tp]
+                    self._committed.pop(tp, None)
+            self._paused &= assigned
+
+    def _backpressure(self):
+        with self._lock:
+            in_flight = {tp: tracker.in_flight for tp, tracker in self._trackers.items()}
+        pause = [tp for tp, n in in_flight.items() if n >= self.max_pending and tp not in self._paused]
+        resume = [tp for tp in self._paused if in_flight.get(tp, 0) <= self.max_pending // 2]
+        if pause:
+            self.consumer.pause(*pause)
+            self._paused.update(pause)
+            self.pauses += len(pause)
+        if resume:
+            self.consumer.resume(*resume)
+            self._paused.difference_update(resume)
+
+    def commit(self):
+        """Зафиксировать водоразделы, сдвинувшиеся с прошлого commit."""
+        with self._lock:
+            offsets = {tp: tracker.committable for tp, tracker in self._trackers.items()
+                       if tracker.committable > self._committed.get(tp, -1)}
+        if not offsets:
+            return
+        try:
+            self.consumer.commit({tp: OffsetAndMetadata(offset, '', -1) for tp, offset in offsets.items()})
+        except COMMIT_FAILED:
+            # Партиции уже у другого потребителя: он начнёт с прошлого commit
+            return
+        self._committed.update(offsets)
+        self.commits += 1
+
+    def stop(self):
+        """Остановить run() (из любого потока); обработанное будет закоммичено."""
+        with self._lock:
+            self._stopping = True
+            self._progress.notify_all()
+
+    def run(self, *, max_records=None, idle_timeout=None, on_metrics=None, metrics_interval=5.0):
+        """
+        Читать и обрабатывать до stop(), ошибки обработчика или условия выхода.
+
+        max_records  — остановиться, обработав столько записей
+        idle_timeout — остановиться, если столько секунд нет новых записей
+        on_metrics   — on_metrics(metrics()) каждые metrics_interval секунд
+        """
+        self._stopping = False
+        self._error = None
+        self._started = time.perf_counter()
+        self._last_sample = (self._started, self.processed)
+        next_commit = time.monotonic() + self.commit_interval
+        next_metrics = time.monotonic() + metrics_interval
+        last_data = time.monotonic()
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='consumer-worker')
+        try:
+            while True:
+                with self._lock:
+                    if self._stopping:
+                        break
+                    if max_records is not None and self.processed + self.failed >= max_records:
+                        break
+                    if self._paused and len(self._paused) == len(self._trackers):
+                        # Всё приостановлено — ждём прогресса обработки, а не данных
+                        self._progress.wait(self.poll_timeout)
+                batch = self.consumer.poll(timeout_ms=self.poll_timeout * 1000,
+                                           max_records=self.max_poll_records)
+                now = time.monotonic()
+                if batch:
+                    last_data = now
+                    self._sync_assignment()
+                    for tp, records in batch.items():
+                        self._dispatch(tp, records)
+                elif idle_timeout is not None and now - last_data >= idle_timeout and not self._busy():
+                    break
+                self._backpressure()
+                if now >= next_commit:
+                    self.commit()
+                    next_commit = now + self.commit_interval
+                if on_metrics is not None and now >= next_metrics:
+                    on_metrics(self.metrics())
+                    next_metrics = now + metrics_interval
+        finally:
+            with self._lock:
+                # При выходе по условию дорабатываем уже отданные записи
+                while any(lane.running for lane in self._lanes.values()):
+                    self._progress.wait()
+            self._executor.shutdown()
+            self.commit()
+            self._rewind()
+        if self._error is not None:
+            raise self._error
+        return self.metrics()
+
+    def _rewind(self):
+        """Вернуть позиции на водоразделы: необработанное придёт в следующем poll."""
+        assigned = self.consumer.assignment()
+        for tp, tracker in self._trackers.items():
+            if tp in assigned and tracker.in_flight:
+                self.consumer.seek(tp, tracker.committable)
+        self._trackers.clear()
+        self._lanes.clear()
+
+    def _busy(self):
+        with self._lock:
+            return any(tracker.in_flight for tracker in self._trackers.values())
+
+    def metrics(self):
+        """Метрики; end_offsets — запрос к брокеру, вызывать из потока run()."""
+        now = time.perf_counter()
+        last_time, last_processed = self._last_sample
+        self._last_sample = (now, self.processed)
+        with self._lock:
+            trackers = dict(self._trackers)
+            in_flight = {tp: tracker.in_flight for tp, tracker in trackers.items()}
+        assignment = self.consumer.assignment()
+        ends = self.consumer.end_offsets(list(assignment)) if assignment else {}
+        partitions = {}
+        for tp in assignment:
+            position = self.consumer.position(tp)
+            committed = self._committed.get(tp)
+            partitions[f'{tp.topic}-{tp.partition}'] = {
+                'lag': ends[tp] - position,
+                'in_flight': in_flight.get(tp, 0),
+                'uncommitted': position - committed if committed is not None else None,
+                'paused': tp in self._paused,
+            }
+        elapsed = now - self._started if self._started else 0.0
+        return {
+            'processed': self.processed,
+            'failed': self.failed,
+            'rate': self.processed / elapsed if elapsed else 0.0,
+            'rate_recent': (self.processed - last_processed) / (now - last_time) if now > last_time else 0.0,
+            'lag': sum(p['lag'] for p in partitions.values()),
+            'in_flight': sum(in_flight.values()),
+            'paused': len(self._paused),
+            'pauses': self.pauses,
+            'commits': self.commits,
+            'partitions': partitions,
+        }
@@ -0,0 +1,353 @@
+"""
+Почти exactly-once: хранилище обработанных ключей и смещения в одной транзакции.
+
+consumer.py с enable_auto_commit=True и auto_offset_reset='earliest' после
+перезапуска то повторяет сообщения, то теряет их: автокоммит не связан
+с обработкой. TransactionalRunner обрабатывает каждый poll одной
+транзакцией SQLite (WAL):
+    побочные эффекты обработчика (tx.execute в ту же базу)
+    ключи обработанных сообщений (таблица processed)
+    следующие смещения партиций (таблица offsets)
+Либо фиксируется всё, либо ничего. После перезапуска позиции берутся из
+offsets, а не из Kafka (commit в Kafka делается следом — для мониторинга
+lag), поэтому повтора нет даже при падении между транзакцией и commit.
+
+Ключи нужны для дублей, пришедших под другими смещениями (повторная
+отправка производителем): ключ — key сообщения или топик/партиция/смещение.
+Проверка идёт пачкой на весь poll — один SELECT ... IN (...) по
+первичному ключу. Окно дедупликации — два поколения по window // 2
+ключей: при смене поколения самое старое удаляется из таблицы.
+
+error_rate включает скользящий фильтр Блума перед таблицей (по фильтру
+на поколение): заведомо новые ключи в базу не идут. Старое поколение
+уходит из фильтра и из таблицы одновременно, поэтому ответ «нет» точен.
+Пока таблица в кеше страниц, SELECT в C быстрее фильтра на Python
+(bench_consumer.py --dedup); фильтр окупается, когда окно в кеш не
+помещается и каждый промах — чтение с диска.
+
+Эффекты вне базы (HTTP, другие системы) так не защитить — они
+выполняются хотя бы раз и должны быть идемпотентными.
+
+Использование:
+    store = DedupStore('dedup.sqlite')
+    store.execute('CREATE TABLE IF NOT EXISTS totals (num INTEGER)')
+
+    def handle(records, tx):
+        tx.executemany('INSERT INTO totals VALUES (?)', [(r.value['num'],) for r in records])
+
+    TransactionalRunner(consumer, handle, store, key=lambda r: r.key).run()
+"""
+
+import math
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from .consumer import COMMIT_FAILED, OffsetAndMetadata
+
+
+# SQLite до 3.32 не принимает больше 999 параметров в запросе
+SQL_CHUNK = 500
+
+
+class BloomFilter:
+    """Фильтр Блума на capacity ключей с долей ложных «да» около error_rate."""
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, key):
+        """Номера битов ключа; у фильтров одного размера они совпадают."""
+        # hash() случаен между процессами, но фильтры живут только в памяти
+        # и при старте строятся заново из таблицы
+        first = hash(key) & 0xffffffffffffffff
+        second = (first >> 32 | first << 32) & 0xffffffffffffffff | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key, positions=None):
+        for position in positions or self.positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def test(self, positions):
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in positions)
+
+    def __contains__(self, key):
+        return self.test(self.positions(key))
+
+
+class Transaction:
+    """Открытая транзакция DedupStore: побочные эффекты, ключи и смещения."""
+
+    def __init__(self, db):
+        self._db = db
+        self.keys = []
+        self.offsets = {}
+
+    def execute(self, sql, params=()):
+        return self._db.execute(sql, params)
+
+    def executemany(self, sql, rows):
+        return self._db.executemany(sql, rows)
+
+    def mark(self, keys):
+        """Отметить ключи обработанными (при commit транзакции)."""
+        self.keys.extend(keys)
+
+    def save_offsets(self, group, offsets):
+        """{TopicPartition: следующее смещение} группы group."""
+        for tp, offset in offsets.items():
+            self.offsets[group, tp.topic, tp.partition] = offset
+
+
+class DedupStore:
+    """
+    Обработанные ключи и смещения в SQLite (см. модуль).
+
+    path       — файл базы
+    window     — сколько последних ключей помнить (два поколения)
+    error_rate — доля ложных срабатываний фильтра Блума; None — без фильтра,
+                 каждый ключ проверяется в таблице
+    """
+
+    def __init__(self, path, window=1_000_000, error_rate=None):
+        self.path = path
+        self.generation_size = max(1, window // 2)
+        self.error_rate = error_rate
+        # isolation_level=None: транзакциями управляем сами (BEGIN / COMMIT)
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS processed ('
+                         ' key BLOB PRIMARY KEY, generation INTEGER NOT NULL) WITHOUT ROWID')
+        self._db.execute('CREATE INDEX IF NOT EXISTS processed_generation ON processed (generation)')
+        self._db.execute('CREATE TABLE IF NOT EXISTS offsets ('
+                         ' grp TEXT, topic TEXT, partition INTEGER, next_offset INTEGER,'
+                         ' PRIMARY KEY (grp, topic, partition)) WITHOUT ROWID')
+        self.generation = self._db.execute('SELECT coalesce(max(generation), 0) FROM processed').fetchone()[0]
+        self._current_count = self._db.execute(
+            'SELECT count(*) FROM processed WHERE generation = ?', (self.generation,)).fetchone()[0]
+        self._blooms = self._load_blooms()
+
+        self.lookups = 0
+        self.sql_lookups = 0
+
+    def _load_blooms(self):
+        """Фильтры текущего и прошлого поколений по содержимому таблицы."""
+        if self.error_rate is None:
+            return None
+        blooms = {}
+        for generation in (self.generation - 1, self.generation):
+            bloom = blooms[generation] = BloomFilter(self.generation_size, self.error_rate)
+            for (key,) in self._db.execute('SELECT key FROM processed WHERE generation = ?', (generation,)):
+                bloom.add(key)
+        return blooms
+
+    def execute(self, sql, params=()):
+        """Запрос вне транзакции (например, CREATE TABLE для побочных эффектов)."""
+        return self._db.execute(sql, params)
+
+    def _maybe_seen(self, key):
+        # Хеш ключа считается один раз на оба поколения
+        positions = self._blooms[self.generation].positions(key)
+        return any(bloom.test(positions) for bloom in self._blooms.values())
+
+    def seen(self, keys):
+        """Какие из keys уже обработаны: один SELECT на пачку (и только для «возможно» фильтра)."""
+        self.lookups += len(keys)
+        if self._blooms is not None:
+            keys = [key for key in keys if self._maybe_seen(key)]
+        self.sql_lookups += len(keys)
+        found = set()
+        for i in range(0, len(keys), SQL_CHUNK):
+            chunk = keys[i:i + SQL_CHUNK]
+            rows = self._db.execute(
+                f'SELECT key FROM processed WHERE key IN ({",".join("?" * len(chunk))})', chunk)
+            found.update(key for (key,) in rows)
+        return found
+
+    def offsets(self, group):
+        """{(топик, партиция): следующее смещение}, сохранённые группой group."""
+        rows = self._db.execute('SELECT topic, partition, next_offset FROM offsets WHERE grp = ?', (group,))
+        return {(topic, partition): offset for topic, partition, offset in rows}
+
+    def _rotate(self):
+        """Новое поколение; самое старое удаляется из таблицы и из фильтров."""
+        self.generation += 1
+        self._current_count = 0
+        self._db.execute('DELETE FROM processed WHERE generation <= ?', (self.generation - 2,))
+        if self._blooms is not None:
+            self._blooms.pop(self.generation - 2, None)
+            self._blooms[self.generation] = BloomFilter(self.generation_size, self.error_rate)
+
+    @contextmanager
+    def transaction(self):
+        """Транзакция: при исключении откатываются и эффекты, и ключи, и смещения."""
+        tx = Transaction(self._db)
+        self._db.execute('BEGIN IMMEDIATE')
+        generation, count = self.generation, self._current_count
+        try:
+            yield tx
+            added = []
+            pending = tx.keys
+            while pending:
+                if self._current_count >= self.generation_size:
+                    self._rotate()
+                room = self.generation_size - self._current_count
+                chunk, pending = pending[:room], pending[room:]
+                before = self._db.total_changes
+                self._db.executemany('INSERT OR IGNORE INTO processed VALUES (?, ?)',
+                                     [(key, self.generation) for key in chunk])
+                self._current_count += self._db.total_changes - before
+                added.append((self.generation, chunk))
+            self._db.executemany(
+                'INSERT INTO offsets VALUES (?, ?, ?, ?) ON CONFLICT (grp, topic, partition)'
+                ' DO UPDATE SET next_offset = excluded.next_offset',
+                [(*where, offset) for where, offset in tx.offsets.items()])
+            self._db.execute('COMMIT')
+        except BaseException:
+            self._db.execute('ROLLBACK')
+            if self.generation != generation:
+                # Смена поколения откатилась вместе с транзакцией
+                self.generation = generation
+                self._blooms = self._load_blooms()
+            self._current_count = count
+            raise
+        if self._blooms is not None:
+            for key_generation, keys in added:
+                # Поколение могло смениться дважды за большую транзакцию
+                bloom = self._blooms.get(key_generation)
+                if bloom is not None:
+                    for key in keys:
+                        bloom.add(key)
+
+    def close(self):
+        self._db.close()
+
+
+def record_key(record):
+    """Ключ по умолчанию: топик/партиция/смещение."""
+    return f'{record.topic}/{record.partition}/{record.offset}'.encode()
+
+
+class TransactionalRunner:
+    """
+    Цикл потребителя с дедупликацией и транзакционными смещениями (см. модуль).
+
+    consumer — KafkaConsumer или FakeConsumer с enable_auto_commit=False
+    handler  — handler(records, tx): новые записи poll'а и транзакция
+    store    — DedupStore
+    key      — key(record) -> bytes; по умолчанию record_key
+    group    — имя группы для таблицы offsets (по умолчанию group_id потребителя)
+    """
+
+    def __init__(self, consumer, handler, store, *, key=record_key, group=None,
+                 max_poll_records=500, poll_timeout=0.1):
+        self.consumer = consumer
+        self.handler = handler
+        self.store = store
+        self.key = key
+        self.group = group or getattr(consumer, 'group_id', None) or consumer.config['group_id']
+        self.max_poll_records = max_poll_records
+        self.poll_timeout = poll_timeout
+
+        self._assignment = set()
+        self._positions = {}   # TopicPartition -> следующее смещение из store
+        self.processed = 0
+        self.duplicates = 0
+        self.batches = 0
+        self._started = None
+
+    def _sync_assignment(self):
+        """Новым партициям — позиции из store: они точнее commit'а в Kafka."""
+        assigned = self.consumer.assignment()
+        if assigned == self._assignment:
+            return
+        stored = self.store.offsets(self.group)
+        for tp in assigned - self._assignment:
+            offset = stored.get((tp.topic, tp.partition))
+            if offset is not None:
+                self.consumer.seek(tp, offset)
+                self._positions[tp] = offset
+        for tp in self._assignment - assigned:
+            self._positions.pop(tp, None)
+        self._assignment = assigned
+
+    def _process(self, batch):
+        fresh = []
+        offsets = {}
+        for tp, records in batch.items():
+            start = self._positions.get(tp)
+            for record in records:
+                # Уже зафиксированные смещения (poll успел до seek) — повтор
+                if start is not None and record.offset < start:
+                    self.duplicates += 1
+                    continue
+                fresh.append(record)
+            offsets[tp] = records[-1].offset + 1
+        keys = [self.key(record) for record in fresh]
+        seen = self.store.seen(keys)
+        records = []
+        new_keys = []
+        for record, key in zip(fresh, keys):
+            if key in seen:
+                self.duplicates += 1
+                continue
+            # Дубль внутри одного poll
+            seen.add(key)
+            records.append(record)
+            new_keys.append(key)
+
+        try:
+            with self.store.transaction() as tx:
+                if records:
+                    self.handler(records, tx)
+                tx.mark(new_keys)
+                tx.save_offsets(self.group, offsets)
+        except BaseException:
+            # Транзакция откатилась — читаем эти записи заново
+            for tp in offsets:
+                self.consumer.seek(tp, self._positions.get(tp, batch[tp][0].offset))
+            raise
+        self._positions.update(offsets)
+        self.processed += len(records)
+        self.batches += 1
+        try:
+            self.consumer.commit({tp: OffsetAndMetadata(offset, '', -1) for tp, offset in offsets.items()})
+        except COMMIT_FAILED:
+            # Не страшно: после перебалансировки позиции возьмутся из store
+            pass
+
+    def run(self, *, max_records=None, idle_timeout=None, on_metrics=None, metrics_interval=5.0):
+        """Читать до max_records / idle_timeout; ошибка обработчика откатывает poll и пробрасывается."""
+        self._started = time.perf_counter()
+        next_metrics = time.monotonic() + metrics_interval
+        last_data = time.monotonic()
+        while max_records is None or self.processed + self.duplicates < max_records:
+            self._sync_assignment()
+            batch = self.consumer.poll(timeout_ms=self.poll_timeout * 1000, max_records=self.max_poll_records)
+            now = time.monotonic()
+            if batch:
+                last_data = now
+                self._sync_assignment()
+                self._process(batch)
+            elif idle_timeout is not None and now - last_data >= idle_timeout:
+                break
+            if on_metrics is not None and now >= next_metrics:
+                on_metrics(self.metrics())
+                next_metrics = now + metrics_interval
+        return self.metrics()
+
+    def metrics(self):
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        handled = self.processed + self.duplicates
+        return {
+            'processed': self.processed,
+            'duplicates': self.duplicates,
+            'batches': self.batches,
+            'rate': handled / elapsed if elapsed else 0.0,
+            'sql_lookup_ratio': self.store.sql_lookups / self.store.lookups if self.store.lookups else 0.0,
+            'generation': self.store.generation,
+        }
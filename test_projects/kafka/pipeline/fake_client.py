@@ -0,0 +1,423 @@
+"""
+Клиенты FakeBroker с интерфейсом kafka-python: FakeProducer и FakeConsumer.
+
+Подмножество KafkaProducer / KafkaConsumer, которым пользуются producer.py,
+consumer.py и pipeline: send с future и callback'ами, flush, close; poll,
+commit, committed, position, seek, pause/resume, end_offsets, группы
+потребителей. Поэтому конвейер можно гонять без Docker, подставив клиента:
+    BatchProducer(config=config, producer_factory=broker.producer)
+
+FakeProducer, как настоящий, копит записи партиции в батч (batch_size,
+linger_ms) и сжимает его в отдельном потоке-отправителе; брокер хранит батч
+как есть. Записи без ключа идут в одну партицию, пока её батч не отправлен
+(sticky partitioner), с ключом — в crc32(key) % число партиций.
+"""
+
+import threading
+import time
+import zlib
+from collections import deque, namedtuple
+
+from .log import check_codec, encode_batch
+
+
+TopicPartition = namedtuple('TopicPartition', 'topic partition')
+OffsetAndMetadata = namedtuple('OffsetAndMetadata', 'offset metadata leader_epoch')
+RecordMetadata = namedtuple('RecordMetadata', 'topic partition offset timestamp serialized_key_size serialized_value_size')
+ConsumerRecord = namedtuple('ConsumerRecord', 'topic partition offset timestamp key value')
+
+
+class CommitFailedError(Exception):
+    """Группа успела перебалансироваться: партиции уже у другого потребителя."""
+
+
+class DeliveryFuture:
+    """Результат send(): add_callback / add_errback / get, как FutureRecordMetadata."""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self._errbacks = []
+        self.value = None
+        self.exception = None
+
+    def add_callback(self, fn, *args):
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append((fn, args))
+                return self
+        if self.exception is None:
+            fn(*args, self.value)
+        return self
+
+    def add_errback(self, fn, *args):
+        with self._lock:
+            if not self._done.is_set():
+                self._errbacks.append((fn, args))
+                return self
+        if self.exception is not None:
+            fn(*args, self.exception)
+        return self
+
+    def _resolve(self, value=None, exception=None):
+        with self._lock:
+            self.value, self.exception = value, exception
+            self._done.set()
+            callbacks = self._errbacks if exception is not None else self._callbacks
+            self._callbacks = self._errbacks = []
+        for fn, args in callbacks:
+            fn(*args, exception if exception is not None else value)
+
+    def is_done(self):
+        return self._done.is_set()
+
+    def get(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise TimeoutError("сообщение не подтверждено за отведённое время")
+        if self.exception is not None:
+            raise self.exception
+        return self.value
+
+
+class _Batch:
+    def __init__(self, tp):
+        self.tp = tp
+        self.created = time.monotonic()
+        self.records = []
+        self.futures = []
+        self.size = 0
+
+
+class FakeProducer:
+    """Производитель для FakeBroker (см. модуль)."""
+
+    def __init__(self, broker, *, linger_ms=0, batch_size=16384, compression_type=None, acks=1,
+                 key_serializer=None, value_serializer=None):
+        check_codec(compression_type)
+        self.broker = broker
+        self.linger = linger_ms / 1000
+        self.batch_size = batch_size
+        self.compression = compression_type
+        self.acks = acks  # брокер дописывает синхронно — acks ни на что не влияет
+        self.key_serializer = key_serializer
+        self.value_serializer = value_serializer
+
+        self._open = {}        # TopicPartition -> _Batch, который ещё наполняется
+        self._ready = deque()  # закрытые батчи в порядке закрытия
+        self._sticky = {}      # топик -> партиция для записей без ключа
+        self._pending = 0      # записей без подтверждения
+        self._flushing = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {'batches': 0, 'records': 0, 'bytes': 0, 'compressed_bytes': 0}
+        self._sender = threading.Thread(target=self._run, name='fake-producer-sender', daemon=True)
+        self._sender.start()
+
+    def _partition(self, topic, key):
+        if key is not None:
+            return zlib.crc32(key) % self.broker.partitions(topic)
+        return self._sticky.setdefault(topic, 0)
+
+    def send(self, topic, value=None, key=None, partition=None):
+        if self._closed:
+            raise RuntimeError("производитель закрыт")
+        if self.key_serializer is not None and key is not None:
+            key = self.key_serializer(key)
+        if self.value_serializer is not None and value is not None:
+            value = self.value_serializer(value)
+        future = DeliveryFuture()
+        with self._cond:
+            if partition is None:
+                partition = self._partition(topic, key)
+            tp = TopicPartition(topic, partition)
+            batch = self._open.get(tp)
+            if batch is None:
+                batch = self._open[tp] = _Batch(tp)
+            batch.records.append((key, value))
+            batch.futures.append(future)
+            batch.size += 8 + (len(key) if key else 0) + (len(value) if value else 0)
+            self._pending += 1
+            sealed = batch.size >= self.batch_size
+            if sealed:
+                self._seal(tp)
+            # Отправителя будим, только если ему есть что делать раньше, чем он проснётся сам;
+            # notify_all — на том же условии может ждать flush()
+            if sealed or self.linger == 0 or len(batch.records) == 1:
+                self._cond.notify_all()
+        return future
+
+    def _seal(self, tp):
+        self._ready.append(self._open.pop(tp))
+        if self._sticky.get(tp.topic) == tp.partition:
+            self._sticky[tp.topic] = (tp.partition + 1) % self.broker.partitions(tp.topic)
+
+    def _take_ready(self):
+        """Под блокировкой: закрыть просроченные батчи и забрать готовые."""
+        now = time.monotonic()
+        for tp, batch in list(self._open.items()):
+            if self._flushing or self._closed or now - batch.created >= self.linger:
+                self._seal(tp)
+        batches = list(self._ready)
+        self._ready.clear()
+        return batches
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    batches = self._take_ready()
+                    if batches or (self._closed and not self._open):
+                        break
+                    timeout = None
+                    if self._open:
+                        oldest = min(batch.created for batch in self._open.values())
+                        timeout = max(oldest + self.linger - time.monotonic(), 0)
+                    self._cond.wait(timeout)
+            if not batches:
+                return
+            for batch in batches:
+                self._send_batch(batch)
+            with self._cond:
+                self._pending -= sum(len(batch.records) for batch in batches)
+                self._cond.notify_all()
+
+    def _send_batch(self, batch):
+        try:
+            codec_id, payload = encode_batch(batch.records, self.compression)
+            timestamp = time.time_ns() // 1_000_000
+            base_offset = self.broker.append_batch(batch.tp.topic, batch.tp.partition, len(batch.records),
+                                                   codec_id, payload, timestamp)
+        except Exception as e:
+            for future in batch.futures:
+                future._resolve(exception=e)
+            return
+        self._stats['batches'] += 1
+        self._stats['records'] += len(batch.records)
+        self._stats['bytes'] += batch.size
+        self._stats['compressed_bytes'] += len(payload)
+        for i, ((key, value), future) in enumerate(zip(batch.records, batch.futures)):
+            future._resolve(RecordMetadata(
+                batch.tp.topic, batch.tp.partition, base_offset + i, timestamp,
+                len(key) if key is not None else -1, len(value) if value is not None else -1,
+            ))
+
+    def flush(self, timeout=None):
+        """Отправить все батчи, не дожидаясь linger_ms, и дождаться подтверждений."""
+        with self._cond:
+            self._flushing += 1
+            self._cond.notify_all()
+            try:
+                if not self._cond.wait_for(lambda: self._pending == 0, timeout):
+                    raise TimeoutError(f"{self._pending} сообщений не подтверждены за {timeout} с")
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout=None):
+        if self._closed:
+            return
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._sender.join(timeout)
+
+    def metrics(self):
+        """Батчи и степень сжатия (как batch-size-avg и compression-rate-avg у Kafka)."""
+        stats = dict(self._stats)
+        stats['batch_size_avg'] = stats['bytes'] / stats['batches'] if stats['batches'] else 0.0
+        stats['compression_rate'] = stats['compressed_bytes'] / stats['bytes'] if stats['bytes'] else 1.0
+        return stats
+
+
+class FakeConsumer:
+    """
+    Потребитель FakeBroker (см. модуль).
+
+    С group_id партиции подписанных топиков делятся между потребителями
+    группы (range assignor); вход и выход потребителя сразу меняют
+    распределение, остальные узнают о нём при следующем poll. Без group_id
+    потребитель читает все партиции и не может делать commit.
+    """
+
+    def __init__(self, broker, *topics, group_id=None, auto_offset_reset='latest',
+                 enable_auto_commit=True, auto_commit_interval_ms=5000, max_poll_records=500,
+                 fetch_max_bytes=2**20, key_deserializer=None, value_deserializer=None,
+                 consumer_timeout_ms=float('inf')):
+        if auto_offset_reset not in ('earliest', 'latest'):
+            raise ValueError("auto_offset_reset: 'earliest' или 'latest'")
+        self.broker = broker
+        self.group_id = group_id
+        self.auto_offset_reset = auto_offset_reset
+        self.enable_auto_commit = enable_auto_commit and group_id is not None
+        self.auto_commit_interval = auto_commit_interval_ms / 1000
+        self.max_poll_records = max_poll_records
+        self.fetch_max_bytes = fetch_max_bytes
+        self.key_deserializer = key_deserializer
+        self.value_deserializer = value_deserializer
+        self.consumer_timeout = consumer_timeout_ms / 1000
+
+        self._topics = ()
+        self._member = None
+        self._generation = None
+        self._assignment = []
+        self._positions = {}
+        self._paused = set()
+        self._next_commit = time.monotonic() + self.auto_commit_interval
+        self._rotation = 0
+        self._closed = False
+        if topics:
+            self.subscribe(topics)
+
+    def subscribe(self, topics):
+        self._topics = tuple(topics)
+        if self.group_id is not None:
+            if self._member is not None:
+                self.broker.groups.leave(self.group_id, self._member)
+            self._member = self.broker.groups.join(self.group_id, self._topics)
+        self._generation = None
+        self._refresh()
+
+    def assign(self, partitions):
+        """Читать заданные партиции без группы."""
+        self._topics = ()
+        self._set_assignment(list(partitions))
+
+    def _set_assignment(self, partitions):
+        self._assignment = partitions
+        self._positions = {tp: self._positions[tp] for tp in partitions if tp in self._positions}
+        self._paused &= set(partitions)
+        for tp in partitions:
+            if tp not in self._positions:
+                self._positions[tp] = self._initial_position(tp)
+
+    def _initial_position(self, tp):
+        committed = self.committed(tp)
+        if committed is not None:
+            return committed
+        if self.auto_offset_reset == 'earliest':
+            return self.broker.beginning_offset(tp.topic, tp.partition)
+        return self.broker.end_offset(tp.topic, tp.partition)
+
+    def _refresh(self):
+        if self._member is None:
+            if self._topics and self._generation is None:
+                self._generation = 0
+                self._set_assignment([TopicPartition(topic, p) for topic in self._topics
+                                      for p in range(self.broker.partitions(topic))])
+            return
+        generation, partitions = self.broker.groups.assignment(self.group_id, self._member)
+        if generation == self._generation:
+            return
+        if self.enable_auto_commit and self._generation is not None:
+            self._auto_commit()
+        self._generation = generation
+        self._set_assignment(partitions)
+
+    def _auto_commit(self):
+        try:
+            self.commit()
+        except CommitFailedError:
+            # Как у kafka-python: автокоммит после перебалансировки молча теряется
+            pass
+        self._next_commit = time.monotonic() + self.auto_commit_interval
+
+    def assignment(self):
+        return set(self._assignment)
+
+    def poll(self, timeout_ms=0, max_records=None):
+        """Записи назначенных и не приостановленных партиций: {TopicPartition: [ConsumerRecord]}."""
+        if max_records is None:
+            max_records = self.max_poll_records
+        deadline = time.monotonic() + timeout_ms / 1000
+        while True:
+            self._refresh()
+            if self.enable_auto_commit and time.monotonic() >= self._next_commit:
+                self._auto_commit()
+            seen = self.broker.appends
+            result = self._fetch(max_records)
+            remaining = deadline - time.monotonic()
+            if result or remaining <= 0:
+                return result
+            self.broker.wait_for_append(seen, remaining)
+
+    def _fetch(self, max_records):
+        result = {}
+        active = [tp for tp in self._assignment if tp not in self._paused]
+        if not active:
+            return result
+        # Начинаем каждый раз со следующей партиции, чтобы ни одна не голодала
+        self._rotation = (self._rotation + 1) % len(active)
+        for tp in active[self._rotation:] + active[:self._rotation]:
+            if max_records <= 0:
+                break
+            rows = self.broker.fetch(tp.topic, tp.partition, self._positions[tp], max_records,
+                                     self.fetch_max_bytes)
+            if not rows:
+                continue
+            records = []
+            for offset, timestamp, key, value in rows:
+                if self.key_deserializer is not None and key is not None:
+                    key = self.key_deserializer(key)
+                if self.value_deserializer is not None and value is not None:
+                    value = self.value_deserializer(value)
+                records.append(ConsumerRecord(tp.topic, tp.partition, offset, timestamp, key, value))
+            result[tp] = records
+            self._positions[tp] = rows[-1][0] + 1
+            max_records -= len(records)
+        return result
+
+    def __iter__(self):
+        while not self._closed:
+            batch = self.poll(timeout_ms=min(self.consumer_timeout, 1.0) * 1000)
+            if not batch:
+                if self.consumer_timeout != float('inf'):
+                    return
+                continue
+            for records in batch.values():
+                yield from records
+
+    def position(self, tp):
+        return self._positions[tp]
+
+    def seek(self, tp, offset):
+        self._positions[tp] = offset
+
+    def pause(self, *partitions):
+        self._paused.update(partitions)
+
+    def resume(self, *partitions):
+        self._paused.difference_update(partitions)
+
+    def paused(self):
+        return set(self._paused)
+
+    def commit(self, offsets=None):
+        """Зафиксировать смещения (по умолчанию — текущие позиции назначенных партиций)."""
+        if self.group_id is None:
+            raise RuntimeError("commit без group_id невозможен")
+        if offsets is None:
+            offsets = {tp: self._positions[tp] for tp in self._assignment}
+        offsets = {tp: getattr(offset, 'offset', offset) for tp, offset in offsets.items()}
+        self.broker.groups.commit(self.group_id, self._member, self._generation, offsets)
+
+    def committed(self, tp):
+        if self.group_id is None:
+            return None
+        return self.broker.groups.committed(self.group_id, tp)
+
+    def beginning_offsets(self, partitions):
+        return {tp: self.broker.beginning_offset(tp.topic, tp.partition) for tp in partitions}
+
+    def end_offsets(self, partitions):
+        return {tp: self.broker.end_offset(tp.topic, tp.partition) for tp in partitions}
+
+    def close(self, autocommit=True):
+        if self._closed:
+            return
+        self._closed = True
+        if self._member is not None:
+            if autocommit and self.enable_auto_commit:
+                self._auto_commit()
+            self.broker.groups.leave(self.group_id, self._member)
+            self._member = None
@@ -0,0 +1,332 @@
+"""
+Журнал партиции на диске: сегменты только на дописывание и разреженный индекс смещений.
+
+Устроено как у Kafka:
+    <топик>-<партиция>/
+        00000000000000000000.log     батчи записей подряд
+        00000000000000000000.index   (смещение - base, позиция в .log) каждые
+                                     index_interval байт журнала
+        00000000000000052311.log     следующий сегмент: имя — первое смещение
+
+Батч хранится так, как его собрал производитель: заголовок и сжатые целиком
+записи. Смещения внутри батча не хранятся — запись i батча имеет смещение
+base_offset + i.
+
+Индекс — заранее выделенный файл index_max_bytes, отображённый в память
+(mmap): поиск смещения — бинарный поиск прямо по страницам файла, без
+чтения индекса в память. Индекс разреженный, поэтому после поиска
+дочитывается не больше index_interval байт заголовков. При закрытии файл
+индекса обрезается до записанных элементов.
+
+После аварии последний сегмент проверяется с последней точки индекса:
+недописанный или битый (по crc32) хвост отрезается.
+"""
+
+import bisect
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+
+
+# base_offset, число записей, длина данных, кодек, время (мс), crc32 данных
+BATCH_HEADER = struct.Struct('<QIIBqI')
+# длина ключа, длина значения (-1 — None)
+RECORD_HEADER = struct.Struct('<ii')
+INDEX_ENTRY = struct.Struct('<II')
+
+
+def _codecs():
+    """Доступные кодеки: имя -> (id, compress, decompress). Номера как в Kafka."""
+    codecs = {
+        None: (0, None, None),
+        'gzip': (1, lambda data: zlib.compress(data, 6, 31), lambda data: zlib.decompress(data, 47)),
+    }
+    try:
+        import snappy
+        codecs['snappy'] = (2, snappy.compress, snappy.decompress)
+    except ImportError:
+        pass
+    try:
+        import lz4.frame
+        codecs['lz4'] = (3, lz4.frame.compress, lz4.frame.decompress)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        codecs['zstd'] = (4, zstandard.ZstdCompressor().compress, zstandard.ZstdDecompressor().decompress)
+    except ImportError:
+        pass
+    return codecs
+
+
+CODECS = _codecs()
+DECOMPRESS = {codec_id: decompress for codec_id, _, decompress in CODECS.values()}
+
+
+def check_codec(name):
+    """Проверить, что сжатие name поддерживается и его пакет установлен."""
+    if name in CODECS:
+        return
+    if name in ('snappy', 'lz4', 'zstd'):
+        package = {'snappy': 'python-snappy', 'lz4': 'lz4', 'zstd': 'zstandard'}[name]
+        raise ImportError(f"сжатие {name} недоступно: pip install {package}")
+    raise ValueError(f"неизвестное сжатие {name!r}")
+
+
+def encode_batch(records, compression=None):
+    """[(key, value)] -> (id кодека, данные батча). key и value — bytes или None."""
+    check_codec(name=compression)
+    parts = []
+    for key, value in records:
+        parts.append(RECORD_HEADER.pack(-1 if key is None else len(key), -1 if value is None else len(value)))
+        if key is not None:
+            parts.append(key)
+        if value is not None:
+            parts.append(value)
+    payload = b''.join(parts)
+    codec_id, compress, _ = CODECS[compression]
+    return codec_id, compress(payload) if compress else payload
+
+
+def decode_records(codec_id, payload, count):
+    """Данные батча -> [(key, value)]."""
+    decompress = DECOMPRESS.get(codec_id)
+    if codec_id and decompress is None:
+        raise ImportError(f"нет пакета для кодека {codec_id}, которым сжат батч")
+    data = memoryview(decompress(payload) if decompress else payload)
+    records = []
+    position = 0
+    for _ in range(count):
+        key_size, value_size = RECORD_HEADER.unpack_from(data, position)
+        position += RECORD_HEADER.size
+        key = None
+        if key_size >= 0:
+            key = bytes(data[position:position + key_size])
+            position += key_size
+        value = None
+        if value_size >= 0:
+            value = bytes(data[position:position + value_size])
+            position += value_size
+        records.append((key, value))
+    return records
+
+
+class OffsetIndex:
+    """Разреженный индекс сегмента в mmap: (смещение относительно base, позиция)."""
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self._file = open(path, 'r+b' if os.path.exists(path) else 'w+b')
+        size = os.fstat(self._file.fileno()).st_size
+        capacity = max(size, max_bytes) // INDEX_ENTRY.size * INDEX_ENTRY.size
+        if size < capacity:
+            self._file.truncate(capacity)
+        self._mmap = mmap.mmap(self._file.fileno(), capacity)
+        self.max_entries = capacity // INDEX_ENTRY.size
+        # Обрезанный при закрытии файл — все элементы; иначе ищем конец:
+        # позиции растут, а первая запись сегмента (позиция 0) не индексируется
+        self.entries = size // INDEX_ENTRY.size if size < capacity else self._count()
+
+    def _count(self):
+        for i in range(self.max_entries):
+            if INDEX_ENTRY.unpack_from(self._mmap, i * INDEX_ENTRY.size)[1] == 0:
+                return i
+        return self.max_entries
+
+    @property
+    def full(self):
+        return self.entries >= self.max_entries
+
+    def entry(self, i):
+        return INDEX_ENTRY.unpack_from(self._mmap, i * INDEX_ENTRY.size)
+
+    def append(self, relative_offset, position):
+        INDEX_ENTRY.pack_into(self._mmap, self.entries * INDEX_ENTRY.size, relative_offset, position)
+        self.entries += 1
+
+    def lookup(self, relative_offset):
+        """Позиция последнего проиндексированного батча с началом не дальше relative_offset."""
+        low, high = 0, self.entries
+        while low < high:
+            middle = (low + high) // 2
+            if self.entry(middle)[0] <= relative_offset:
+                low = middle + 1
+            else:
+                high = middle
+        return self.entry(low - 1)[1] if low else 0
+
+    def truncate_after(self, position):
+        """Убрать элементы, указывающие на позицию position и дальше."""
+        while self.entries and self.entry(self.entries - 1)[1] >= position:
+            self.entries -= 1
+            INDEX_ENTRY.pack_into(self._mmap, self.entries * INDEX_ENTRY.size, 0, 0)
+
+    def close(self):
+        self._mmap.flush()
+        self._mmap.close()
+        self._file.truncate(self.entries * INDEX_ENTRY.size)
+        self._file.close()
+
+
+class Segment:
+    """Файл батчей и его индекс; base_offset — смещение первой записи."""
+
+    def __init__(self, directory, base_offset, index_interval, index_max_bytes):
+        self.base_offset = base_offset
+        self.index_interval = index_interval
+        name = os.path.join(directory, f'{base_offset:020d}')
+        self._fd = os.open(name + '.log', os.O_RDWR | os.O_CREAT | os.O_APPEND)
+        self.size = os.fstat(self._fd).st_size
+        self.index = OffsetIndex(name + '.index', index_max_bytes)
+        self.next_offset = base_offset
+        self._since_index = 0
+
+    def _header(self, position):
+        header = os.pread(self._fd, BATCH_HEADER.size, position)
+        if len(header) < BATCH_HEADER.size:
+            return None
+        return BATCH_HEADER.unpack(header)
+
+    def recover(self):
+        """Дочитать сегмент с последней точки индекса; отрезать битый хвост."""
+        position = 0
+        if self.index.entries:
+            # Элемент индекса пишется до батча: если батч на этой позиции битый
+            # или не записан, его смещение — следующее, а не base_offset сегмента
+            relative_offset, position = self.index.entry(self.index.entries - 1)
+            self.next_offset = self.base_offset + relative_offset
+        while position < self.size:
+            header = self._header(position)
+            if header is None:
+                break
+            base_offset, count, length, _, _, crc = header
+            payload = os.pread(self._fd, length, position + BATCH_HEADER.size)
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                break
+            position += BATCH_HEADER.size + length
+            self.next_offset = base_offset + count
+        if position < self.size:
+            os.ftruncate(self._fd, position)
+            self.size = position
+        self.index.truncate_after(self.size)
+        self._since_index = self.size - (self.index.entry(self.index.entries - 1)[1] if self.index.entries else 0)
+
+    def append(self, count, codec_id, timestamp, payload):
+        base_offset = self.next_offset
+        if self._since_index >= self.index_interval:
+            self.index.append(base_offset - self.base_offset, self.size)
+            self._since_index = 0
+        header = BATCH_HEADER.pack(base_offset, count, len(payload), codec_id, timestamp, zlib.crc32(payload))
+        os.write(self._fd, header + payload)
+        written = BATCH_HEADER.size + len(payload)
+        self._since_index += written
+        # next_offset и size меняются после записи: читатель видит только целые батчи
+        self.next_offset = base_offset + count
+        self.size += written
+        return base_offset
+
+    def read(self, offset, max_bytes):
+        """Батчи от содержащего offset, около max_bytes байт: [(base, count, codec, время, данные)]."""
+        end = self.size
+        position = self.index.lookup(offset - self.base_offset)
+        while position < end:
+            base_offset, count, length, _, _, _ = self._header(position)
+            if base_offset + count > offset:
+                break
+            position += BATCH_HEADER.size + length
+        if position >= end:
+            return []
+        _, _, first_length, _, _, _ = self._header(position)
+        data = os.pread(self._fd, min(end - position, max(max_bytes, BATCH_HEADER.size + first_length)), position)
+        batches = []
+        cursor = 0
+        while cursor + BATCH_HEADER.size <= len(data):
+            base_offset, count, length, codec_id, timestamp, _ = BATCH_HEADER.unpack_from(data, cursor)
+            start = cursor + BATCH_HEADER.size
+            if start + length > len(data):
+                break
+            batches.append((base_offset, count, codec_id, timestamp, data[start:start + length]))
+            cursor = start + length
+        return batches
+
+    def flush(self):
+        os.fsync(self._fd)
+
+    def close(self):
+        self.index.close()
+        os.close(self._fd)
+
+
+class PartitionLog:
+    """Журнал одной партиции: список сегментов, новый сегмент после segment_bytes."""
+
+    def __init__(self, directory, segment_bytes=64 * 2**20, index_interval=4096, index_max_bytes=2**20):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.index_interval = index_interval
+        self.index_max_bytes = index_max_bytes
+        self._lock = threading.Lock()
+        bases = sorted(int(name[:-4]) for name in os.listdir(directory) if name.endswith('.log'))
+        self.segments = [self._open(base) for base in bases or [0]]
+        for previous, segment in zip(self.segments, self.segments[1:]):
+            previous.next_offset = segment.base_offset
+        self.segments[-1].recover()
+        self._bases = [segment.base_offset for segment in self.segments]
+
+    def _open(self, base_offset):
+        return Segment(self.directory, base_offset, self.index_interval, self.index_max_bytes)
+
+    @property
+    def start_offset(self):
+        return self.segments[0].base_offset
+
+    @property
+    def end_offset(self):
+        """Смещение, которое получит следующая запись."""
+        return self.segments[-1].next_offset
+
+    def append(self, count, codec_id, payload, timestamp=None):
+        """Дописать готовый батч (см. encode_batch); возвращает смещение его первой записи."""
+        if timestamp is None:
+            timestamp = time.time_ns() // 1_000_000
+        with self._lock:
+            active = self.segments[-1]
+            if active.size >= self.segment_bytes or active.index.full:
+                active = self._open(active.next_offset)
+                self.segments.append(active)
+                self._bases.append(active.base_offset)
+            return active.append(count, codec_id, timestamp, payload)
+
+    def read(self, offset, max_records=500, max_bytes=2**20):
+        """Записи с offset: [(смещение, время, key, value)], не больше max_records."""
+        records = []
+        while len(records) < max_records and offset < self.end_offset:
+            with self._lock:
+                segment = self.segments[bisect.bisect_right(self._bases, offset) - 1]
+            batches = segment.read(offset, max_bytes)
+            if not batches:
+                # Сегмент дочитан — следующий начинается с его next_offset
+                if offset >= segment.next_offset and segment is not self.segments[-1]:
+                    continue
+                break
+            for base_offset, count, codec_id, timestamp, payload in batches:
+                for i, (key, value) in enumerate(decode_records(codec_id, payload, count)):
+                    if base_offset + i >= offset:
+                        records.append((base_offset + i, timestamp, key, value))
+                offset = base_offset + count
+                if len(records) >= max_records:
+                    break
+        return records[:max_records]
+
+    def flush(self):
+        with self._lock:
+            self.segments[-1].flush()
+
+    def close(self):
+        with self._lock:
+            for segment in self.segments:
+                segment.close()
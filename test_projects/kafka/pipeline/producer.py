@@ -0,0 +1,202 @@
+"""
+Производитель Kafka: батчи, сжатие, подтверждения доставки без ожидания.
+
+producer.py отправляет по одному сообщению и не проверяет, дошло ли оно:
+send() только кладёт запись в буфер клиента, и без flush() последние
+сообщения теряются при выходе. BatchProducer:
+    linger_ms / batch_size — клиент копит записи партиции в батч, пока
+                             не наберётся batch_size байт или не пройдёт
+                             linger_ms; один запрос к брокеру на батч
+    compression            — батч сжимается целиком (gzip есть всегда;
+                             snappy, lz4, zstd — с нужными пакетами)
+    max_in_flight          — сколько сообщений может ждать подтверждения;
+                             дальше send() блокируется (не дольше max_block)
+    on_delivery            — callback на каждое подтверждение или ошибку,
+                             вместо future.get() на каждое сообщение
+    flush() / close()      — дождаться доставки всего отправленного
+
+Callback'и вызываются из потока ввода-вывода клиента: в них нельзя
+блокироваться надолго.
+
+Использование:
+    with BatchProducer('localhost:9092', ProducerConfig(linger_ms=20)) as producer:
+        for n in range(1000):
+            producer.send('testnum', {'num': n})
+    print(producer.metrics())
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+
+COMPRESSION = (None, 'gzip', 'snappy', 'lz4', 'zstd')
+
+
+class ProducerBufferFull(Exception):
+    """Место под новое сообщение не освободилось за max_block секунд."""
+
+
+def json_serializer(value):
+    return json.dumps(value).encode('utf-8')
+
+
+@dataclass
+class ProducerConfig:
+    linger_ms: int = 5
+    batch_size: int = 64 * 1024
+    compression: str | None = 'gzip'
+    max_in_flight: int = 10_000
+    max_block: float = 60.0
+    acks: int | str = 1
+
+    def kafka_options(self):
+        """Параметры KafkaProducer."""
+        return {
+            'linger_ms': self.linger_ms,
+            'batch_size': self.batch_size,
+            'compression_type': self.compression,
+            'acks': self.acks,
+        }
+
+
+def kafka_producer(bootstrap_servers, **options):
+    """KafkaProducer из kafka-python (нужен только для настоящего брокера)."""
+    try:
+        from kafka import KafkaProducer
+        from kafka.errors import KafkaError
+    except ImportError:
+        raise ImportError("для брокера Kafka нужен пакет kafka-python: pip install kafka-python") from None
+    compression = options.get('compression_type')
+    if compression is not None:
+        from kafka import codec
+        if not getattr(codec, f'has_{compression}')():
+            raise ImportError(f"сжатие {compression} недоступно: установите пакет для него "
+                              f"(python-snappy, lz4 или zstandard)")
+    try:
+        return KafkaProducer(bootstrap_servers=bootstrap_servers, **options)
+    except KafkaError as e:
+        raise ConnectionError(f"брокер {bootstrap_servers} недоступен: {e}") from e
+
+
+class DeliveryStats:
+    """Подтверждённые и неудачные сообщения, байты и задержка send -> подтверждение."""
+
+    def __init__(self, history=10000):
+        self.sent = 0
+        self.delivered = 0
+        self.failed = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+        self.errors = deque(maxlen=100)
+        self._latencies = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def record(self, latency, size, error=None):
+        with self._lock:
+            if error is None:
+                self.delivered += 1
+                self.bytes += size
+                self._latencies.append(latency)
+            else:
+                self.failed += 1
+                self.errors.append(error)
+
+    def metrics(self):
+        elapsed = time.perf_counter() - self.started
+        with self._lock:
+            latencies = sorted(self._latencies)
+
+        def quantile(q):
+            return latencies[min(int(len(latencies) * q), len(latencies) - 1)] if latencies else 0.0
+
+        return {
+            'sent': self.sent,
+            'delivered': self.delivered,
+            'failed': self.failed,
+            'in_flight': self.sent - self.delivered - self.failed,
+            'msgs_per_sec': self.delivered / elapsed if elapsed else 0.0,
+            'mb_per_sec': self.bytes / 2**20 / elapsed if elapsed else 0.0,
+            'latency_p50': quantile(0.5),
+            'latency_p99': quantile(0.99),
+        }
+
+
+class BatchProducer:
+    """
+    Обёртка над KafkaProducer с ограничением сообщений в полёте и статистикой.
+
+    bootstrap_servers — адрес брокера (для producer_factory по умолчанию)
+    config            — ProducerConfig
+    serializer        — значение -> bytes (по умолчанию JSON)
+    producer_factory  — фабрика клиента: factory(bootstrap_servers, **options);
+                        по умолчанию KafkaProducer
+    on_delivery       — callback(metadata, error) для всех сообщений
+    """
+
+    def __init__(self, bootstrap_servers='localhost:9092', config=None, *, serializer=json_serializer,
+                 producer_factory=kafka_producer, on_delivery=None):
+        if config is None:
+            config = ProducerConfig()
+        if config.compression not in COMPRESSION:
+            raise ValueError(f"неизвестное сжатие {config.compression!r}, доступны: "
+                             f"{', '.join(str(c) for c in COMPRESSION)}")
+        self.config = config
+        self.serializer = serializer
+        self.on_delivery = on_delivery
+        self.stats = DeliveryStats()
+        self._slots = threading.BoundedSemaphore(config.max_in_flight)
+        self._producer = producer_factory(bootstrap_servers, **config.kafka_options())
+
+    def send(self, topic, value, key=None, on_delivery=None):
+        """
+        Поставить сообщение в батч; возвращает future клиента.
+
+        Если max_in_flight сообщений ещё не подтверждены, ждёт не дольше
+        max_block секунд, затем ProducerBufferFull.
+        """
+        data = self.serializer(value)
+        if isinstance(key, str):
+            key = key.encode('utf-8')
+        if not self._slots.acquire(timeout=self.config.max_block):
+            raise ProducerBufferFull(f"{self.config.max_in_flight} сообщений ждут подтверждения "
+                                     f"дольше {self.config.max_block} с")
+        start = time.perf_counter()
+        try:
+            future = self._producer.send(topic, value=data, key=key)
+        except BaseException:
+            self._slots.release()
+            raise
+        self.stats.sent += 1
+        callback = on_delivery or self.on_delivery
+        future.add_callback(self._done, start, len(data), callback)
+        future.add_errback(self._done, start, len(data), callback)
+        return future
+
+    def _done(self, start, size, callback, result):
+        # add_callback передаёт метаданные записи, add_errback — исключение
+        error = result if isinstance(result, BaseException) else None
+        metadata = None if error is not None else result
+        self._slots.release()
+        self.stats.record(time.perf_counter() - start, size, error)
+        if callback is not None:
+            callback(metadata, error)
+
+    def flush(self, timeout=None):
+        """Отправить всё накопленное и дождаться подтверждений."""
+        self._producer.flush(timeout)
+
+    def close(self, timeout=None):
+        self.flush(timeout)
+        self._producer.close(timeout)
+
+    def metrics(self):
+        return self.stats.metrics()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
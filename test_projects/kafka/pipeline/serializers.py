@@ -0,0 +1,314 @@
+"""
+Сериализаторы значений сообщений: JSON, бинарный по схеме и MessagePack.
+
+producer.py и consumer.py кодируют {'num': n} как JSON-текст и при чтении
+ещё раз копируют байты в строку (x.decode('utf-8')). Здесь у каждого
+сериализатора encode(value) -> bytes и decode(data) -> value, где data —
+bytes или memoryview: декодер читает прямо из буфера, не копируя его
+целиком.
+    json    — stdlib json: читаемо, совместимо со старыми сообщениями
+    schema  — поля фиксированного порядка и типа; числа упакованы struct'ом,
+              имён полей в сообщении нет. {'num': n} с int32 — 5 байт,
+              в JSON — от 9 до 18
+    msgpack — MessagePack: бинарный, без схемы. Пакет msgpack (C), если
+              установлен, иначе реализация на Python из этого модуля
+
+С copy=False bytes-поля (schema, msgpack) возвращаются как memoryview
+внутри исходного буфера — без копии, пока жив буфер.
+
+Использование:
+    serializer = make_serializer('schema', fields=[('num', 'int64')])
+    producer = BatchProducer(serializer=serializer.encode)
+    consumer = KafkaConsumer(..., value_deserializer=serializer.decode)
+
+Свой формат — класс с encode/decode в SERIALIZERS.
+"""
+
+import json
+import struct
+from operator import itemgetter
+
+
+class JsonSerializer:
+    """JSON без пробелов; кодировщик и декодер создаются один раз."""
+
+    name = 'json'
+
+    def __init__(self):
+        self._encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False)
+        self._decoder = json.JSONDecoder()
+
+    def encode(self, value):
+        return self._encoder.encode(value).encode('utf-8')
+
+    def decode(self, data):
+        # str(data, 'utf-8') читает и memoryview; json.loads(bytes) медленнее —
+        # он сначала угадывает кодировку
+        return self._decoder.decode(str(data, 'utf-8'))
+
+
+# тип поля схемы -> формат struct (фиксированной длины) или None (длина + данные)
+SCHEMA_TYPES = {
+    'int8': 'b', 'int16': 'h', 'int32': 'i', 'int64': 'q',
+    'uint8': 'B', 'uint16': 'H', 'uint32': 'I', 'uint64': 'Q',
+    'float32': 'f', 'float64': 'd', 'bool': '?',
+    'str': None, 'bytes': None,
+}
+
+
+class SchemaSerializer:
+    """
+    Запись с заранее известными полями: [версия][числа...][длины строк...][строки...].
+
+    fields  — [(имя, тип)], тип из SCHEMA_TYPES; все поля обязательны
+    version — байт в начале сообщения: decode отвергает чужую версию схемы
+    """
+
+    name = 'schema'
+
+    def __init__(self, fields, version=1, copy=True):
+        unknown = [kind for _, kind in fields if kind not in SCHEMA_TYPES]
+        if unknown:
+            raise ValueError(f"неизвестные типы полей {unknown}, доступны: {', '.join(SCHEMA_TYPES)}")
+        self.fields = list(fields)
+        self.version = version
+        self.copy = copy
+        fixed = [(name, SCHEMA_TYPES[kind]) for name, kind in fields if SCHEMA_TYPES[kind]]
+        self._variable = [(name, kind) for name, kind in fields if SCHEMA_TYPES[kind] is None]
+        self._fixed_names = [name for name, _ in fixed]
+        self._struct = struct.Struct('<B' + ''.join(code for _, code in fixed) + 'I' * len(self._variable))
+        self._fixed_get = itemgetter(*self._fixed_names) if self._fixed_names else None
+        self._variable_get = itemgetter(*[name for name, _ in self._variable]) if self._variable else None
+
+    def encode(self, value):
+        try:
+            numbers = ()
+            if self._fixed_get is not None:
+                numbers = self._fixed_get(value)
+                if len(self._fixed_names) == 1:
+                    numbers = (numbers,)
+            if self._variable_get is None:
+                return self._struct.pack(self.version, *numbers)
+            raw = self._variable_get(value)
+            if len(self._variable) == 1:
+                raw = (raw,)
+            parts = [item.encode('utf-8') if kind == 'str' else bytes(item)
+                     for item, (_, kind) in zip(raw, self._variable)]
+            return b''.join([self._struct.pack(self.version, *numbers, *map(len, parts)), *parts])
+        except (KeyError, struct.error, AttributeError, TypeError) as e:
+            raise ValueError(f"значение не подходит под схему: {e}") from None
+
+    def decode(self, data):
+        values = self._struct.unpack_from(data)
+        if values[0] != self.version:
+            raise ValueError(f"версия схемы {values[0]}, ожидалась {self.version}")
+        fixed_count = len(self._fixed_names)
+        record = dict(zip(self._fixed_names, values[1:1 + fixed_count]))
+        if not self._variable:
+            return record
+        view = memoryview(data)
+        position = self._struct.size
+        for (name, kind), size in zip(self._variable, values[1 + fixed_count:]):
+            chunk = view[position:position + size]
+            if kind == 'str':
+                record[name] = str(chunk, 'utf-8')
+            else:
+                record[name] = bytes(chunk) if self.copy else chunk
+            position += size
+        return record
+
+
+_UNPACK = {
+    0xcc: struct.Struct('>B'), 0xcd: struct.Struct('>H'), 0xce: struct.Struct('>I'), 0xcf: struct.Struct('>Q'),
+    0xd0: struct.Struct('>b'), 0xd1: struct.Struct('>h'), 0xd2: struct.Struct('>i'), 0xd3: struct.Struct('>q'),
+    0xca: struct.Struct('>f'), 0xcb: struct.Struct('>d'),
+}
+_U8, _U16, _U32 = struct.Struct('>B'), struct.Struct('>H'), struct.Struct('>I')
+
+
+def _pack(value, out):
+    """MessagePack: None, bool, int, float, str, bytes, list/tuple, dict."""
+    if value is None:
+        out.append(0xc0)
+    elif value is True:
+        out.append(0xc3)
+    elif value is False:
+        out.append(0xc2)
+    elif isinstance(value, int):
+        if 0 <= value < 0x80:
+            out.append(value)
+        elif -32 <= value < 0:
+            out.append(value & 0xff)
+        elif value >= 0:
+            for marker, limit in ((0xcc, 1 << 8), (0xcd, 1 << 16), (0xce, 1 << 32), (0xcf, 1 << 64)):
+                if value < limit:
+                    out.append(marker)
+                    out += _UNPACK[marker].pack(value)
+                    break
+            else:
+                raise ValueError(f"{value} не помещается в uint64")
+        else:
+            for marker, limit in ((0xd0, 1 << 7), (0xd1, 1 << 15), (0xd2, 1 << 31), (0xd3, 1 << 63)):
+                if value >= -limit:
+                    out.append(marker)
+                    out += _UNPACK[marker].pack(value)
+                    break
+            else:
+                raise ValueError(f"{value} не помещается в int64")
+    elif isinstance(value, float):
+        out.append(0xcb)
+        out += _UNPACK[0xcb].pack(value)
+    elif isinstance(value, str):
+        data = value.encode('utf-8')
+        size = len(data)
+        if size < 32:
+            out.append(0xa0 | size)
+        elif size < 1 << 8:
+            out += b'\xd9' + _U8.pack(size)
+        elif size < 1 << 16:
+            out += b'\xda' + _U16.pack(size)
+        else:
+            out += b'\xdb' + _U32.pack(size)
+        out += data
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        size = len(value)
+        if size < 1 << 8:
+            out += b'\xc4' + _U8.pack(size)
+        elif size < 1 << 16:
+            out += b'\xc5' + _U16.pack(size)
+        else:
+            out += b'\xc6' + _U32.pack(size)
+        out += value
+    elif isinstance(value, (list, tuple)):
+        size = len(value)
+        if size < 16:
+            out.append(0x90 | size)
+        elif size < 1 << 16:
+            out += b'\xdc' + _U16.pack(size)
+        else:
+            out += b'\xdd' + _U32.pack(size)
+        for item in value:
+            _pack(item, out)
+    elif isinstance(value, dict):
+        size = len(value)
+        if size < 16:
+            out.append(0x80 | size)
+        elif size < 1 << 16:
+            out += b'\xde' + _U16.pack(size)
+        else:
+            out += b'\xdf' + _U32.pack(size)
+        for key, item in value.items():
+            _pack(key, out)
+            _pack(item, out)
+    else:
+        raise TypeError(f"MessagePack не умеет {type(value).__name__}")
+
+
+def _unpack(view, position, copy):
+    """Значение с позиции position; возвращает (значение, следующая позиция)."""
+    marker = view[position]
+    position += 1
+    if marker < 0x80:
+        return marker, position
+    if marker >= 0xe0:
+        return marker - 0x100, position
+    if marker & 0xe0 == 0xa0:
+        size = marker & 0x1f
+        return str(view[position:position + size], 'utf-8'), position + size
+    if marker & 0xf0 == 0x90:
+        return _unpack_array(view, position, marker & 0x0f, copy)
+    if marker & 0xf0 == 0x80:
+        return _unpack_map(view, position, marker & 0x0f, copy)
+    if marker == 0xc0:
+        return None, position
+    if marker == 0xc2:
+        return False, position
+    if marker == 0xc3:
+        return True, position
+    number = _UNPACK.get(marker)
+    if number is not None:
+        return number.unpack_from(view, position)[0], position + number.size
+    if marker in (0xd9, 0xda, 0xdb, 0xc4, 0xc5, 0xc6):
+        length = {0xd9: _U8, 0xda: _U16, 0xdb: _U32, 0xc4: _U8, 0xc5: _U16, 0xc6: _U32}[marker]
+        size = length.unpack_from(view, position)[0]
+        position += length.size
+        chunk = view[position:position + size]
+        if marker >= 0xd9:
+            return str(chunk, 'utf-8'), position + size
+        return (bytes(chunk) if copy else chunk), position + size
+    if marker in (0xdc, 0xdd):
+        length = _U16 if marker == 0xdc else _U32
+        return _unpack_array(view, position + length.size, length.unpack_from(view, position)[0], copy)
+    if marker in (0xde, 0xdf):
+        length = _U16 if marker == 0xde else _U32
+        return _unpack_map(view, position + length.size, length.unpack_from(view, position)[0], copy)
+    raise ValueError(f"неподдерживаемый тип MessagePack 0x{marker:02x}")
+
+
+def _unpack_array(view, position, size, copy):
+    items = []
+    for _ in range(size):
+        item, position = _unpack(view, position, copy)
+        items.append(item)
+    return items, position
+
+
+def _unpack_map(view, position, size, copy):
+    result = {}
+    for _ in range(size):
+        key, position = _unpack(view, position, copy)
+        result[key], position = _unpack(view, position, copy)
+    return result, position
+
+
+class MsgpackSerializer:
+    """
+    MessagePack: пакет msgpack, если установлен (native=True), иначе реализация выше.
+
+    msgpack сам возвращает bytes-поля копией — copy=False действует только
+    без него.
+    """
+
+    name = 'msgpack'
+
+    def __init__(self, copy=True, native=None):
+        self.copy = copy
+        try:
+            import msgpack
+        except ImportError:
+            msgpack = None
+        if native and msgpack is None:
+            raise ImportError("нужен пакет msgpack: pip install msgpack")
+        self.native = msgpack is not None if native is None else native
+        if self.native:
+            # packb, а не общий Packer: send() может идти из нескольких потоков
+            self._packb = msgpack.packb
+            self._unpackb = msgpack.unpackb
+
+    def encode(self, value):
+        if self.native:
+            return self._packb(value)
+        out = bytearray()
+        _pack(value, out)
+        return bytes(out)
+
+    def decode(self, data):
+        if self.native:
+            # unpackb читает любой буфер, в том числе memoryview, без копии
+            return self._unpackb(data, raw=False)
+        value, _ = _unpack(memoryview(data), 0, self.copy)
+        return value
+
+
+SERIALIZERS = {
+    'json': JsonSerializer,
+    'schema': SchemaSerializer,
+    'msgpack': MsgpackSerializer,
+}
+
+
+def make_serializer(name, **options):
+    """Сериализатор по имени из SERIALIZERS."""
+    if name not in SERIALIZERS:
+        raise ValueError(f"неизвестный сериализатор {name!r}, доступны: {', '.join(SERIALIZERS)}")
+    return SERIALIZERS[name](**options)
@@ -1,14 +1,26 @@
 # importing the required libraries
 
 from time import sleep
-from json import dumps
-from kafka import KafkaProducer
 
+from pipeline import BatchProducer, ProducerConfig, make_serializer
 
-# initializing the Kafka producer
-my_producer = KafkaProducer(
-    bootstrap_servers = ['localhost:9092'],
-    value_serializer = lambda x:dumps(x).encode('utf-8')
+
+# формат значений должен совпадать с consumer.py; 'schema' и 'msgpack' компактнее
+serializer = make_serializer('json')
+
+
+def on_delivery(metadata, error):
+    # вызывается из потока клиента, когда брокер подтвердил запись или отказал
+    if error is not None:
+        print(f"delivery failed: {error}")
+
+
+# initializing the Kafka producer: батчи по 20 мс, сжатие gzip
+my_producer = BatchProducer(
+    'localhost:9092',
+    ProducerConfig(linger_ms=20, compression='gzip'),
+    serializer=serializer.encode,
+    on_delivery=on_delivery,
     )
 
 
@@ -17,3 +29,7 @@ for n in range(500):
     my_data = {'num': n}
     my_producer.send('testnum', value=my_data)
     sleep(1)
+
+# без flush последние сообщения остались бы в буфере клиента
+my_producer.close()
+print(my_producer.metrics())
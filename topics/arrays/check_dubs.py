@@ -30,7 +30,6 @@ def check_dubs(arr):
     return False
 
 
-
-
-print(check_dubs([1, 2, 3, 2, 4]))
-print(check_dubs([1, 2, 3, 4, 5]))
+if __name__ == "__main__":
+    print(check_dubs([1, 2, 3, 2, 4]))
+    print(check_dubs([1, 2, 3, 4, 5]))
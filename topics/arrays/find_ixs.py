@@ -23,4 +23,6 @@ def find_ixs(arr, el):
 
     return res
 
-print(find_ixs([1, 2, 3, 2, 4, 2], 2))
+
+if __name__ == "__main__":
+    print(find_ixs([1, 2, 3, 2, 4, 2], 2))
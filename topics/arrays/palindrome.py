@@ -28,11 +28,10 @@ def palindrome_check(in_str):
         
         i += 1
         j -= 1
-    
-    print(len(in_str), in_str, i, j)
 
     return True
 
 
-print(palindrome_check("hello"))
-print(palindrome_check("A man a plan a anal Panama"))
+if __name__ == "__main__":
+    print(palindrome_check("hello"))
+    print(palindrome_check("A man a plan a anal Panama"))
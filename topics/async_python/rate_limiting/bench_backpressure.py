@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк памяти пула воркеров: ограниченные очереди против неограниченных.
+
+Загрузка миллиона страниц по HTTP заняла бы часы, поэтому fetch здесь —
+корутина без сети, возвращающая страницу из 50 записей, а потребитель
+медленнее воркеров (одна страница за итерацию event loop). Так видно
+ровно то, что зависит от очередей: с high_watermark=0 (как в
+worker_pool_approach) страницы копятся в results и RSS растёт, с
+ограниченными очередями — остаётся ровным.
+
+Каждый режим — отдельный процесс; RSS печатается каждые --every страниц.
+Неограниченный режим гоняется на --unbounded-pages страницах: на миллионе
+он занял бы десятки гигабайт.
+
+Использование (из каталога rate_limiting/):
+    python bench_backpressure.py                      # 1 000 000 страниц
+    python bench_backpressure.py --pages 200000 --every 20000
+    python bench_backpressure.py --high 100 --low 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from fetcher import PAGE_SIZE, Page
+from fetcher.strategies import worker_pool
+
+
+PAGE_BYTES = os.sysconf('SC_PAGE_SIZE')
+
+
+def current_rss_mb():
+    """Текущий (не пиковый) RSS процесса, МБ."""
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * PAGE_BYTES / 2**20
+
+
+async def fake_fetch(offset):
+    await asyncio.sleep(0)
+    results = [{'name': f'pokemon-{i}', 'url': f'/api/v2/pokemon/{i}/'}
+               for i in range(offset, offset + PAGE_SIZE)]
+    return Page(offset, results, 0.0, {'results': results})
+
+
+async def crawl(total_pages, concurrency, high, low, every):
+    """Прогон пула воркеров; возвращает замеры RSS и метрики очередей."""
+    queues = {}
+    samples = []
+    processed = 0
+    start = time.perf_counter()
+    offsets = range(0, total_pages * PAGE_SIZE, PAGE_SIZE)
+    async for page in worker_pool(fake_fetch, offsets, concurrency,
+                                  high_watermark=high, low_watermark=low, queues=queues):
+        processed += 1
+        # Медленный потребитель: отдаёт управление после каждой страницы
+        await asyncio.sleep(0)
+        if processed % every == 0:
+            samples.append((processed, current_rss_mb(), queues['results'].qsize()))
+    return {
+        'elapsed': time.perf_counter() - start,
+        'samples': samples,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'queues': {name: queue.metrics() for name, queue in queues.items()},
+    }
+
+
+def run_child(args, pages, high):
+    command = [
+        sys.executable, __file__, '--child', '--pages', str(pages),
+        '--concurrency', str(args.concurrency), '--high', str(high),
+        '--every', str(min(args.every, max(pages // 5, 1))),
+    ]
+    if args.low is not None:
+        command += ['--low', str(args.low)]
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк памяти: backpressure в пуле воркеров')
+    parser.add_argument('--pages', type=int, default=1_000_000, help='Сколько страниц «загрузить»')
+    parser.add_argument('--concurrency', type=int, default=50, help='Число воркеров')
+    parser.add_argument('--high', type=int, default=None, help='Верхняя отметка (по умолчанию 2 * concurrency)')
+    parser.add_argument('--low', type=int, default=None, help='Нижняя отметка (по умолчанию high // 2)')
+    parser.add_argument('--unbounded-pages', type=int, default=100_000,
+                        help='Страниц для режима без ограничения (0 — пропустить)')
+    parser.add_argument('--every', type=int, default=100_000, help='Печатать RSS каждые N страниц')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(crawl(args.pages, args.concurrency, args.high, args.low, args.every))))
+        return
+
+    bounded_high = args.high if args.high is not None else args.concurrency * 2
+    modes = [(f'high={bounded_high}', args.pages, bounded_high)]
+    if args.unbounded_pages:
+        modes.insert(0, ('без ограничения', min(args.pages, args.unbounded_pages), 0))
+    for title, pages, high in modes:
+        result = run_child(args, pages, high)
+        print(f"\n{title}: {pages} страниц за {result['elapsed']:.1f} с, "
+              f"пиковый RSS {result['peak_rss_mb']:.1f} МБ")
+        print(f"  {'страниц':>9} {'RSS, МБ':>9} {'в results':>10}")
+        for processed, rss, depth in result['samples']:
+            print(f"  {processed:>9} {rss:>9.1f} {depth:>10}")
+        for name, m in result['queues'].items():
+            # Время ожидания — суммарное по всем корутинам, поэтому может быть больше elapsed
+            print(f"  очередь {name}: max_depth={m['max_depth']}, пауз={m['pauses']}, "
+                  f"put ждал {m['put_blocked']:.2f} с, get ждал {m['get_blocked']:.2f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Микробенчмарки лимитеров из fetcher/limiter.py.
+
+overhead — стоимость acquire(), когда лимит не мешает (огромный rate):
+           чистые накладные расходы на вызов, нс
+contended — waiters корутин одновременно ждут лимитер с заданным rate:
+           фактическая частота, отклонение от заданной, опоздание
+           относительно идеального расписания (p50/p99/max)
+
+Использование (из каталога rate_limiting/):
+    python bench_limiter.py
+    python bench_limiter.py --waiters 10000 --rate 5000
+    python bench_limiter.py token_bucket sliding_window
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from fetcher.limiter import LIMITERS
+
+
+def make_limiter(name, rate, burst):
+    cls = LIMITERS[name]
+    if name == 'sliding_window':
+        # burst разрешений за окно burst / rate секунд — та же средняя частота
+        return cls(limit=burst, window=burst / rate)
+    if name == 'leaky_bucket':
+        return cls(rate=rate)
+    return cls(rate=rate, capacity=burst)
+
+
+async def overhead(name, calls):
+    """Среднее время acquire() без ожидания, нс."""
+    limiter = make_limiter(name, rate=1e12, burst=1e12)
+    start = time.perf_counter()
+    for _ in range(calls):
+        await limiter.acquire()
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+async def contended(name, waiters, rate, burst):
+    """Все waiters ждут одновременно; сравнить фактические моменты с расписанием."""
+    limiter = make_limiter(name, rate, burst)
+    loop = asyncio.get_running_loop()
+    granted = []
+
+    async def waiter():
+        await limiter.acquire()
+        granted.append(loop.time())
+
+    await asyncio.gather(*(waiter() for _ in range(waiters)))
+    # Отсчёт от первого разрешения: создание задач в gather само занимает время
+    start = granted[0]
+    elapsed = granted[-1] - start
+
+    # Идеал: первые burst проходят сразу (у leaky bucket — 1), дальше ровно 1/rate
+    free = 1 if name == 'leaky_bucket' else burst
+    lateness = sorted(
+        max(0.0, stamp - start - max(0, i - free + 1) / rate)
+        for i, stamp in enumerate(granted)
+    )
+    achieved = (waiters - free) / elapsed if elapsed else float('inf')
+    return {
+        'elapsed': elapsed,
+        'rate': achieved,
+        'error': (achieved - rate) / rate * 100,
+        'p50': lateness[len(lateness) // 2],
+        'p99': lateness[int(len(lateness) * 0.99) - 1],
+        'max': lateness[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Микробенчмарки лимитеров')
+    parser.add_argument('limiters', nargs='*', help=f"Алгоритмы: {', '.join(LIMITERS)} (по умолчанию все)")
+    parser.add_argument('--calls', type=int, default=200_000, help='Вызовов acquire() для overhead')
+    parser.add_argument('--waiters', type=int, default=5000, help='Одновременных ожидающих для contended')
+    parser.add_argument('--rate', type=float, default=2000, help='Заданная частота, запросов/с')
+    parser.add_argument('--burst', type=int, default=100, help='Всплеск (capacity / limit)')
+    args = parser.parse_args()
+
+    unknown = set(args.limiters) - set(LIMITERS)
+    if unknown:
+        print(f"Ошибка: неизвестные лимитеры: {', '.join(sorted(unknown))}")
+        sys.exit(1)
+    names = args.limiters or list(LIMITERS)
+
+    print(f"overhead: {args.calls} вызовов acquire() без ожидания")
+    for name in names:
+        ns = asyncio.run(overhead(name, args.calls))
+        print(f"  {name:<16} {ns:>8.0f} нс/вызов")
+
+    print(f"\ncontended: {args.waiters} ожидающих, rate={args.rate:g}/с, burst={args.burst}")
+    print(f"  {'лимитер':<16} {'время, с':>9} {'факт./с':>9} {'откл., %':>9} "
+          f"{'p50, мс':>8} {'p99, мс':>8} {'max, мс':>8}")
+    for name in names:
+        m = asyncio.run(contended(name, args.waiters, args.rate, args.burst))
+        print(f"  {name:<16} {m['elapsed']:>9.3f} {m['rate']:>9.0f} {m['error']:>+9.2f} "
+              f"{m['p50'] * 1000:>8.2f} {m['p99'] * 1000:>8.2f} {m['max'] * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный бенчмарк подходов из article/comparison_example.py на локальном
+mock PokeAPI (fetcher/mock_server.py) вместо настоящего pokeapi.co.
+
+Подходы:
+    semaphore           — все задачи сразу, обработка после gather (semaphore_approach)
+    worker_pool         — пул воркеров, обработка по мере готовности (worker_pool_approach)
+    worker_pool_dynamic — пул воркеров + асинхронный producer (worker_pool_dynamic_approach)
+
+Все подходы идут через fetch_all с его adaptive / hedge / breakers /
+dead_letters, так что замеряется та же связка, что работает в приложении.
+
+Сервер запускается отдельным процессом, каждый замер — тоже отдельный процесс,
+чтобы пиковый RSS относился только к одному подходу.
+
+Метрики: пропускная способность (страниц/с), время до первого результата,
+p50/p99 задержки страницы (от вызова fetch до ответа, включая ожидание
+лимитов и дубликаты), p99 ожидания соединения из пула, пиковый RSS
+клиента, число ошибок; с --cache — доля ответов из кэша.
+
+Использование (из каталога rate_limiting/):
+    python bench_strategies.py                               # 1k, 10k, 100k страниц
+    python bench_strategies.py --pages 1000 --concurrency 20
+    python bench_strategies.py --latency exp:0.01 --error-rate 0.01 --rate-429 0.01
+    python bench_strategies.py --max-concurrency 10          # лимит на стороне сервера
+    python bench_strategies.py --adaptive --max-concurrency 10 --reject-over-cap
+    python bench_strategies.py --latency lognormal:0.005:1 --hedge 0.95   # влияние на p99
+    python bench_strategies.py --error-rate 0.6 --breaker
+    python bench_strategies.py --concurrency 50 --pool-size 10             # узкое место — пул
+    python bench_strategies.py --gzip --cache                              # сжатые ответы через кэш
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from fetcher import (
+    PAGE_SIZE, AdaptiveLimit, CircuitBreakers, DeadLetterQueue, HedgePolicy, ResponseCache,
+    fetch_all, make_client,
+)
+
+
+HERE = Path(__file__).resolve().parent
+
+APPROACHES = ('semaphore', 'worker_pool', 'worker_pool_dynamic')
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(len(sorted_values) * q), len(sorted_values) - 1)]
+
+
+async def dynamic_offsets(total_pages, delay):
+    """Producer из worker_pool_dynamic_approach: смещения появляются постепенно."""
+    for i in range(total_pages):
+        yield i * PAGE_SIZE
+        await asyncio.sleep(delay)
+
+
+async def run_approach(approach, url, total_pages, concurrency, producer_delay, adaptive=False,
+                       hedge_quantile=None, breaker=False, pool_size=None, http2=False, cache=False):
+    """
+    Один прогон подхода через fetch_all; возвращает словарь метрик.
+    С adaptive=True concurrency — верхняя граница для AdaptiveLimit;
+    hedge_quantile включает дубликаты запросов, breaker — circuit breaker;
+    pool_size — размер пула соединений (по умолчанию concurrency);
+    cache — ResponseCache в памяти.
+    """
+    options = dict(
+        url=url,
+        adaptive=AdaptiveLimit(initial=min(5, concurrency), max_limit=concurrency) if adaptive else None,
+        hedge=HedgePolicy(quantile=hedge_quantile) if hedge_quantile else None,
+        breakers=CircuitBreakers(reset_timeout=0.5) if breaker else None,
+        # Как в article: ошибка страницы не останавливает остальные
+        dead_letters=DeadLetterQueue(),
+        latencies=[],
+    )
+    responses = ResponseCache() if cache else None
+    first_result = None
+    total_pokemon = 0
+    # Свой клиент, а не общий из get_client: у него pool_size отдельно от concurrency
+    async with make_client(pool_size or concurrency, http2=http2, cache=responses) as client:
+        start = time.perf_counter()
+        if approach == 'semaphore':
+            # Результаты доступны только после завершения всех запросов
+            pages = [page async for page in fetch_all(total_pages, 'semaphore', concurrency,
+                                                      client=client, **options)]
+            first_result = time.perf_counter()
+            total_pokemon = sum(len(page.results) for page in pages)
+        else:
+            pages = total_pages
+            if approach == 'worker_pool_dynamic':
+                pages = dynamic_offsets(total_pages, producer_delay)
+            async for page in fetch_all(pages, 'worker_pool', concurrency, client=client, **options):
+                if first_result is None:
+                    first_result = time.perf_counter()
+                total_pokemon += len(page.results)
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(options['latencies'])
+    gate, hedge, breakers = options['adaptive'], options['hedge'], options['breakers']
+    circuit = breakers.get(url) if breakers else None
+    return {
+        'approach': approach,
+        'pages': total_pages,
+        'pokemon': total_pokemon,
+        'errors': len(options['dead_letters']),
+        'elapsed': elapsed,
+        'throughput': total_pages / elapsed if elapsed else 0.0,
+        'ttfr': (first_result - start) if first_result else None,
+        'p50': percentile(latencies, 0.50),
+        'p99': percentile(latencies, 0.99),
+        # На Linux ru_maxrss в КБ
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'limit': gate.current if gate else concurrency,
+        'pool': client.pool_stats.metrics(),
+        'hedge': hedge.metrics() if hedge else None,
+        'breaker': circuit.metrics() if circuit else None,
+        'cache': responses.stats.as_dict() if responses else None,
+    }
+
+
+def start_server(args):
+    """Запустить mock-сервер отдельным процессом; вернуть (процесс, url)."""
+    command = [
+        sys.executable, '-m', 'fetcher.mock_server', '--port', '0',
+        '--latency', args.latency, '--error-rate', str(args.error_rate),
+        '--rate-429', str(args.rate_429), '--max-concurrency', str(args.max_concurrency),
+    ]
+    if args.reject_over_cap:
+        command.append('--reject-over-cap')
+    if args.gzip:
+        command.append('--gzip')
+    server = subprocess.Popen(command, cwd=HERE, stdout=subprocess.PIPE, text=True)
+    url = server.stdout.readline().strip()
+    if not url.startswith('http'):
+        server.kill()
+        print(f"Ошибка: mock-сервер не запустился ({url or 'нет вывода'})")
+        sys.exit(1)
+    return server, url
+
+
+def run_child(approach, url, pages, args):
+    """Замер в отдельном процессе; метрики приходят JSON-строкой в stdout."""
+    command = [
+        sys.executable, __file__, '--child', approach, '--url', url,
+        '--pages', str(pages), '--concurrency', str(args.concurrency),
+        '--producer-delay', str(args.producer_delay),
+    ]
+    if args.adaptive:
+        command.append('--adaptive')
+    if args.hedge:
+        command += ['--hedge', str(args.hedge)]
+    if args.breaker:
+        command.append('--breaker')
+    if args.pool_size:
+        command += ['--pool-size', str(args.pool_size)]
+    if args.http2:
+        command.append('--http2')
+    if args.cache:
+        command.append('--cache')
+    result = subprocess.run(command, cwd=HERE, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def format_row(m):
+    ttfr = f"{m['ttfr']:.3f}" if m['ttfr'] is not None else '—'
+    row = (f"{m['approach']:<20} {m['pages']:>7} {m['throughput']:>10.0f} {ttfr:>9} "
+           f"{m['p50'] * 1000:>8.1f} {m['p99'] * 1000:>8.1f} {m['pool']['wait_p99'] * 1000:>10.1f} "
+           f"{m['peak_rss_mb']:>8.1f} {m['errors']:>6} {m['limit']:>6}")
+    if m['hedge']:
+        row += f"  дубликатов {m['hedge']['hedged']}, выиграли {m['hedge']['hedge_wins']}"
+    if m['breaker']:
+        row += f"  breaker открывался {m['breaker']['opened']}, отклонил {m['breaker']['rejected']}"
+    if m['cache']:
+        row += f"  из кэша {m['cache']['hit_ratio']:.0%}"
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк semaphore vs worker pool на mock PokeAPI')
+    parser.add_argument('approaches', nargs='*', help=f"Подходы для замера: {', '.join(APPROACHES)} (по умолчанию все)")
+    parser.add_argument('--pages', type=int, nargs='+', default=[1000, 10000, 100000], help='Число страниц')
+    parser.add_argument('--concurrency', type=int, default=50, help='Одновременных запросов на клиенте')
+    parser.add_argument('--producer-delay', type=float, default=0.0,
+                        help='Пауза producer между смещениями для worker_pool_dynamic, с')
+    parser.add_argument('--latency', default='uniform:0.001:0.005', help='Распределение задержки сервера')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Доля ответов 500')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Доля ответов 429')
+    parser.add_argument('--max-concurrency', type=int, default=0, help='Лимит одновременных запросов на сервере')
+    parser.add_argument('--reject-over-cap', action='store_true', help='Сервер отвечает 503 сверх лимита')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='AIMD-лимит конкурентности (--concurrency — верхняя граница)')
+    parser.add_argument('--hedge', type=float, default=None, metavar='QUANTILE',
+                        help='Дубликат запроса после этого квантиля задержки, напр. 0.95')
+    parser.add_argument('--breaker', action='store_true', help='Circuit breaker на хост')
+    parser.add_argument('--pool-size', type=int, default=None,
+                        help='Соединений в пуле клиента (по умолчанию --concurrency)')
+    parser.add_argument('--http2', action='store_true',
+                        help='HTTP/2 (mock-сервер говорит только HTTP/1.1 — для настоящего API по HTTPS)')
+    parser.add_argument('--gzip', action='store_true', help='Сервер сжимает ответы gzip')
+    parser.add_argument('--cache', action='store_true', help='Клиент с ResponseCache в памяти')
+    parser.add_argument('--json', action='store_true', help='Вывести метрики в JSON')
+    parser.add_argument('--child', choices=APPROACHES, help=argparse.SUPPRESS)
+    parser.add_argument('--url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        metrics = asyncio.run(run_approach(
+            args.child, args.url, args.pages[0], args.concurrency, args.producer_delay, args.adaptive,
+            args.hedge, args.breaker, args.pool_size, args.http2, args.cache))
+        print(json.dumps(metrics))
+        return
+
+    unknown = set(args.approaches) - set(APPROACHES)
+    if unknown:
+        print(f"Ошибка: неизвестные подходы: {', '.join(sorted(unknown))}")
+        sys.exit(1)
+    approaches = args.approaches or APPROACHES
+    server, url = start_server(args)
+    results = []
+    try:
+        if not args.json:
+            print(f"mock-сервер: {url}, задержка {args.latency}, concurrency {args.concurrency}\n")
+            print(f"{'подход':<20} {'страниц':>7} {'стр/с':>10} {'TTFR, с':>9} "
+                  f"{'p50, мс':>8} {'p99, мс':>8} {'пул p99, мс':>10} {'RSS, МБ':>8} {'ошибок':>6} {'лимит':>6}")
+        for pages in args.pages:
+            for approach in approaches:
+                metrics = run_child(approach, url, pages, args)
+                results.append(metrics)
+                if not args.json:
+                    print(format_row(metrics), flush=True)
+    finally:
+        server.terminate()
+        server.wait()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Библиотека для асинхронной загрузки страниц PokeAPI.
+
+Собирает в одно API стратегии из article/: последовательную, gather без
+ограничений, Semaphore + gather и пул воркеров. Все стратегии работают через
+один общий httpx.AsyncClient и отдают страницы асинхронным итератором
+по мере готовности. Частоту запросов ограничивает limiter (см. limiter.py):
+    fetch_all(100, limiter=TokenBucket(rate=10, capacity=20))
+а число одновременных запросов может подстраиваться само (см. adaptive.py):
+    fetch_all(100, concurrency=50, adaptive=AdaptiveLimit(initial=5, max_limit=50))
+Временные ошибки повторяются, а неудачные страницы собираются (см. retry.py):
+    fetch_all(100, retry=RetryPolicy(), dead_letters=DeadLetterQueue())
+От медленного сервера защищают breaker и дубликаты запросов (breaker.py, hedging.py):
+    fetch_all(100, breakers=CircuitBreakers(), hedge=HedgePolicy(quantile=0.95))
+Повторные запуски отвечают из кэша с ревалидацией по ETag (cache.py):
+    fetch_all(cache=ResponseCache(path='responses.sqlite'))
+Обработка без ожидания всех ответов, при желании — в порядке смещений (streaming.py):
+    async for results in stream_pages(100, ordered=True): ...
+
+Использование (из каталога rate_limiting/):
+    import asyncio
+    from fetcher import fetch_all
+
+    async def main():
+        # Без числа страниц: count и next читаются из первой страницы
+        async for page in fetch_all(strategy='worker_pool', concurrency=5):
+            print(page.offset, len(page.results))
+
+    asyncio.run(main())
+"""
+
+import time
+from contextlib import aclosing
+from functools import partial
+
+import httpx
+
+from .adaptive import AdaptiveLimit
+from .breaker import CircuitBreaker, CircuitBreakers, CircuitOpenError
+from .cache import CacheStats, CachingTransport, ResponseCache
+from .client import API_URL, PAGE_SIZE, FetchClient, Page, close_client, fetch_page, get_client, make_client
+from .hedging import HedgePolicy
+from .pool import PoolStats, PoolTimingTransport, pool_limits
+from .limiter import LIMITERS, LeakyBucket, LimiterFull, RateLimiter, SlidingWindowLog, TokenBucket
+from .pagination import SpeculativeOffsets, plan_offsets
+from .queues import WatermarkQueue
+from .retry import DeadLetter, DeadLetterQueue, RetryBudget, RetryPolicy
+from .strategies import STRATEGIES
+from .streaming import ReorderBuffer
+
+
+def page_offsets(pages, limit=PAGE_SIZE):
+    """Число страниц -> смещения 0, limit, 2*limit...; иначе pages — уже смещения."""
+    if isinstance(pages, int):
+        return range(0, pages * limit, limit)
+    return pages
+
+
+async def fetch_all(pages=None, strategy='worker_pool', concurrency=5, *,
+                    client=None, url=API_URL, limit=PAGE_SIZE, limiter=None, adaptive=None,
+                    high_watermark=None, low_watermark=None, queues=None, latencies=None,
+                    retry=None, dead_letters=None, breakers=None, hedge=None, cache=None,
+                    http2=False, reorder=None):
+    """
+    Загрузить страницы выбранной стратегией и отдавать их по мере готовности.
+
+    pages       — число страниц, iterable смещений или None — определить
+                  по первой странице (см. pagination.py)
+    strategy    — 'sequential', 'gather', 'semaphore' или 'worker_pool'
+    concurrency — сколько запросов одновременно (для semaphore и worker_pool)
+    client      — свой httpx.AsyncClient (по умолчанию общий, см. get_client:
+                  его пул соединений подогнан под concurrency)
+    cache, http2 — кэш ответов и HTTP/2 для общего клиента (со своим client
+                  не используются)
+    limiter     — общий для всех запросов RateLimiter (запросов в секунду)
+    adaptive    — AdaptiveLimit: одновременно выполняется не concurrency,
+                  а adaptive.current запросов (concurrency — верхняя граница)
+    high_watermark, low_watermark, queues — размеры очередей пула воркеров
+                  и словарь для их метрик (см. strategies.worker_pool)
+    latencies   — список для метрик: в него добавляется задержка каждой
+                  загруженной страницы, включая ожидание limiter и adaptive,
+                  повторы и дубликаты hedge
+    retry       — RetryPolicy для временных ошибок; каждая попытка заново
+                  проходит limiter и adaptive
+    dead_letters — DeadLetterQueue: страница, которую не удалось загрузить,
+                  попадает туда и пропускается; без неё ошибка пробрасывается
+    breakers    — CircuitBreakers: при открытом breaker'е хоста запрос
+                  не отправляется (CircuitOpenError)
+    hedge       — HedgePolicy: дубликат запроса после p95 задержки
+    reorder     — ReorderBuffer: страницы отдаются в порядке смещений,
+                  всегда через пул воркеров (см. streaming.py)
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"неизвестная стратегия {strategy!r}, доступны: {', '.join(STRATEGIES)}")
+    if client is None:
+        # gather и sequential concurrency не используют — пул по умолчанию
+        pool_size = concurrency if strategy in ('semaphore', 'worker_pool') else None
+        client = get_client(cache, pool_size, http2)
+
+    async def request(offset):
+        if adaptive is None:
+            return await fetch_page(client, offset, limit, url)
+        async with adaptive.slot():
+            return await fetch_page(client, offset, limit, url)
+
+    # Дубликаты hedge не проходят limiter: их доля ограничена самой HedgePolicy
+    call = request if hedge is None else partial(hedge.call, request)
+    breaker = breakers.get(url) if breakers is not None else None
+
+    async def attempt(offset):
+        if limiter is not None:
+            await limiter.acquire()
+        if breaker is None:
+            return await call(offset)
+        return await breaker.call(call, offset)
+
+    async def fetch_or_raise(offset):
+        if retry is None:
+            return await attempt(offset)
+        return await retry.call(attempt, offset)
+
+    async def fetch(offset):
+        begin = time.perf_counter()
+        if dead_letters is None:
+            page = await fetch_or_raise(offset)
+        else:
+            try:
+                page = await fetch_or_raise(offset)
+            except httpx.HTTPError as e:
+                dead_letters.put(offset, e)
+                return None
+        if latencies is not None:
+            latencies.append(time.perf_counter() - begin)
+        return page
+
+    if pages is None:
+        # Без первой страницы число страниц не узнать — её ошибка не глушится
+        first = await fetch_or_raise(0)
+        yield first
+        step, offsets = plan_offsets(first, limit)
+        if offsets is None:
+            # Всего страниц неизвестно: окно наперёд, пока не придёт пустая страница.
+            # Нужен async-итератор смещений, поэтому всегда пул воркеров
+            speculative = SpeculativeOffsets(step, step, window=concurrency * 2)
+            plain_fetch = fetch
+
+            async def fetch(offset):
+                page = await plain_fetch(offset)
+                await speculative.done(offset, page)
+                return page
+
+            strategy, offsets = 'worker_pool', speculative
+    else:
+        offsets = page_offsets(pages, limit)
+    if reorder is not None:
+        # Окно переупорядочивания ограничивает и отправку смещений —
+        # нужен async-итератор, поэтому пул воркеров
+        strategy, offsets = 'worker_pool', reorder.gate(offsets)
+
+    async def tagged(offset):
+        return offset, await fetch(offset)
+
+    options = {}
+    if strategy == 'worker_pool':
+        options = dict(high_watermark=high_watermark, low_watermark=low_watermark, queues=queues)
+
+    # aclosing: при раннем выходе потребителя задачи стратегии отменяются сразу
+    async with aclosing(STRATEGIES[strategy](tagged, offsets, concurrency, **options)) as stream:
+        async for offset, page in stream:
+            ready = [page] if reorder is None else reorder.push(offset, page)
+            for page in ready:
+                # None — страница ушла в dead letters; спекулятивные запросы
+                # за концом данных возвращают пустые страницы
+                if page is None or (pages is None and not page.results):
+                    continue
+                yield page
+
+
+async def stream_pages(pages=None, concurrency=5, *, ordered=False, reorder_window=None, **options):
+    """
+    Отдавать results каждой страницы сразу после загрузки (пул воркеров).
+
+    ordered        — в порядке смещений, а не в порядке завершения
+    reorder_window — сколько страниц может быть в полёте и в буфере
+                     переупорядочивания (по умолчанию 2 * concurrency)
+    options        — остальные параметры fetch_all (limiter, retry, cache...)
+    """
+    reorder = None
+    if ordered:
+        reorder = ReorderBuffer(reorder_window or concurrency * 2)
+    async with aclosing(fetch_all(pages, 'worker_pool', concurrency, reorder=reorder, **options)) as stream:
+        async for page in stream:
+            yield page.results
+
+
+__all__ = [
+    'API_URL', 'PAGE_SIZE', 'Page', 'STRATEGIES', 'AdaptiveLimit',
+    'LIMITERS', 'RateLimiter', 'TokenBucket', 'LeakyBucket', 'SlidingWindowLog', 'LimiterFull',
+    'SpeculativeOffsets', 'plan_offsets', 'WatermarkQueue',
+    'RetryPolicy', 'RetryBudget', 'DeadLetter', 'DeadLetterQueue',
+    'CircuitBreaker', 'CircuitBreakers', 'CircuitOpenError', 'HedgePolicy',
+    'ResponseCache', 'CachingTransport', 'CacheStats',
+    'FetchClient', 'PoolStats', 'PoolTimingTransport', 'pool_limits', 'ReorderBuffer',
+    'fetch_all', 'stream_pages', 'fetch_page', 'page_offsets', 'get_client', 'make_client', 'close_client',
+]
@@ -0,0 +1,172 @@
+"""
+Адаптивное ограничение конкурентности (AIMD).
+
+Вместо фиксированных workers_count = 5 или Semaphore(10) лимит подбирается
+по ответам сервера:
+    + increase  — после каждых limit успешных запросов без роста задержки
+                  (аддитивный рост, как окно TCP за один RTT)
+    * decrease  — на 429, 5xx, таймаут, обрыв соединения или всплеск задержки
+                  (мультипликативный спад)
+
+Всплеск задержки — сглаженная задержка больше baseline * latency_tolerance,
+где baseline — задержка без нагрузки: быстро опускается к новому минимуму
+и медленно дрейфует вверх, если сервер стал медленнее насовсем.
+
+Лимит меняется на лету: воркеров (или мест в семафоре) заводится max_limit,
+а в запрос одновременно пускается только limit, так что пул не перезапускается.
+
+Использование:
+    adaptive = AdaptiveLimit(initial=5, max_limit=100)
+    async for page in fetch_all(1000, concurrency=100, adaptive=adaptive):
+        ...
+    print(adaptive.metrics())
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+import httpx
+
+
+def is_overload(error):
+    """429, 5xx, таймауты и обрывы соединения — сигнал перегрузки."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    # Перегруженный сервер чаще не отвечает вовсе, чем отвечает 503
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+
+
+class AdaptiveLimit:
+    """Гейт с лимитом одновременных запросов, который подстраивается по AIMD."""
+
+    def __init__(self, initial=5, min_limit=1, max_limit=100, increase=1.0, decrease=0.5,
+                 latency_tolerance=2.0, throughput_window=5.0):
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError("нужно 1 <= min_limit <= initial <= max_limit")
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.throughput_window = throughput_window
+
+        self.in_flight = 0
+        self._waiters = deque()
+        # Эпоха меняется при каждом снижении: запросы, начатые до снижения,
+        # не снижают лимит повторно — одна перегрузка даёт один спад
+        self._epoch = 0
+        self._successes = 0
+        self._baseline = None
+        self._smoothed = None
+        self._completed = deque()
+        self.increases = 0
+        self.decreases = 0
+
+    @property
+    def current(self):
+        """Текущий целочисленный лимит."""
+        return max(self.min_limit, int(self.limit))
+
+    async def acquire(self):
+        """Дождаться места; возвращает эпоху, которую нужно передать в release()."""
+        if self.in_flight < self.current and not self._waiters:
+            self.in_flight += 1
+            return self._epoch
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Место уже выдано — возвращаем его следующему
+                self.in_flight -= 1
+                self._wake()
+            raise
+        return self._epoch
+
+    def release(self, epoch, latency, overloaded=False, cancelled=False):
+        """
+        Освободить место и учесть результат запроса. Отменённый запрос
+        (например, проигравший дубликат hedge) ничего не говорит о сервере:
+        ни рост, ни спад лимита.
+        """
+        self.in_flight -= 1
+        if cancelled:
+            self._wake()
+            return
+        now = time.monotonic()
+        self._completed.append(now)
+        while self._completed and self._completed[0] < now - self.throughput_window:
+            self._completed.popleft()
+
+        if overloaded or self._latency_spike(latency):
+            if epoch == self._epoch:
+                self.limit = max(self.min_limit, self.limit * self.decrease)
+                self._epoch += 1
+                self._successes = 0
+                self.decreases += 1
+        elif latency is not None:
+            # Прочие ошибки (404 и т.п.) лимит не двигают ни вниз, ни вверх
+            self._successes += 1
+            if self._successes >= self.current:
+                self.limit = min(self.max_limit, self.limit + self.increase)
+                self._successes = 0
+                self.increases += 1
+        self._wake()
+
+    def _latency_spike(self, latency):
+        if latency is None:
+            return False
+        if self._baseline is None:
+            self._baseline = self._smoothed = latency
+            return False
+        self._smoothed += (latency - self._smoothed) * 0.3
+        if latency < self._baseline:
+            self._baseline = latency
+        else:
+            self._baseline += (latency - self._baseline) * 0.01
+        return self._smoothed > self._baseline * self.latency_tolerance
+
+    def _wake(self):
+        while self._waiters and self.in_flight < self.current:
+            future = self._waiters.popleft()
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Место на время одного запроса; задержка и ошибки учитываются сами."""
+        epoch = await self.acquire()
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.release(epoch, None, overloaded=is_overload(e))
+            raise
+        except BaseException:
+            self.release(epoch, None, cancelled=True)
+            raise
+        self.release(epoch, time.perf_counter() - start)
+
+    @property
+    def throughput(self):
+        """Завершённых запросов в секунду за последние throughput_window секунд."""
+        now = time.monotonic()
+        recent = sum(1 for stamp in self._completed if stamp >= now - self.throughput_window)
+        return recent / self.throughput_window
+
+    def metrics(self):
+        return {
+            'limit': self.current,
+            'in_flight': self.in_flight,
+            'waiting': len(self._waiters),
+            'throughput': self.throughput,
+            'baseline_latency': self._baseline,
+            'increases': self.increases,
+            'decreases': self.decreases,
+        }
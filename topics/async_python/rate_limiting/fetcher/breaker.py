@@ -0,0 +1,140 @@
+"""
+Circuit breaker на хост: closed -> open -> half-open -> closed.
+
+Когда сервер тормозит или падает, воркеры без breaker'а продолжают
+висеть на нём, и пропускная способность проваливается. Breaker считает
+исходы последних window запросов; если доля неудач (ошибки сети,
+таймауты, 429/5xx и запросы медленнее slow_call) не меньше failure_rate,
+он открывается: запросы сразу получают CircuitOpenError, не занимая
+ни воркер, ни соединение. Через reset_timeout breaker переходит в
+half-open и пропускает half_open_calls пробных запросов: успех
+закрывает его, неудача — снова открывает.
+
+CircuitOpenError — подкласс httpx.HTTPError, но не временная ошибка:
+RetryPolicy его не повторяет, и страница сразу уходит в dead letters.
+
+Использование:
+    breakers = CircuitBreakers(failure_rate=0.5, reset_timeout=5)
+    async for page in fetch_all(100, breakers=breakers): ...
+    print(breakers.metrics())
+"""
+
+import time
+from collections import deque
+
+import httpx
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(httpx.HTTPError):
+    """Breaker открыт — запрос не отправлялся."""
+
+
+def is_failure(error):
+    """Ошибки, говорящие о проблеме сервера (а не запроса)."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+class CircuitBreaker:
+    """Breaker одного хоста."""
+
+    def __init__(self, failure_rate=0.5, window=20, min_calls=10, slow_call=None,
+                 reset_timeout=5.0, half_open_calls=1, name=''):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.slow_call = slow_call
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.name = name
+
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window)  # True — неудача
+        self._opened_at = 0.0
+        self._trials = 0
+        self.rejected = 0
+        self.opened = 0
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self.opened += 1
+
+    def _allow(self):
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self.state = HALF_OPEN
+            self._trials = 0
+        if self.state == HALF_OPEN:
+            if self._trials >= self.half_open_calls:
+                return False
+            self._trials += 1
+        return True
+
+    def _record(self, failed):
+        if self.state == OPEN:
+            # Запрос начался до открытия — на решение он уже не влияет
+            return
+        if self.state == HALF_OPEN:
+            if failed:
+                self._open()
+            else:
+                self.state = CLOSED
+                self._outcomes.clear()
+            return
+        self._outcomes.append(failed)
+        if len(self._outcomes) >= self.min_calls:
+            if sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+                self._open()
+                self._outcomes.clear()
+
+    async def call(self, fn, *args):
+        """Выполнить fn(*args) через breaker; открыт — CircuitOpenError."""
+        if not self._allow():
+            self.rejected += 1
+            raise CircuitOpenError(f"circuit breaker {self.name} открыт" if self.name else "circuit breaker открыт")
+        start = time.perf_counter()
+        try:
+            result = await fn(*args)
+        except Exception as e:
+            if is_failure(e):
+                self._record(True)
+            elif self.state == HALF_OPEN:
+                # Ошибка самого запроса (404 и т.п.) о здоровье сервера не говорит
+                self._trials -= 1
+            raise
+        except BaseException:
+            # Отмена: пробное место возвращаем, исход не учитываем
+            if self.state == HALF_OPEN:
+                self._trials -= 1
+            raise
+        slow = self.slow_call is not None and time.perf_counter() - start > self.slow_call
+        self._record(slow)
+        return result
+
+    def metrics(self):
+        return {'state': self.state, 'opened': self.opened, 'rejected': self.rejected}
+
+
+class CircuitBreakers:
+    """Breaker'ы по хостам с общими настройками."""
+
+    def __init__(self, **config):
+        self.config = config
+        self.by_host = {}
+
+    def get(self, url):
+        host = httpx.URL(url).netloc.decode('ascii')
+        if host not in self.by_host:
+            self.by_host[host] = CircuitBreaker(name=host, **self.config)
+        return self.by_host[host]
+
+    def metrics(self):
+        return {host: breaker.metrics() for host, breaker in self.by_host.items()}
@@ -0,0 +1,300 @@
+"""
+Кэш HTTP-ответов под общим httpx.AsyncClient.
+
+Примеры из article/ при каждом запуске заново скачивают одни и те же
+?limit=50&offset=N. CachingTransport оборачивает транспорт клиента и
+отвечает из кэша:
+    свежая запись (TTL или Cache-Control: max-age)   — без запроса к серверу
+    устаревшая с ETag / Last-Modified                — условный запрос;
+                                                       304 продлевает запись
+    одинаковые запросы одновременно                  — один запрос к серверу,
+                                                       остальные ждут его ответ
+
+Два уровня: LRU в памяти с бюджетом в байтах и SQLite на диске
+(необязательно). Запись с диска поднимается в память при чтении.
+
+Использование:
+    cache = ResponseCache(memory_bytes=32 * 2**20, path='responses.sqlite', ttl=3600)
+    async for page in fetch_all(cache=cache): ...
+    print(cache.stats.as_dict())   # hit_ratio, bytes_saved, ...
+
+Дубликаты hedge (см. hedging.py) в склейку не попадают: подклеенный
+к основной попытке дубликат ждал бы тот же медленный ответ, ради обгона
+которого его отправили. Свежая запись в кэше отдаётся и им.
+"""
+
+import asyncio
+import json
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import httpx
+
+from .hedging import is_hedge_attempt
+
+
+# Заголовки, которые не имеет смысла хранить и отдавать из кэша
+HOP_HEADERS = {'connection', 'keep-alive', 'transfer-encoding', 'date'}
+# aread() отдаёт уже распакованное тело: с этими заголовками httpx
+# распаковал бы его повторно (gzip/br от pokeapi.co) и упал с DecodingError
+BODY_HEADERS = {'content-encoding', 'content-length'}
+
+MAX_AGE = re.compile(r'max-age=(\d+)')
+
+
+@dataclass
+class Entry:
+    status: int
+    headers: list
+    body: bytes
+    expires: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @property
+    def size(self):
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers)
+
+    def fresh(self, now):
+        return now < self.expires
+
+    def response(self, request):
+        return httpx.Response(self.status, headers=plain_headers(self.headers), content=self.body,
+                              request=request)
+
+
+def plain_headers(headers):
+    """Заголовки для распакованного тела: без hop-by-hop, Content-Encoding и Content-Length."""
+    items = headers.multi_items() if isinstance(headers, httpx.Headers) else headers
+    return [(k, v) for k, v in items if k.lower() not in HOP_HEADERS and k.lower() not in BODY_HEADERS]
+
+
+@dataclass
+class CacheStats:
+    requests: int = 0
+    hits: int = 0
+    revalidated: int = 0
+    coalesced: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    bytes_saved: int = 0
+
+    @property
+    def hit_ratio(self):
+        served = self.hits + self.revalidated + self.coalesced
+        return served / self.requests if self.requests else 0.0
+
+    def as_dict(self):
+        return dict(vars(self), hit_ratio=self.hit_ratio)
+
+
+class MemoryTier:
+    """LRU по байтам: при превышении budget вытесняются давно не читанные записи."""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.used = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        """Сохранить запись; возвращает число вытесненных."""
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.used -= old.size
+        if entry.size > self.budget:
+            return 0
+        self._entries[key] = entry
+        self.used += entry.size
+        evicted = 0
+        while self.used > self.budget:
+            _, victim = self._entries.popitem(last=False)
+            self.used -= victim.size
+            evicted += 1
+        return evicted
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskTier:
+    """Записи в SQLite: переживают перезапуск процесса."""
+
+    def __init__(self, path):
+        self._db = sqlite3.connect(path)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' key TEXT PRIMARY KEY, status INTEGER, headers TEXT, body BLOB,'
+            ' expires REAL, etag TEXT, last_modified TEXT)'
+        )
+        self._db.commit()
+
+    def get(self, key):
+        row = self._db.execute(
+            'SELECT status, headers, body, expires, etag, last_modified FROM responses WHERE key = ?',
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        status, headers, body, expires, etag, last_modified = row
+        return Entry(status, [tuple(h) for h in json.loads(headers)], body, expires, etag, last_modified)
+
+    def put(self, key, entry):
+        self._db.execute(
+            'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (key, entry.status, json.dumps(entry.headers), entry.body,
+             entry.expires, entry.etag, entry.last_modified),
+        )
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+
+class ResponseCache:
+    """
+    Двухуровневый кэш GET-ответов 200.
+
+    memory_bytes — бюджет LRU в памяти
+    path         — файл SQLite для дискового уровня (None — только память)
+    ttl          — срок свежести, если сервер не прислал Cache-Control: max-age
+    """
+
+    def __init__(self, memory_bytes=64 * 2**20, path=None, ttl=300.0):
+        self.memory = MemoryTier(memory_bytes)
+        self.disk = DiskTier(path) if path is not None else None
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._in_flight = {}
+
+    @staticmethod
+    def key(request):
+        url = request.url
+        query = sorted(url.params.multi_items())
+        return f'{url.scheme}://{url.netloc.decode("ascii")}{url.path}?{httpx.QueryParams(query)}'
+
+    def lookup(self, key):
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self.stats.evictions += self.memory.put(key, entry)
+        return entry
+
+    def store(self, key, entry):
+        self.stats.stores += 1
+        self.stats.evictions += self.memory.put(key, entry)
+        if self.disk is not None:
+            self.disk.put(key, entry)
+
+    def entry_for(self, response, body):
+        """Запись для ответа или None, если его нельзя кэшировать."""
+        control = response.headers.get('Cache-Control', '').lower()
+        if response.status_code != 200 or 'no-store' in control:
+            return None
+        match = MAX_AGE.search(control)
+        ttl = 0.0 if 'no-cache' in control else float(match.group(1)) if match else self.ttl
+        return Entry(200, plain_headers(response.headers), body, time.time() + ttl,
+                     response.headers.get('ETag'), response.headers.get('Last-Modified'))
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """Транспорт httpx, отвечающий из ResponseCache; остальное — во внутренний транспорт."""
+
+    def __init__(self, cache, transport=None):
+        self.cache = cache
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request):
+        if request.method != 'GET':
+            return await self.transport.handle_async_request(request)
+        cache = self.cache
+        stats = cache.stats
+        stats.requests += 1
+        key = cache.key(request)
+
+        entry = cache.lookup(key)
+        if entry is not None and entry.fresh(time.time()):
+            stats.hits += 1
+            stats.bytes_saved += len(entry.body)
+            return entry.response(request)
+
+        if is_hedge_attempt():
+            # Дубликат hedge идёт к серверу сам и в _in_flight не регистрируется
+            response, _ = await self._fetch(request, key, entry)
+            return response
+
+        # Такой же запрос уже в пути — ждём его результат
+        in_flight = cache._in_flight.get(key)
+        if in_flight is not None:
+            result = await asyncio.shield(in_flight)
+            if isinstance(result, Entry):
+                stats.coalesced += 1
+                stats.bytes_saved += len(result.body)
+                return result.response(request)
+            # Ответ не кэшируется — идём сами
+
+        future = asyncio.get_running_loop().create_future()
+        cache._in_flight[key] = future
+        try:
+            response, result = await self._fetch(request, key, entry)
+        except BaseException:
+            future.set_result(None)
+            raise
+        finally:
+            if cache._in_flight.get(key) is future:
+                del cache._in_flight[key]
+        future.set_result(result)
+        return response
+
+    async def _fetch(self, request, key, stale):
+        """Запрос к серверу (условный, если есть валидаторы). Возвращает (ответ, запись)."""
+        cache = self.cache
+        if stale is not None and (stale.etag or stale.last_modified):
+            headers = dict(request.headers)
+            if stale.etag:
+                headers['If-None-Match'] = stale.etag
+            if stale.last_modified:
+                headers['If-Modified-Since'] = stale.last_modified
+            request = httpx.Request(request.method, request.url, headers=headers,
+                                    extensions=request.extensions)
+
+        response = await self.transport.handle_async_request(request)
+        if response.status_code == 304 and stale is not None:
+            await response.aclose()
+            refreshed = cache.entry_for(httpx.Response(200, headers=plain_headers(response.headers)),
+                                        stale.body)
+            # 304 может не повторять все заголовки — берём сохранённые
+            stale.expires = refreshed.expires if refreshed else time.time() + cache.ttl
+            cache.store(key, stale)
+            cache.stats.revalidated += 1
+            cache.stats.bytes_saved += len(stale.body)
+            return stale.response(request), stale
+
+        cache.stats.misses += 1
+        body = await response.aread()
+        await response.aclose()
+        entry = cache.entry_for(response, body)
+        if entry is not None:
+            cache.store(key, entry)
+        fresh = httpx.Response(response.status_code, headers=plain_headers(response.headers), content=body,
+                               request=request, extensions=response.extensions)
+        return fresh, entry
+
+    async def aclose(self):
+        await self.transport.aclose()
@@ -0,0 +1,106 @@
+"""
+Общий httpx.AsyncClient и запрос одной страницы.
+
+make_client() собирает клиент: пул соединений под конкурентность,
+HTTP/2 по желанию, замер ожидания пула (pool.py) и кэш ответов (cache.py).
+
+get_client() — общий клиент на event loop (и на кэш/HTTP/2), который
+переиспользуется всеми стратегиями, поэтому TCP/TLS соединения не
+открываются заново на каждый запуск.
+"""
+
+import asyncio
+import time
+import weakref
+from dataclasses import dataclass
+
+import httpx
+
+from .cache import CachingTransport
+from .pool import PoolStats, PoolTimingTransport, pool_limits
+
+
+API_URL = "https://pokeapi.co/api/v2/pokemon"
+PAGE_SIZE = 50
+
+# event loop -> {(кэш, http2): клиент}; клиент привязан к loop, в котором открыты соединения
+_clients = weakref.WeakKeyDictionary()
+# Клиенты, заменённые более крупными: в них ещё могут идти запросы, закрываются в close_client
+_retired = weakref.WeakKeyDictionary()
+
+
+@dataclass
+class Page:
+    """Загруженная страница: смещение, список results, время запроса и весь ответ."""
+    offset: int
+    results: list
+    elapsed: float
+    data: dict
+
+
+class FetchClient(httpx.AsyncClient):
+    """httpx.AsyncClient, который помнит, под какую конкурентность собран, и считает ожидание пула."""
+
+    def __init__(self, *, concurrency, pool_stats, **kwargs):
+        super().__init__(**kwargs)
+        self.concurrency = concurrency
+        self.pool_stats = pool_stats
+
+
+def make_client(concurrency=None, *, http2=False, cache=None, timeout=30.0):
+    """
+    Клиент с пулом на concurrency соединений (см. pool_limits).
+
+    http2 — HTTP/2 (нужен пакет h2: pip install 'httpx[http2]'); по HTTPS
+            все запросы к хосту мультиплексируются в одно соединение
+    cache — ResponseCache поверх пула
+    """
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            raise ImportError("для HTTP/2 нужен пакет h2: pip install 'httpx[http2]'") from None
+    stats = PoolStats()
+    transport = PoolTimingTransport(
+        httpx.AsyncHTTPTransport(limits=pool_limits(concurrency), http2=http2), stats)
+    if cache is not None:
+        transport = CachingTransport(cache, transport)
+    return FetchClient(concurrency=concurrency, pool_stats=stats, transport=transport, timeout=timeout)
+
+
+def get_client(cache=None, concurrency=None, http2=False):
+    """
+    Общий клиент для текущего event loop (создаётся при первом обращении).
+
+    С cache (ResponseCache) — клиент, отвечающий через этот кэш. Если нужна
+    конкурентность больше, чем у существующего клиента, он заменяется
+    клиентом с пулом побольше — иначе пул молча урезал бы конкурентность.
+    """
+    loop = asyncio.get_running_loop()
+    clients = _clients.setdefault(loop, {})
+    key = (cache, http2)
+    client = clients.get(key)
+    if client is not None and not client.is_closed:
+        if concurrency is None or (client.concurrency is not None and client.concurrency >= concurrency):
+            return client
+        _retired.setdefault(loop, []).append(client)
+    client = make_client(concurrency, http2=http2, cache=cache)
+    clients[key] = client
+    return client
+
+
+async def close_client():
+    """Закрыть общие клиенты текущего event loop."""
+    loop = asyncio.get_running_loop()
+    clients = list(_clients.pop(loop, {}).values()) + _retired.pop(loop, [])
+    for client in clients:
+        await client.aclose()
+
+
+async def fetch_page(client, offset, limit=PAGE_SIZE, url=API_URL):
+    """Загрузить одну страницу. Ошибки HTTP пробрасываются (httpx.HTTPError)."""
+    start = time.perf_counter()
+    response = await client.get(url, params={"limit": limit, "offset": offset})
+    response.raise_for_status()
+    data = response.json()
+    return Page(offset, data["results"], time.perf_counter() - start, data)
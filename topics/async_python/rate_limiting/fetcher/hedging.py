@@ -0,0 +1,126 @@
+"""
+Hedged requests: дубликат запроса после p95 задержки.
+
+Если ответ не пришёл за quantile-задержку последних запросов, отправляется
+второй такой же запрос; берётся тот, что ответит первым, второй отменяется.
+Хвост задержек (p99) почти целиком состоит из «неудачных» запросов, и
+дубликат срезает его ценой нескольких процентов лишней нагрузки.
+
+Лишняя нагрузка ограничена: дубликатов не больше max_ratio от всех
+запросов, а пока задержек меньше min_samples, вместо квантиля
+используется initial_delay (None — не дублировать вовсе).
+
+Дубликат выполняется с is_hedge_attempt() == True: кэш (CachingTransport)
+по этому признаку не подклеивает его к основной попытке, которая ещё в пути.
+
+Использование:
+    hedge = HedgePolicy(quantile=0.95)
+    async for page in fetch_all(100, hedge=hedge): ...
+    print(hedge.metrics())
+"""
+
+import asyncio
+import bisect
+import contextvars
+from collections import deque
+
+
+_hedge_attempt = contextvars.ContextVar('hedge_attempt', default=False)
+
+
+def is_hedge_attempt():
+    """Выполняется ли текущая задача как дубликат HedgePolicy."""
+    return _hedge_attempt.get()
+
+
+class HedgePolicy:
+    """Когда отправлять дубликат и сколько их можно."""
+
+    def __init__(self, quantile=0.95, min_samples=20, initial_delay=None, max_ratio=0.1,
+                 history=1000):
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self.max_ratio = max_ratio
+        # Последние задержки в порядке поступления и отсортированные — для квантиля
+        self._recent = deque()
+        self._sorted = []
+        self._history = history
+
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def record(self, latency):
+        if len(self._recent) == self._history:
+            old = self._recent.popleft()
+            del self._sorted[bisect.bisect_left(self._sorted, old)]
+        self._recent.append(latency)
+        bisect.insort(self._sorted, latency)
+
+    def delay(self):
+        """Через сколько секунд отправлять дубликат; None — не отправлять."""
+        if len(self._sorted) < self.min_samples:
+            return self.initial_delay
+        return self._sorted[min(int(len(self._sorted) * self.quantile), len(self._sorted) - 1)]
+
+    def _may_hedge(self):
+        return self.hedged < self.max_ratio * self.requests
+
+    async def call(self, fn, *args):
+        """fn(*args) с дубликатом после delay(); результат первого успешного."""
+        loop = asyncio.get_running_loop()
+        self.requests += 1
+        start = loop.time()
+        primary = asyncio.ensure_future(fn(*args))
+        tasks = [primary]
+        try:
+            delay = self.delay()
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done and self._may_hedge():
+                    self.hedged += 1
+                    # Задача копирует контекст при создании — метка видна только дубликату
+                    token = _hedge_attempt.set(True)
+                    try:
+                        tasks.append(asyncio.ensure_future(fn(*args)))
+                    finally:
+                        _hedge_attempt.reset(token)
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Основная попытка важнее дубликата, если обе закончились разом
+                ordered = sorted(done, key=lambda task: task is not primary)
+                winner = next((task for task in ordered if task.exception() is None), None)
+                if winner is not None:
+                    self._record_primary(primary, loop.time() - start)
+                    if winner is not primary:
+                        self.hedge_wins += 1
+                    return winner.result()
+                for task in ordered:
+                    error = error or task.exception()
+            # Оба запроса упали — пробрасываем первую ошибку
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _record_primary(self, primary, elapsed):
+        """
+        В историю идёт задержка основной попытки, а не победителя: иначе
+        быстрые дубликаты смещают квантиль вниз и дубликатов становится больше.
+        Основная ещё в пути (выиграл дубликат) — её задержка не меньше
+        elapsed, записываем его; упавшая основная ничего не говорит о задержке.
+        """
+        if not primary.done() or primary.exception() is None:
+            self.record(elapsed)
+
+    def metrics(self):
+        return {
+            'requests': self.requests,
+            'hedged': self.hedged,
+            'hedge_wins': self.hedge_wins,
+            'delay': self.delay(),
+        }
@@ -0,0 +1,207 @@
+"""
+Ограничители частоты запросов (замена aiolimiter.AsyncLimiter из solution.py).
+
+Три алгоритма с общим интерфейсом:
+    TokenBucket(rate, capacity)      — токены копятся со скоростью rate до capacity;
+                                       capacity — допустимый всплеск
+    LeakyBucket(rate, capacity)      — запросы выпускаются равномерно через 1/rate,
+                                       без всплесков; capacity ограничивает очередь
+                                       ожидающих (сверх неё — LimiterFull)
+    SlidingWindowLog(limit, window)  — не больше limit запросов за любые
+                                       window секунд; limit — допустимый всплеск
+
+Один лимитер можно разделить между всеми воркерами:
+    limiter = TokenBucket(rate=10, capacity=20)
+    async with limiter:
+        await client.get(...)
+
+Ожидающие стоят в FIFO-очереди, и на весь лимитер заведён один таймер
+(loop.call_at) — на момент, когда сможет пройти первый в очереди. Поэтому
+тысячи ожидающих не создают тысячи таймеров, а порядок и точность
+не зависят от того, в каком порядке просыпаются корутины.
+"""
+
+import asyncio
+from collections import deque
+
+
+class LimiterFull(Exception):
+    """Очередь ожидающих LeakyBucket заполнена."""
+
+
+class RateLimiter:
+    """
+    Общая часть: FIFO-очередь ожидающих и единственный таймер.
+
+    Подклассы реализуют _delay(n, now) — через сколько секунд можно пропустить
+    n запросов (0 — прямо сейчас) и _consume(n, now) — учесть пропущенные.
+    """
+
+    def __init__(self):
+        self._waiters = deque()  # (future, n)
+        self._timer = None
+
+    def _delay(self, n, now):
+        raise NotImplementedError
+
+    def _consume(self, n, now):
+        raise NotImplementedError
+
+    def _check(self, n):
+        """Проверка до постановки в очередь; подклассы могут отказать исключением."""
+
+    def try_acquire(self, n=1):
+        """Пропустить n запросов без ожидания; False, если лимит исчерпан или есть очередь."""
+        now = asyncio.get_running_loop().time()
+        if self._waiters or self._delay(n, now) > 0:
+            return False
+        self._consume(n, now)
+        return True
+
+    async def acquire(self, n=1):
+        """Дождаться разрешения на n запросов."""
+        if self.try_acquire(n):
+            return
+        self._check(n)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._waiters.append((future, n))
+        if self._timer is None:
+            self._wake()
+        # Отменённый ожидающий просто пропускается в _wake
+        await future
+
+    def _wake(self):
+        """Пропустить всех, кому уже можно, и завести таймер на следующего."""
+        self._timer = None
+        loop = asyncio.get_running_loop()
+        waiters = self._waiters
+        while waiters:
+            future, n = waiters[0]
+            if future.done():
+                waiters.popleft()
+                continue
+            now = loop.time()
+            delay = self._delay(n, now)
+            if delay > 0:
+                self._timer = loop.call_at(now + delay, self._wake)
+                return
+            waiters.popleft()
+            self._consume(n, now)
+            future.set_result(None)
+
+    @property
+    def waiting(self):
+        """Сколько корутин ждут разрешения."""
+        return sum(not future.done() for future, _ in self._waiters)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class TokenBucket(RateLimiter):
+    """rate токенов в секунду, в ведре не больше capacity (по умолчанию rate)."""
+
+    def __init__(self, rate, capacity=None):
+        super().__init__()
+        if rate <= 0:
+            raise ValueError("rate должен быть больше 0")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = None
+
+    def _refill(self, now):
+        if self._updated is not None:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _check(self, n):
+        if n > self.capacity:
+            raise ValueError(f"нельзя получить {n} токенов при capacity={self.capacity}")
+
+    def _delay(self, n, now):
+        self._refill(now)
+        return 0 if self._tokens >= n else (n - self._tokens) / self.rate
+
+    def _consume(self, n, now):
+        self._tokens -= n
+
+
+class LeakyBucket(RateLimiter):
+    """
+    Запросы выпускаются равномерно, не чаще rate в секунду; capacity — размер очереди.
+
+    Таймер event loop срабатывает с опозданием порядка миллисекунды, и при
+    высоком rate это съедало бы заметную часть пропускной способности.
+    tolerance — сколько секунд опоздания можно наверстать подряд идущими
+    запросами; всплеск поэтому не больше tolerance * rate.
+    """
+
+    def __init__(self, rate, capacity=None, tolerance=0.005):
+        super().__init__()
+        if rate <= 0:
+            raise ValueError("rate должен быть больше 0")
+        self.rate = rate
+        self.capacity = capacity
+        self.tolerance = tolerance
+        self._next_free = float('-inf')
+
+    def _check(self, n):
+        if self.capacity is not None and len(self._waiters) >= self.capacity:
+            raise LimiterFull(f"в очереди уже {self.capacity} запросов")
+
+    def _delay(self, n, now):
+        return max(0.0, self._next_free - now)
+
+    def _consume(self, n, now):
+        self._next_free = max(now - self.tolerance, self._next_free) + n / self.rate
+
+
+class SlidingWindowLog(RateLimiter):
+    """Не больше limit запросов за любые window секунд (журнал времён запросов)."""
+
+    def __init__(self, limit, window=1.0):
+        super().__init__()
+        if limit <= 0 or window <= 0:
+            raise ValueError("limit и window должны быть больше 0")
+        self.limit = limit
+        self.window = window
+        self._log = deque()  # (время, n)
+        self._used = 0
+
+    def _expire(self, now):
+        log = self._log
+        while log and log[0][0] <= now - self.window:
+            self._used -= log.popleft()[1]
+
+    def _check(self, n):
+        if n > self.limit:
+            raise ValueError(f"нельзя получить {n} разрешений при limit={self.limit}")
+
+    def _delay(self, n, now):
+        self._expire(now)
+        excess = self._used + n - self.limit
+        if excess <= 0:
+            return 0
+        # Ждём, пока из окна выйдет достаточно старых запросов
+        for stamp, count in self._log:
+            excess -= count
+            if excess <= 0:
+                return stamp + self.window - now
+        return self.window
+
+    def _consume(self, n, now):
+        self._log.append((now, n))
+        self._used += n
+
+
+LIMITERS = {
+    'token_bucket': TokenBucket,
+    'leaky_bucket': LeakyBucket,
+    'sliding_window': SlidingWindowLog,
+}
@@ -0,0 +1,310 @@
+"""
+Локальная замена PokeAPI для бенчмарков и офлайн-экспериментов.
+
+Минимальный HTTP/1.1 сервер на asyncio (keep-alive, только GET) отдаёт
+страницы /api/v2/pokemon?limit=&offset= в формате настоящего API.
+Поведение настраивается через MockConfig:
+    latency        — распределение задержки ответа: 'const:0.05',
+                     'uniform:0.01:0.1', 'exp:0.05' (среднее),
+                     'lognormal:0.05:0.5' (медиана и sigma)
+    error_rate     — доля ответов 500
+    rate_429       — доля ответов 429 с заголовком Retry-After
+    max_concurrency — сколько запросов сервер обрабатывает одновременно;
+                     лишние ждут в очереди, а с reject_over_cap=True
+                     сразу получают 503
+    max_age        — Cache-Control: max-age у ответов 200 (0 — не присылать)
+    gzip           — сжимать тело, если клиент прислал Accept-Encoding: gzip
+                     (как pokeapi.co; httpx просит gzip по умолчанию)
+
+Ответы 200 несут ETag и Last-Modified; запрос с совпадающим If-None-Match
+(или If-Modified-Since) получает 304 без тела.
+
+GET /__stats возвращает счётчики сервера (запросы по статусам, пик одновременных).
+
+Использование:
+    python -m fetcher.mock_server --port 8000 --latency exp:0.02 --rate-429 0.01
+
+    async with MockServer(MockConfig(latency='uniform:0.001:0.005')) as server:
+        async for page in fetch_all(100, url=server.url): ...
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from urllib.parse import parse_qs, urlsplit
+
+
+API_PATH = '/api/v2/pokemon'
+STATS_PATH = '/__stats'
+
+REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 429: 'Too Many Requests',
+           500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+def parse_latency(spec):
+    """Строка 'вид:параметры' -> функция без аргументов, возвращающая задержку в секундах."""
+    kind, *params = spec.split(':')
+    try:
+        params = [float(p) for p in params]
+        if kind == 'const':
+            value, = params
+            return lambda: value
+        if kind == 'uniform':
+            low, high = params
+            return lambda: random.uniform(low, high)
+        if kind == 'exp':
+            mean, = params
+            return lambda: random.expovariate(1 / mean) if mean > 0 else 0.0
+        if kind == 'lognormal':
+            median, sigma = params
+            mu = math.log(median)
+            return lambda: random.lognormvariate(mu, sigma)
+    except ValueError:
+        pass
+    raise ValueError(f"некорректное распределение задержки: {spec!r}")
+
+
+@dataclass
+class MockConfig:
+    count: int = 5_000_000
+    latency: str = 'const:0'
+    error_rate: float = 0.0
+    rate_429: float = 0.0
+    retry_after: float = 1.0
+    max_concurrency: int = 0
+    reject_over_cap: bool = False
+    max_age: int = 0
+    gzip: bool = False
+
+
+@dataclass
+class ServerStats:
+    requests: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    in_flight: int = 0
+    peak_in_flight: int = 0
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'statuses': {str(k): v for k, v in sorted(self.statuses.items())},
+            'in_flight': self.in_flight,
+            'peak_in_flight': self.peak_in_flight,
+        }
+
+
+class MockServer:
+    """Сервер с поведением из MockConfig. url доступен после start()."""
+
+    def __init__(self, config=None):
+        self.config = config or MockConfig()
+        self.stats = ServerStats()
+        self._latency = parse_latency(self.config.latency)
+        cap = self.config.max_concurrency
+        self._gate = asyncio.Semaphore(cap) if cap > 0 else None
+        self._server = None
+        self._connections = set()
+        self.url = None
+        # Данные сервера не меняются, поэтому Last-Modified — время запуска
+        self.last_modified = formatdate(time.time(), usegmt=True)
+
+    async def start(self, host='127.0.0.1', port=0):
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        self.url = f'http://{host}:{port}{API_PATH}'
+        return self.url
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            # Клиенты держат keep-alive соединения — закрываем их сами,
+            # иначе обработчики повиснут до остановки event loop
+            for task in self._connections:
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def page(self, offset, limit):
+        """Тело ответа как у PokeAPI: count, next, previous, results."""
+        count = self.config.count
+        end = min(offset + limit, count)
+        base = self.url.split('?')[0]
+        return {
+            'count': count,
+            'next': f'{base}?offset={end}&limit={limit}' if end < count else None,
+            'previous': f'{base}?offset={max(offset - limit, 0)}&limit={limit}' if offset > 0 else None,
+            'results': [
+                {'name': f'pokemon-{i + 1}', 'url': f'{base}/{i + 1}/'}
+                for i in range(offset, end)
+            ],
+        }
+
+    async def respond(self, target, headers=None):
+        """Путь запроса и заголовки -> (статус, заголовки, тело); тело None — пустое."""
+        headers = headers or {}
+        parts = urlsplit(target)
+        if parts.path == STATS_PATH:
+            return 200, {}, self.stats.as_dict()
+        if parts.path.rstrip('/') != API_PATH:
+            return 404, {}, {'detail': 'Not found.'}
+        query = parse_qs(parts.query)
+        try:
+            limit = int(query.get('limit', ['20'])[0])
+            offset = int(query.get('offset', ['0'])[0])
+        except ValueError:
+            return 400, {}, {'detail': 'limit и offset должны быть целыми'}
+
+        config = self.config
+        gate = self._gate
+        if gate is not None and config.reject_over_cap and gate.locked():
+            return 503, {}, {'detail': 'overloaded'}
+
+        if gate is not None:
+            await gate.acquire()
+        self.stats.in_flight += 1
+        self.stats.peak_in_flight = max(self.stats.peak_in_flight, self.stats.in_flight)
+        try:
+            delay = self._latency()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            roll = random.random()
+            if roll < config.rate_429:
+                return 429, {'Retry-After': f'{config.retry_after:g}'}, {'detail': 'rate limited'}
+            if roll < config.rate_429 + config.error_rate:
+                return 500, {}, {'detail': 'internal error'}
+            offset, limit = max(offset, 0), max(limit, 0)
+            validators = {
+                'ETag': f'"{config.count}-{offset}-{limit}"',
+                'Last-Modified': self.last_modified,
+            }
+            if config.max_age > 0:
+                validators['Cache-Control'] = f'public, max-age={config.max_age}'
+            if (headers.get('if-none-match') == validators['ETag']
+                    or headers.get('if-modified-since') == self.last_modified):
+                return 304, validators, None
+            return 200, validators, self.page(offset, limit)
+        finally:
+            self.stats.in_flight -= 1
+            if gate is not None:
+                gate.release()
+
+    async def _handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                if length:
+                    await reader.readexactly(length)
+
+                if method == 'GET':
+                    status, extra, body = await self.respond(target, headers)
+                else:
+                    status, extra, body = 404, {}, {'detail': 'Not found.'}
+                if target.split('?')[0] != STATS_PATH:
+                    self.stats.requests += 1
+                    self.stats.statuses[status] += 1
+
+                payload = json.dumps(body).encode() if body is not None else b''
+                if payload and self.config.gzip and 'gzip' in headers.get('accept-encoding', ''):
+                    payload = gzip.compress(payload, compresslevel=1)
+                    extra = dict(extra, **{'Content-Encoding': 'gzip'})
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                head = [
+                    f'HTTP/1.1 {status} {REASONS[status]}',
+                    'Content-Type: application/json',
+                    f'Content-Length: {len(payload)}',
+                    f'Connection: {"keep-alive" if keep_alive else "close"}',
+                ]
+                head += [f'{name}: {value}' for name, value in extra.items()]
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # Сервер закрывается: отмена — штатное завершение обработчика
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Локальный mock PokeAPI')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000, help='0 — выбрать свободный порт')
+    parser.add_argument('--count', type=int, default=MockConfig.count, help='Сколько всего покемонов')
+    parser.add_argument('--latency', default=MockConfig.latency, help="Напр. 'exp:0.02', 'uniform:0.01:0.1'")
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Доля ответов 500')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Доля ответов 429')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After для 429, с')
+    parser.add_argument('--max-concurrency', type=int, default=0, help='Лимит одновременных запросов (0 — без лимита)')
+    parser.add_argument('--reject-over-cap', action='store_true', help='Отвечать 503 вместо ожидания при превышении лимита')
+    parser.add_argument('--max-age', type=int, default=0, help='Cache-Control: max-age для ответов 200, с')
+    parser.add_argument('--gzip', action='store_true', help='Сжимать ответы gzip по Accept-Encoding')
+    return parser
+
+
+def config_from_args(args):
+    return MockConfig(
+        count=args.count, latency=args.latency, error_rate=args.error_rate,
+        rate_429=args.rate_429, retry_after=args.retry_after,
+        max_concurrency=args.max_concurrency, reject_over_cap=args.reject_over_cap,
+        max_age=args.max_age, gzip=args.gzip,
+    )
+
+
+async def serve(config, host, port):
+    server = MockServer(config)
+    url = await server.start(host, port)
+    # Первая строка stdout — адрес; по ней бенчмарк находит сервер
+    print(url, flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+def main():
+    args = build_parser().parse_args()
+    try:
+        parse_latency(args.latency)
+    except ValueError as e:
+        print(f"Ошибка: {e}")
+        raise SystemExit(1)
+    try:
+        asyncio.run(serve(config_from_args(args), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Определение числа страниц вместо total_pages = 100 «с запасом».
+
+plan_offsets(first) — по первой странице: шаг берётся из поля next
+(сервер может урезать limit), а все остальные смещения — из count.
+Если count нет, остаётся спекулятивная загрузка окнами:
+
+SpeculativeOffsets — асинхронный итератор смещений для пула воркеров.
+Выдаёт смещения наперёд, но не больше window незавершённых, чтобы
+конвейер оставался полным. Как только приходит страница с пустым results
+(или с next: null), конец известен: новые смещения за ним не выдаются.
+"""
+
+import asyncio
+from urllib.parse import parse_qs, urlsplit
+
+
+def next_offset(data):
+    """Смещение из поля next ответа или None, если в next его нет."""
+    url = data.get('next')
+    if not url:
+        return None
+    values = parse_qs(urlsplit(url).query).get('offset')
+    return int(values[0]) if values else None
+
+
+def is_last(data):
+    """Сервер явно сообщил, что страниц больше нет (next: null)."""
+    return 'next' in data and data['next'] is None
+
+
+def plan_offsets(first, limit):
+    """
+    Смещения оставшихся страниц по первой странице (offset=0).
+
+    Возвращает (step, offsets): offsets — range, если известен count,
+    пустой range, если страница последняя, и None, если число страниц неизвестно.
+    """
+    data = first.data
+    if not first.results or is_last(data):
+        return limit, range(0)
+    step = next_offset(data)
+    if not step or step <= 0:
+        step = limit
+    count = data.get('count')
+    if isinstance(count, int):
+        return step, range(step, count, step)
+    return step, None
+
+
+class SpeculativeOffsets:
+    """Смещения start, start+step, ... с окном не больше window незавершённых."""
+
+    def __init__(self, start, step, window):
+        self.next = start
+        self.step = step
+        self.window = window
+        self.end = None
+        self.in_flight = 0
+        self._changed = asyncio.Condition()
+
+    def _more(self):
+        return self.end is None or self.next < self.end
+
+    async def __aiter__(self):
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: self.in_flight < self.window or not self._more())
+                if not self._more():
+                    return
+                offset = self.next
+                self.next += self.step
+                self.in_flight += 1
+            yield offset
+
+    async def done(self, offset, page):
+        """
+        Учесть загруженную страницу; пустая или последняя страница задаёт конец.
+        page=None — страницу загрузить не удалось, о конце она ничего не говорит.
+        """
+        async with self._changed:
+            self.in_flight -= 1
+            if page is None:
+                end = None
+            elif not page.results:
+                end = offset
+            elif is_last(page.data):
+                end = offset + self.step
+            else:
+                end = None
+            if end is not None and (self.end is None or end < self.end):
+                self.end = end
+            self._changed.notify_all()
@@ -0,0 +1,105 @@
+"""
+Размер пула соединений и время ожидания соединения.
+
+httpx.AsyncClient() по умолчанию держит не больше 100 соединений и только
+20 keep-alive: Semaphore(10) это не ограничивает, а вот 50 воркеров уже
+начнут то ждать свободное соединение, то открывать новое. pool_limits()
+подбирает httpx.Limits под конкурентность стратегии.
+
+PoolTimingTransport меряет через trace-хуки httpcore, сколько запрос ждал
+соединения из пула (до начала подключения или до отправки заголовков по
+уже открытому соединению) и сколько заняло подключение. Если ожидание
+пула сравнимо с задержкой ответа, узкое место — пул, а не сервер.
+
+В ожидание попадает и задержка event loop: отдельного события «соединение
+выдано» httpcore не сообщает. Поэтому сравнивать стоит прогоны с разным
+размером пула (bench_strategies.py --pool-size), а не абсолютные цифры.
+"""
+
+import time
+from collections import deque
+
+import httpx
+
+
+def pool_limits(concurrency=None, keepalive_expiry=30.0):
+    """httpx.Limits под concurrency одновременных запросов (None — умолчания httpx)."""
+    if concurrency is None:
+        return httpx.Limits()
+    return httpx.Limits(
+        max_connections=concurrency,
+        max_keepalive_connections=concurrency,
+        keepalive_expiry=keepalive_expiry,
+    )
+
+
+class PoolStats:
+    """Ожидание соединения из пула и время подключения, по последним history запросам."""
+
+    def __init__(self, history=10000):
+        self.requests = 0
+        self.waited = 0
+        self.new_connections = 0
+        self.wait_total = 0.0
+        self.connect_total = 0.0
+        self._waits = deque(maxlen=history)
+
+    def record_wait(self, wait):
+        self.waited += 1
+        self.wait_total += wait
+        self._waits.append(wait)
+
+    def metrics(self):
+        waits = sorted(self._waits)
+
+        def quantile(q):
+            return waits[min(int(len(waits) * q), len(waits) - 1)] if waits else 0.0
+
+        return {
+            'requests': self.requests,
+            'new_connections': self.new_connections,
+            'wait_avg': self.wait_total / self.waited if self.waited else 0.0,
+            'wait_p50': quantile(0.5),
+            'wait_p99': quantile(0.99),
+            'wait_max': waits[-1] if waits else 0.0,
+            'connect_avg': self.connect_total / self.new_connections if self.new_connections else 0.0,
+        }
+
+
+class PoolTimingTransport(httpx.AsyncBaseTransport):
+    """Обёртка транспорта, заполняющая PoolStats."""
+
+    def __init__(self, transport, stats):
+        self.transport = transport
+        self.stats = stats
+
+    async def handle_async_request(self, request):
+        stats = self.stats
+        stats.requests += 1
+        start = time.perf_counter()
+        waited = False
+        connect_start = None
+        outer_trace = request.extensions.get('trace')
+
+        async def trace(event, info):
+            nonlocal waited, connect_start
+            now = time.perf_counter()
+            if not waited and (event == 'connection.connect_tcp.started'
+                               or event.endswith('send_request_headers.started')):
+                waited = True
+                stats.record_wait(now - start)
+            if event == 'connection.connect_tcp.started':
+                stats.new_connections += 1
+                connect_start = now
+            if event.endswith('send_request_headers.started') and connect_start is not None:
+                # Подключение (TCP + TLS) закончилось к отправке заголовков
+                stats.connect_total += now - connect_start
+                connect_start = None
+            if outer_trace is not None:
+                await outer_trace(event, info)
+
+        request.extensions = {**request.extensions, 'trace': trace}
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self):
+        await self.transport.aclose()
@@ -0,0 +1,98 @@
+"""
+Ограниченная очередь с верхней и нижней отметкой (backpressure).
+
+В worker_pool_approach producer кладёт все смещения в asyncio.Queue() без
+ограничения, а results тоже не ограничена — медленный потребитель
+позволяет памяти расти бесконечно. WatermarkQueue останавливает put(),
+когда в очереди high элементов, и возобновляет, только когда очередь
+опустеет до low. Гистерезис нужен, чтобы producer не просыпался на
+каждый освободившийся элемент.
+
+metrics() — глубина очереди (текущая и максимальная) и сколько времени
+producer'ы простояли на полной очереди, а consumer'ы — на пустой
+(суммарно по всем корутинам).
+"""
+
+import asyncio
+import time
+
+
+class WatermarkQueue:
+    """
+    asyncio.Queue с backpressure: put() ждёт, пока очередь не опустеет до low.
+    high=0 — без ограничения (как asyncio.Queue()).
+    """
+
+    def __init__(self, high=100, low=None):
+        if high < 0:
+            raise ValueError("high должен быть >= 0")
+        low = high // 2 if low is None else low
+        if high and not 0 <= low < high:
+            raise ValueError("нужно 0 <= low < high")
+        self.high = high
+        self.low = low
+        self._queue = asyncio.Queue()
+        self._accepting = asyncio.Event()
+        self._accepting.set()
+
+        self.max_depth = 0
+        self.puts = 0
+        self.gets = 0
+        self.put_blocked = 0.0
+        self.get_blocked = 0.0
+        self.pauses = 0
+
+    def qsize(self):
+        return self._queue.qsize()
+
+    def empty(self):
+        return self._queue.empty()
+
+    async def put(self, item):
+        """Положить элемент; на полной очереди ждать нижней отметки."""
+        if not self._accepting.is_set():
+            start = time.perf_counter()
+            # Проснувшиеся producer'ы перепроверяют: очередь могли снова заполнить
+            while not self._accepting.is_set():
+                await self._accepting.wait()
+            self.put_blocked += time.perf_counter() - start
+        self._queue.put_nowait(item)
+        self.puts += 1
+        depth = self._queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if self.high and depth >= self.high:
+            self._accepting.clear()
+            self.pauses += 1
+
+    async def get(self):
+        """Взять элемент; на пустой очереди ждать."""
+        if self._queue.empty():
+            start = time.perf_counter()
+            item = await self._queue.get()
+            self.get_blocked += time.perf_counter() - start
+        else:
+            item = self._queue.get_nowait()
+        self.gets += 1
+        if not self._accepting.is_set() and self._queue.qsize() <= self.low:
+            self._accepting.set()
+        return item
+
+    def task_done(self):
+        self._queue.task_done()
+
+    async def join(self):
+        await self._queue.join()
+
+    def metrics(self):
+        return {
+            'depth': self._queue.qsize(),
+            'max_depth': self.max_depth,
+            'high': self.high,
+            'low': self.low,
+            'puts': self.puts,
+            'gets': self.gets,
+            'pauses': self.pauses,
+            'put_blocked': self.put_blocked,
+            'get_blocked': self.get_blocked,
+        }
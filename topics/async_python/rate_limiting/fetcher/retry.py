@@ -0,0 +1,166 @@
+"""
+Повторы запросов: экспоненциальная задержка с full jitter, Retry-After,
+бюджет повторов и dead-letter очередь.
+
+В 4. worker pool.py страница с ошибкой просто печатается и теряется.
+RetryPolicy повторяет временные ошибки (сеть, таймауты, 429, 5xx):
+    задержка = random(0, min(cap, base * 2^попытка))   — full jitter
+    на 429/503 с Retry-After ждём столько, сколько просит сервер
+
+RetryBudget не даёт повторам умножить нагрузку во время сбоя: за окно
+window секунд повторов может быть не больше ratio от числа запросов
+(плюс min_per_sec * window, чтобы редкие запросы тоже могли повторяться).
+
+То, что не удалось загрузить, попадает в DeadLetterQueue, а не теряется:
+    dead = DeadLetterQueue('failed.jsonl')
+    async for page in fetch_all(retry=RetryPolicy(), dead_letters=dead): ...
+    for item in dead: print(item.offset, item.error)
+"""
+
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def retry_after(error):
+    """Задержка из заголовка Retry-After (секунды или HTTP-дата) или None."""
+    if not isinstance(error, httpx.HTTPStatusError):
+        return None
+    value = error.response.headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryBudget:
+    """Повторов за окно — не больше ratio * запросов + min_per_sec * window."""
+
+    def __init__(self, ratio=0.2, min_per_sec=10, window=10.0):
+        self.ratio = ratio
+        self.min_per_sec = min_per_sec
+        self.window = window
+        self._requests = deque()
+        self._retries = deque()
+
+    def _expire(self, now):
+        edge = now - self.window
+        for log in (self._requests, self._retries):
+            while log and log[0] < edge:
+                log.popleft()
+
+    def record_request(self):
+        self._requests.append(time.monotonic())
+
+    def try_spend(self):
+        """Разрешить один повтор, если бюджет не исчерпан."""
+        now = time.monotonic()
+        self._expire(now)
+        allowed = self.ratio * len(self._requests) + self.min_per_sec * self.window
+        if len(self._retries) >= allowed:
+            return False
+        self._retries.append(now)
+        return True
+
+
+class RetryPolicy:
+    """Сколько раз и с какой задержкой повторять временные ошибки."""
+
+    def __init__(self, attempts=5, base=0.1, cap=10.0, max_retry_after=60.0,
+                 statuses=RETRY_STATUSES, budget=None):
+        if attempts < 1:
+            raise ValueError("attempts должен быть >= 1")
+        self.attempts = attempts
+        self.base = base
+        self.cap = cap
+        self.max_retry_after = max_retry_after
+        self.statuses = statuses
+        self.budget = budget if budget is not None else RetryBudget()
+
+        self.retries = 0
+        self.budget_denied = 0
+        self.gave_up = 0
+
+    def is_retryable(self, error):
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in self.statuses
+        # Сеть, таймауты, разорванные соединения
+        return isinstance(error, httpx.TransportError)
+
+    def delay(self, attempt, error=None):
+        """Задержка перед повтором номер attempt (с 0)."""
+        server_delay = retry_after(error)
+        if server_delay is not None:
+            return min(server_delay, self.max_retry_after)
+        return random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+
+    async def call(self, fn, *args):
+        """Вызвать корутину fn(*args), повторяя временные ошибки."""
+        self.budget.record_request()
+        for attempt in range(self.attempts):
+            try:
+                return await fn(*args)
+            except httpx.HTTPError as e:
+                last_attempt = attempt == self.attempts - 1
+                if last_attempt or not self.is_retryable(e):
+                    self.gave_up += 1
+                    raise
+                if not self.budget.try_spend():
+                    self.budget_denied += 1
+                    self.gave_up += 1
+                    raise
+                self.retries += 1
+                await asyncio.sleep(self.delay(attempt, e))
+
+    def metrics(self):
+        return {'retries': self.retries, 'budget_denied': self.budget_denied, 'gave_up': self.gave_up}
+
+
+@dataclass
+class DeadLetter:
+    offset: int
+    error: str
+    status: int | None
+    failed_at: float
+
+
+class DeadLetterQueue:
+    """Страницы, которые не удалось загрузить. С path — ещё и дописываются в JSONL."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.items = []
+
+    def put(self, offset, error):
+        status = error.response.status_code if isinstance(error, httpx.HTTPStatusError) else None
+        message = str(error).splitlines()[0] if str(error) else ''
+        item = DeadLetter(offset, f'{type(error).__name__}: {message}', status, time.time())
+        self.items.append(item)
+        if self.path is not None:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(asdict(item), ensure_ascii=False) + '\n')
+
+    def offsets(self):
+        """Смещения для повторной загрузки: fetch_all(dead.offsets())."""
+        return [item.offset for item in self.items]
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
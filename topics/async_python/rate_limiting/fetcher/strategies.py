@@ -0,0 +1,140 @@
+"""
+Стратегии конкурентной загрузки страниц — те же, что разобраны в article/.
+
+Каждая стратегия — асинхронный генератор strategy(fetch, offsets, concurrency),
+где fetch(offset) — корутина, возвращающая Page. Страницы отдаются по мере
+готовности. Если потребитель выходит из цикла раньше, незавершённые задачи
+отменяются. Ошибка загрузки любой страницы пробрасывается потребителю.
+"""
+
+import asyncio
+from contextlib import aclosing
+
+from .queues import WatermarkQueue
+
+
+_DONE = object()
+
+
+async def sequential(fetch, offsets, concurrency=1):
+    """Один запрос за раз (1. while+await.py). concurrency игнорируется."""
+    for offset in offsets:
+        yield await fetch(offset)
+
+
+async def _as_completed(tasks):
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def gather(fetch, offsets, concurrency=None):
+    """Все запросы сразу, без ограничений (2. gather.py). concurrency игнорируется."""
+    tasks = [asyncio.create_task(fetch(offset)) for offset in offsets]
+    async with aclosing(_as_completed(tasks)) as stream:
+        async for page in stream:
+            yield page
+
+
+async def semaphore(fetch, offsets, concurrency=10):
+    """Все задачи создаются сразу, одновременно выполняется не больше concurrency (3. semaphore + gather.py)."""
+    gate = asyncio.Semaphore(concurrency)
+
+    async def gated(offset):
+        async with gate:
+            return await fetch(offset)
+
+    tasks = [asyncio.create_task(gated(offset)) for offset in offsets]
+    async with aclosing(_as_completed(tasks)) as stream:
+        async for page in stream:
+            yield page
+
+
+async def worker_pool(fetch, offsets, concurrency=5, *, high_watermark=None, low_watermark=None,
+                      queues=None):
+    """
+    concurrency воркеров разбирают очередь смещений (4. worker pool.py).
+    offsets может быть и асинхронным итератором — тогда producer получает
+    смещения по мере появления (динамический producer). Если итератор
+    смещений падает, уже выданные смещения догружаются, а его исключение
+    поднимается у потребителя.
+
+    Обе очереди (смещений и результатов) ограничены WatermarkQueue:
+    high_watermark по умолчанию 2 * concurrency, 0 — без ограничения.
+    Медленный потребитель останавливает воркеров, а те — producer'а.
+    В словарь queues, если он передан, кладутся сами очереди
+    ('offsets', 'results') — для метрик во время работы.
+    """
+    if high_watermark is None:
+        high_watermark = concurrency * 2
+    queue = WatermarkQueue(high_watermark, low_watermark)
+    results = WatermarkQueue(high_watermark, low_watermark)
+    if queues is not None:
+        queues.update(offsets=queue, results=results)
+
+    producer_error = None
+
+    async def producer():
+        nonlocal producer_error
+        try:
+            if hasattr(offsets, '__aiter__'):
+                async for offset in offsets:
+                    await queue.put(offset)
+            else:
+                for offset in offsets:
+                    await queue.put(offset)
+        except Exception as e:
+            # Иначе ошибка осталась бы в задаче producer'а, а воркеры и
+            # потребитель ждали бы маркеров конца вечно. Уже выданные
+            # смещения догружаются, потом ошибку поднимает потребитель
+            producer_error = e
+        # Маркер конца для каждого воркера
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def worker():
+        while True:
+            offset = await queue.get()
+            try:
+                if offset is None:
+                    await results.put(_DONE)
+                    return
+                try:
+                    page = await fetch(offset)
+                except Exception as e:
+                    # Ошибку отдаём потребителю, он решает, что с ней делать
+                    page = e
+                await results.put(page)
+            finally:
+                queue.task_done()
+
+    tasks = [asyncio.create_task(producer())]
+    tasks += [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        finished_workers = 0
+        while finished_workers < concurrency:
+            item = await results.get()
+            if item is _DONE:
+                finished_workers += 1
+                continue
+            if isinstance(item, Exception):
+                raise item
+            yield item
+        if producer_error is not None:
+            raise producer_error
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+STRATEGIES = {
+    'sequential': sequential,
+    'gather': gather,
+    'semaphore': semaphore,
+    'worker_pool': worker_pool,
+}
@@ -0,0 +1,72 @@
+"""
+Потоковая обработка: страницы отдаются по мере готовности, а не после gather.
+
+В 2. gather.py и 3. semaphore + gather.py данные обрабатываются только
+после asyncio.gather(*tasks): обработка не пересекается с сетью, а в памяти
+лежат все ответы сразу. stream_pages() отдаёт results каждой страницы, как
+только она загружена; в памяти — только окно запросов пула воркеров.
+
+Порядок по смещениям (ordered=True) держит ReorderBuffer. Буфер ограничен
+не отбрасыванием, а окном: смещение отправляется в работу, только если оно
+не дальше window от самой старой ещё не отданной страницы. Поэтому в полёте
+и в буфере вместе не больше window страниц, а самая старая страница всегда
+уже запрошена — ожидание не может зациклиться.
+
+Использование:
+    async for results in stream_pages(100, concurrency=10, ordered=True):
+        process(results)
+"""
+
+import asyncio
+from collections import deque
+
+
+async def _aiter(offsets):
+    for offset in offsets:
+        yield offset
+
+
+class ReorderBuffer:
+    """Отдаёт страницы в порядке отправки смещений; вперёд уходит не больше window смещений."""
+
+    def __init__(self, window):
+        if window < 1:
+            raise ValueError("window должен быть не меньше 1")
+        self.window = window
+        self._pending = deque()  # отправленные, но ещё не отданные смещения — по порядку
+        self._arrived = {}
+        self._room = asyncio.Event()
+        self.max_buffered = 0
+
+    async def gate(self, offsets):
+        """Смещения из offsets (обычный или асинхронный итератор) с ожиданием места в окне."""
+        iterator = aiter(offsets) if hasattr(offsets, '__aiter__') else _aiter(offsets)
+        while True:
+            while len(self._pending) >= self.window:
+                self._room.clear()
+                await self._room.wait()
+            try:
+                offset = await anext(iterator)
+            except StopAsyncIteration:
+                return
+            self._pending.append(offset)
+            yield offset
+
+    def push(self, offset, page):
+        """Принять страницу; вернуть список страниц, которые теперь можно отдать по порядку."""
+        self._arrived[offset] = page
+        self.max_buffered = max(self.max_buffered, len(self._arrived))
+        ready = []
+        while self._pending and self._pending[0] in self._arrived:
+            ready.append(self._arrived.pop(self._pending.popleft()))
+        if ready:
+            self._room.set()
+        return ready
+
+    def metrics(self):
+        return {
+            'window': self.window,
+            'pending': len(self._pending),
+            'buffered': len(self._arrived),
+            'max_buffered': self.max_buffered,
+        }
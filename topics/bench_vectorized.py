@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк: исходные решения на list против NumPy-версий из vectorized.py.
+
+Использование:
+    python topics/bench_vectorized.py                      # n = 1 000 000
+    python topics/bench_vectorized.py --size 10000000
+    python topics/bench_vectorized.py zeros_switch remove_dubs
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import sys
+import time
+from array import array
+
+import vectorized
+from solutions import get
+
+
+def make_inputs(n):
+    """Входы для каждой функции: (args для list-версии)."""
+    values = [random.randint(-n, n) for _ in range(n)]
+    sorted_values = sorted(values)
+    half = n // 2
+    return {
+        'check_dubs': (random.sample(range(n * 2), n),),
+        'find_ixs': ([random.randint(0, 10) for _ in range(n)], 5),
+        'sort_squares': (sorted_values,),
+        'zeros_switch': ([random.choice((0, v)) for v in values],),
+        'remove_dubs': (sorted(random.randint(0, n // 4) for _ in range(n)),),
+        'merge_arrays': (sorted(values[:half]), sorted(values[half:])),
+    }
+
+
+def to_numpy(args):
+    return tuple(vectorized.np.array(a, dtype=vectorized.np.int64) if isinstance(a, list) else a
+                 for a in args)
+
+
+def to_array(args):
+    return tuple(array('q', a) if isinstance(a, list) else a for a in args)
+
+
+def best_time(func, make_args, repeats):
+    """Лучшее время из repeats вызовов; вход создаётся заново вне замера."""
+    best = float('inf')
+    with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+        for _ in range(repeats):
+            args = make_args()
+            start = time.perf_counter()
+            func(*args)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='list vs NumPy')
+    parser.add_argument('names', nargs='*', help='Функции (по умолчанию все)')
+    parser.add_argument('--size', type=int, default=1_000_000, help='Размер входа')
+    parser.add_argument('--repeats', type=int, default=3, help='Повторов на вариант')
+    args = parser.parse_args()
+
+    if vectorized.np is None:
+        print("Ошибка: для бенчмарка нужен NumPy (pip install numpy)")
+        sys.exit(1)
+
+    random.seed(0)
+    inputs = make_inputs(args.size)
+    names = args.names or list(inputs)
+
+    print("=" * 80)
+    print(f"LIST vs NUMPY, n = {args.size:,}")
+    print("=" * 80)
+    print(f"{'функция':<16} {'list':>12} {'ndarray':>12} {'array.array':>12} {'ускорение':>10}")
+    for name in names:
+        base = inputs[name]
+        fast = getattr(vectorized, name)
+        t_list = best_time(get(name), lambda: tuple(list(a) if isinstance(a, list) else a for a in base),
+                           args.repeats)
+        t_numpy = best_time(fast, lambda: to_numpy(base), args.repeats)
+        t_array = best_time(fast, lambda: to_array(base), args.repeats)
+        print(f"{name:<16} {t_list * 1000:10.1f}ms {t_numpy * 1000:10.1f}ms "
+              f"{t_array * 1000:10.1f}ms {t_list / t_numpy:9.1f}x")
+    print("=" * 80)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Эмпирическая проверка асимптотики решений из topics/arrays и topics/two_pointers.
+
+Для каждой зарегистрированной функции генерируются входы растущего размера,
+время замеряется с прогревом и повторами (берётся минимум — он меньше всего
+зашумлён), затем подбирается модель роста: 1, log n, n, n log n, n², n³.
+Если модель не совпадает с заявленной сложностью, функция помечается.
+
+Заявленная сложность берётся из докстринга функции («Время: O(n²)»),
+а если там её нет — из комментария «# Сложность: O(n) по времени» к решению
+задачи с тем же ID в tasks.json.
+
+Использование:
+    python topics/complexity_profiler.py                         # Все функции
+    python topics/complexity_profiler.py three_sum sort_squares  # Только эти
+    python topics/complexity_profiler.py --output report.json
+    python topics/complexity_profiler.py --baseline report.json  # Сравнить с прошлым отчётом
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import random
+import re
+import sys
+import timeit
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from solutions import load_module
+
+
+TOPICS_DIR = Path(__file__).resolve().parent
+TASKS_FILE = TOPICS_DIR.parent / 'tasks.json'
+
+# Модели роста: имя -> f(n)
+MODELS = {
+    'O(1)': lambda n: 1.0,
+    'O(log n)': lambda n: math.log2(n),
+    'O(n)': lambda n: float(n),
+    'O(n log n)': lambda n: n * math.log2(n),
+    'O(n²)': lambda n: float(n) ** 2,
+    'O(n³)': lambda n: float(n) ** 3,
+}
+
+# Как по-разному записывают одну и ту же сложность
+NOTATION_ALIASES = {
+    'o(1)': 'O(1)',
+    'o(logn)': 'O(log n)',
+    'o(n)': 'O(n)',
+    'o(n+m)': 'O(n)',
+    'o(nlogn)': 'O(n log n)',
+    'o(n²)': 'O(n²)',
+    'o(n^2)': 'O(n²)',
+    'o(n*n)': 'O(n²)',
+    'o(n³)': 'O(n³)',
+    'o(n^3)': 'O(n³)',
+}
+
+DOCSTRING_RE = re.compile(r'Время:\s*(O\([^)]*\))')
+TASK_SOLUTION_RE = re.compile(r'Сложность:\s*(O\([^)]*\))\s*по времени')
+TASK_ID_RE = re.compile(r'^ID:\s*(\d+)', re.M)
+
+# Заявленная модель считается подтверждённой, если её ошибка не больше
+# ошибки лучшей модели + допуск: n и n log n на практике трудно различить
+MATCH_TOLERANCE = 0.15
+
+# Во сколько раз время на наибольшем размере может вырасти относительно
+# baseline, прежде чем это считается регрессией
+REGRESSION_RATIO = 1.5
+
+
+def normalize(notation):
+    """'O(n^2)' -> 'O(n²)', 'O(n + m)' -> 'O(n)'. None, если запись неизвестна."""
+    if notation is None:
+        return None
+    key = notation.lower().replace(' ', '').replace('·', '*')
+    return NOTATION_ALIASES.get(key)
+
+
+# ---------- Генераторы входов ----------
+
+def random_ints(n):
+    return ([random.randint(-n, n) for _ in range(n)],)
+
+
+def sorted_ints(n):
+    return (sorted(random.randint(-n, n) for _ in range(n)),)
+
+
+def sorted_with_dups(n):
+    return (sorted(random.randint(0, n // 4 + 1) for _ in range(n)),)
+
+
+def ints_with_zeros(n):
+    return ([random.choice((0, random.randint(1, n))) for _ in range(n)],)
+
+
+def unique_ints(n):
+    # Без дубликатов check_dubs проходит массив целиком — худший случай
+    return (random.sample(range(n * 2), n),)
+
+
+def ints_and_target(n):
+    arr = [random.randint(0, 10) for _ in range(n)]
+    return arr, 5
+
+
+def two_sorted(n):
+    return sorted_ints(n // 2)[0], sorted_ints(n - n // 2)[0]
+
+
+def palindrome_string(n):
+    half = ''.join(random.choice('abc ') for _ in range(n // 2))
+    return (half + half[::-1],)
+
+
+def subsequence_strings(n):
+    t = ''.join(random.choice('abcdef') for _ in range(n))
+    return t[::2], t
+
+
+@dataclass
+class Entry:
+    """Зарегистрированная функция: где лежит, как генерировать вход, какие размеры."""
+    name: str
+    path: str
+    make_input: object
+    sizes: list = field(default_factory=lambda: [1000, 2000, 4000, 8000, 16000, 32000])
+    declared: str = None
+
+
+REGISTRY = {}
+
+
+def register(name, path, make_input, sizes=None, declared=None):
+    """Зарегистрировать функцию name из файла path (относительно topics/)."""
+    entry = Entry(name, path, make_input, declared=declared)
+    if sizes is not None:
+        entry.sizes = sizes
+    REGISTRY[name] = entry
+    return entry
+
+
+register('check_dubs', 'arrays/check_dubs.py', unique_ints)
+register('find_ixs', 'arrays/find_ixs.py', ints_and_target)
+register('palindrome_check', 'arrays/palindrome.py', palindrome_string)
+register('merge_arrays', 'two_pointers/+merge_sorted.py', two_sorted)
+register('zeros_switch', 'two_pointers/+move_zeros.py', ints_with_zeros)
+register('remove_dubs', 'two_pointers/+remove_dubs.py', sorted_with_dups)
+register('sub_string_check', 'two_pointers/+sub_array.py', subsequence_strings)
+register('three_sum', 'two_pointers/+three_sum.py', random_ints, sizes=[100, 200, 400, 800, 1600])
+register('sort_squares', 'two_pointers/squares.py', sorted_ints)
+
+
+# ---------- Загрузка и заявленная сложность ----------
+
+def load_function(entry):
+    """Модуль и функция для записи реестра."""
+    module = load_module(entry.path)
+    return module, getattr(module, entry.name)
+
+
+def declared_complexity(entry, module, func, task_solutions):
+    """Заявленная сложность и её источник."""
+    if entry.declared:
+        return entry.declared, 'registry'
+    match = DOCSTRING_RE.search(func.__doc__ or '')
+    if match:
+        return match.group(1), 'docstring'
+    match = TASK_ID_RE.search(module.__doc__ or '')
+    if match:
+        solution = task_solutions.get(int(match.group(1)), '')
+        match = TASK_SOLUTION_RE.search(solution)
+        if match:
+            return match.group(1), 'tasks.json'
+    return None, None
+
+
+def load_task_solutions():
+    try:
+        with open(TASKS_FILE, 'r', encoding='utf-8') as f:
+            return {task['id']: task['solution'] for task in json.load(f)['tasks']}
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+# ---------- Замеры и подбор модели ----------
+
+def measure(func, make_input, n, repeats, min_time=0.05):
+    """
+    Минимальное время одного вызова на входе размера n, в секундах.
+    Вход копируется перед каждым вызовом (функции меняют его на месте),
+    время копирования вычитается.
+    """
+    args = make_input(n)
+
+    def fresh_args():
+        return [list(a) if isinstance(a, list) else a for a in args]
+
+    def call():
+        func(*fresh_args())
+
+    with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+        # Прогрев и подбор числа вызовов на замер
+        call()
+        timer = timeit.Timer(call)
+        number, _ = timer.autorange()
+        number = max(1, int(number * min_time / 0.2))
+        best = min(timer.repeat(repeat=repeats, number=number)) / number
+
+    copy_timer = timeit.Timer(fresh_args)
+    copy_cost = min(copy_timer.repeat(repeat=repeats, number=number)) / number
+    return max(best - copy_cost, 1e-9)
+
+
+def fit(sizes, times):
+    """
+    Подобрать модель роста: t ≈ c * f(n) методом наименьших квадратов
+    в относительных ошибках. Возвращает (лучшая модель, ошибки всех моделей).
+    """
+    errors = {}
+    for name, model in MODELS.items():
+        f = [model(n) for n in sizes]
+        # Взвешиваем на 1/t, чтобы малые размеры не терялись на фоне больших
+        c = sum(fi / ti for fi, ti in zip(f, times)) / sum((fi / ti) ** 2 for fi, ti in zip(f, times))
+        errors[name] = math.sqrt(sum((c * fi / ti - 1) ** 2 for fi, ti in zip(f, times)) / len(times))
+    best = min(errors, key=errors.get)
+    return best, errors
+
+
+def loglog_slope(sizes, times):
+    """Наклон прямой в координатах log n / log t — грубая оценка степени."""
+    xs = [math.log(n) for n in sizes]
+    ys = [math.log(t) for t in times]
+    mx = sum(xs) / len(xs)
+    my = sum(ys) / len(ys)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sum((x - mx) ** 2 for x in xs)
+
+
+def profile(entry, task_solutions, repeats=5):
+    module, func = load_function(entry)
+    declared, source = declared_complexity(entry, module, func, task_solutions)
+    result = {
+        'name': entry.name,
+        'path': entry.path,
+        'declared': declared,
+        'declared_source': source,
+        'sizes': entry.sizes,
+        'error': None,
+    }
+
+    try:
+        times = [measure(func, entry.make_input, n, repeats) for n in entry.sizes]
+    except Exception as e:
+        # Функция упала на сгенерированном входе — это тоже результат
+        result.update(fitted=None, match=False, error=f"{type(e).__name__}: {e}")
+        return result
+
+    best, errors = fit(entry.sizes, times)
+    expected = normalize(declared)
+    if expected is None:
+        match = None
+    else:
+        match = errors[expected] <= errors[best] + MATCH_TOLERANCE
+
+    result.update(
+        fitted=best,
+        slope=round(loglog_slope(entry.sizes, times), 3),
+        fit_errors={name: round(err, 4) for name, err in errors.items()},
+        times=times,
+        match=match,
+    )
+    return result
+
+
+def compare_with_baseline(results, baseline):
+    """Регрессии: модель роста сменилась или время на максимальном размере выросло."""
+    previous = {item['name']: item for item in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        old = previous.get(result['name'])
+        if old is None or result['error']:
+            continue
+        if old.get('error'):
+            continue
+        if old['fitted'] != result['fitted']:
+            regressions.append(f"{result['name']}: {old['fitted']} -> {result['fitted']}")
+        elif old['sizes'] == result['sizes']:
+            ratio = result['times'][-1] / old['times'][-1]
+            if ratio > REGRESSION_RATIO:
+                regressions.append(f"{result['name']}: в {ratio:.1f} раза медленнее на n={result['sizes'][-1]}")
+    return regressions
+
+
+def print_result(result):
+    if result['error']:
+        print(f"💥 {result['name']:<18} ошибка: {result['error']}")
+        return
+    if result['match'] is None:
+        icon, verdict = '❓', 'сложность не заявлена'
+    elif result['match']:
+        icon, verdict = '✅', 'совпадает' if result['fitted'] == normalize(result['declared']) \
+            else f"в пределах допуска от {result['declared']}"
+    else:
+        icon, verdict = '⚠️', f"заявлено {result['declared']}"
+    print(f"{icon} {result['name']:<18} {result['fitted']:<11} "
+          f"(наклон {result['slope']:.2f}) — {verdict}")
+    for n, t in zip(result['sizes'], result['times']):
+        print(f"      n={n:<7} {t * 1e6:12.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Проверка асимптотики решений')
+    parser.add_argument('names', nargs='*', help='Имена функций (по умолчанию все)')
+    parser.add_argument('--repeats', type=int, default=5, help='Повторов на каждый размер')
+    parser.add_argument('--output', metavar='PATH', help='Сохранить отчёт в JSON')
+    parser.add_argument('--baseline', metavar='PATH', help='Сравнить с предыдущим отчётом')
+    parser.add_argument('--seed', type=int, default=0, help='Seed генератора входов')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    unknown = [name for name in args.names if name not in REGISTRY]
+    if unknown:
+        print(f"Ошибка: неизвестные функции: {', '.join(unknown)}")
+        print(f"Доступные: {', '.join(sorted(REGISTRY))}")
+        sys.exit(1)
+
+    task_solutions = load_task_solutions()
+    results = []
+    print("=" * 80)
+    print("ПРОФИЛИРОВАНИЕ АСИМПТОТИКИ")
+    print("=" * 80)
+    for name in args.names or REGISTRY:
+        result = profile(REGISTRY[name], task_solutions, args.repeats)
+        print_result(result)
+        results.append(result)
+
+    report = {'results': results}
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_with_baseline(results, json.load(f))
+        report['regressions'] = regressions
+
+    mismatches = [r['name'] for r in results if r['match'] is False]
+    print("=" * 80)
+    print(f"Несовпадений со заявленной сложностью (включая ошибки): {len(mismatches)}")
+    for line in regressions:
+        print(f"  📉 {line}")
+    print("=" * 80)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if mismatches or regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
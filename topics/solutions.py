@@ -0,0 +1,47 @@
+"""
+Доступ к решениям из topics/ как к обычным функциям.
+
+Файлы вида '+merge_sorted.py' нельзя импортировать через import,
+поэтому модули загружаются по пути и кэшируются.
+
+Использование:
+    from solutions import get
+    merge_arrays = get('merge_arrays')
+"""
+
+import importlib.util
+from pathlib import Path
+
+
+TOPICS_DIR = Path(__file__).resolve().parent
+
+# Имя функции -> файл относительно topics/
+SOLUTIONS = {
+    'check_dubs': 'arrays/check_dubs.py',
+    'find_ixs': 'arrays/find_ixs.py',
+    'palindrome_check': 'arrays/palindrome.py',
+    'merge_arrays': 'two_pointers/+merge_sorted.py',
+    'zeros_switch': 'two_pointers/+move_zeros.py',
+    'remove_dubs': 'two_pointers/+remove_dubs.py',
+    'sub_string_check': 'two_pointers/+sub_array.py',
+    'three_sum': 'two_pointers/+three_sum.py',
+    'sort_squares': 'two_pointers/squares.py',
+}
+
+_modules = {}
+
+
+def load_module(path):
+    """Загрузить модуль из файла относительно topics/ (один раз)."""
+    path = TOPICS_DIR / path
+    if path not in _modules:
+        spec = importlib.util.spec_from_file_location(f'topics_{path.stem.lstrip("+")}', path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _modules[path] = module
+    return _modules[path]
+
+
+def get(name):
+    """Функция-решение по имени."""
+    return getattr(load_module(SOLUTIONS[name]), name)
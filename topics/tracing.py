@@ -0,0 +1,171 @@
+"""
+Трассировка решений из topics/: сколько шагов, сравнений и выделений памяти
+сделала функция.
+
+Модули-решения о трассировке ничего не знают: пока trace() не активен,
+вызывается исходная функция без единой лишней проверки. trace() берёт
+исходник функции, вставляет в синтаксическое дерево вызовы пробы
+и на время блока with подменяет функцию в её модуле этим вариантом:
+    step     — каждая итерация for / while;
+    compare  — каждое вычисленное сравнение (==, <, in, ...);
+    allocate — append / add / insert, новая строка из replace / lower / ...
+               и n элементов у [x] * n.
+
+Подменяется атрибут модуля, поэтому функцию нужно брать через
+solutions.get() внутри блока with: ссылка, взятая раньше, останется
+исходной функцией.
+
+Использование:
+    from solutions import get
+    from tracing import trace
+
+    with trace('merge_arrays') as tracer:
+        get('merge_arrays')([1, 3, 5], [2, 4, 6])
+    print(tracer.counters['merge_arrays'])
+    # {'step': 6, 'compare': 19, 'allocate': 6}
+
+    # Или с колбэком на каждое событие:
+    with trace('three_sum', callback=lambda name, event, n: ...):
+        ...
+"""
+
+import ast
+import inspect
+import textwrap
+from contextlib import contextmanager
+
+from solutions import SOLUTIONS, load_module
+
+
+EVENTS = ('step', 'compare', 'allocate')
+
+# Имя, под которым проба видна инструментированной функции
+PROBE_NAME = '_trace_probe'
+# Методы, которые кладут в контейнер один элемент
+ADD_METHODS = {'append', 'appendleft', 'add', 'insert'}
+# Методы строк, которые возвращают новую строку
+STR_METHODS = {'replace', 'lower', 'upper', 'strip', 'lstrip', 'rstrip', 'join'}
+
+
+class Probe:
+    """Проба одной функции: счётчики событий и необязательный колбэк."""
+
+    __slots__ = ('name', 'counts', 'callback')
+
+    def __init__(self, name, callback=None):
+        self.name = name
+        self.counts = dict.fromkeys(EVENTS, 0)
+        self.callback = callback
+
+    def _event(self, event, n):
+        self.counts[event] += n
+        if self.callback is not None:
+            self.callback(self.name, event, n)
+
+    def step(self, n=1):
+        """Итерация основного цикла."""
+        self._event('step', n)
+
+    def compare(self, n=1):
+        """Сравнение элементов (или проверка членства)."""
+        self._event('compare', n)
+
+    def allocate(self, n=1):
+        """Выделение памяти: новый объект или n элементов в контейнере."""
+        self._event('allocate', n)
+
+    def allocated(self, container):
+        """Учесть len(container) выделенных элементов и вернуть container."""
+        self._event('allocate', len(container))
+        return container
+
+
+class Tracer:
+    """Набор проб на время трассировки; counters — счётчики по именам функций."""
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.probes = {}
+
+    def probe(self, name):
+        if name not in self.probes:
+            self.probes[name] = Probe(name, self.callback)
+        return self.probes[name]
+
+    @property
+    def counters(self):
+        return {name: dict(probe.counts) for name, probe in self.probes.items()}
+
+
+class _Instrument(ast.NodeTransformer):
+    """Вставляет вызовы пробы в дерево функции."""
+
+    def _probe(self, event, node=None):
+        call = ast.Call(
+            func=ast.Attribute(ast.Name(PROBE_NAME, ast.Load()), event, ast.Load()),
+            args=[node] if node is not None else [],
+            keywords=[],
+        )
+        if node is None:
+            return call
+        return ast.copy_location(call, node)
+
+    def _counted(self, event, node):
+        # probe.event() возвращает None, так что «None or выражение» — само выражение
+        return ast.copy_location(ast.BoolOp(ast.Or(), [self._probe(event), node]), node)
+
+    def _loop(self, node):
+        self.generic_visit(node)
+        node.body.insert(0, ast.copy_location(ast.Expr(self._probe('step')), node.body[0]))
+        return node
+
+    visit_For = visit_While = _loop
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        return self._counted('compare', node)
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        if isinstance(node.func, ast.Attribute) and node.func.attr in ADD_METHODS | STR_METHODS:
+            return self._counted('allocate', node)
+        return node
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Mult) and isinstance(node.left, ast.List):
+            return self._probe('allocated', node)
+        return node
+
+
+def instrument(func, probe):
+    """Копия func с вызовами probe; глобальные имена — из модуля func."""
+    lines, first_line = inspect.getsourcelines(func)
+    tree = ast.parse(textwrap.dedent(''.join(lines)))
+    ast.increment_lineno(tree, first_line - 1)
+    tree = ast.fix_missing_locations(_Instrument().visit(tree))
+    namespace = dict(func.__globals__)
+    namespace[PROBE_NAME] = probe
+    exec(compile(tree, inspect.getsourcefile(func), 'exec'), namespace)
+    # Рекурсивные вызовы по имени попадут в инструментированную копию
+    return namespace[func.__name__]
+
+
+@contextmanager
+def trace(*names, callback=None):
+    """
+    Включить трассировку для указанных функций (по умолчанию — для всех
+    из solutions.SOLUTIONS). callback(name, event, n) вызывается на каждое событие.
+    """
+    tracer = Tracer(callback)
+    originals = {}
+    try:
+        for name in names or SOLUTIONS:
+            module = load_module(SOLUTIONS[name])
+            original = getattr(module, name)
+            setattr(module, name, instrument(original, tracer.probe(name)))
+            originals[name] = (module, original)
+        yield tracer
+    finally:
+        for name, (module, original) in originals.items():
+            setattr(module, name, original)
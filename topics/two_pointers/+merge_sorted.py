@@ -24,8 +24,6 @@ def merge_arrays(arr1, arr2):
         else:
             res.append(arr2[j])
             j += 1
-        print(res)
-
 
     # Добавляем оставшиеся элементы
     while i < len(arr1):
@@ -39,4 +37,5 @@ def merge_arrays(arr1, arr2):
     return res
 
 
-print(merge_arrays([1, 3, 5], [2, 4, 6]))
+if __name__ == "__main__":
+    print(merge_arrays([1, 3, 5], [2, 4, 6]))
@@ -26,4 +26,6 @@ def zeros_switch(arr):
 
     return arr
 
-print(zeros_switch([0, 1, 0, 3, 12]))
+
+if __name__ == "__main__":
+    print(zeros_switch([0, 1, 0, 3, 12]))
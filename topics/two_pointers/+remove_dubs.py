@@ -27,4 +27,5 @@ def remove_dubs(arr):
     return write_ix
 
 
-print(remove_dubs([1, 1, 2, 2, 3, 4, 4, 5]))
+if __name__ == "__main__":
+    print(remove_dubs([1, 1, 2, 2, 3, 4, 4, 5]))
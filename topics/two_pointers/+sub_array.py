@@ -19,7 +19,8 @@ ID: 38
 def sub_string_check(s_string, t_string):
     i = 0
     j = 0
-    while j < len(t_string):
+    # Как только s полностью найдена, дальше идти не нужно (и s_string[i] вышел бы за границу)
+    while i < len(s_string) and j < len(t_string):
         if t_string[j] == s_string[i]:
             i += 1
         j += 1
@@ -30,5 +31,6 @@ def sub_string_check(s_string, t_string):
     return False
 
 
-print(sub_string_check("ace", "abcde"))
-print(sub_string_check("axc", "ahbgdc"))
+if __name__ == "__main__":
+    print(sub_string_check("ace", "abcde"))
+    print(sub_string_check("axc", "ahbgdc"))
@@ -37,4 +37,5 @@ def sort_squares(arr):
     return result
 
 
-print(sort_squares([-4, -1, 0, 3, 10]))
+if __name__ == "__main__":
+    print(sort_squares([-4, -1, 0, 3, 10]))
@@ -0,0 +1,130 @@
+"""
+Векторизованные версии решений из topics/arrays и topics/two_pointers.
+
+Функции принимают list, numpy.ndarray или array.array и сами выбирают
+реализацию: для list вызывается исходное решение, для массивов — NumPy.
+array.array оборачивается в ndarray без копирования (np.frombuffer),
+поэтому функции, меняющие вход на месте, меняют и исходный буфер.
+
+NumPy — необязательная зависимость: без него array.array обрабатывается
+исходными решениями (они работают с любой индексируемой последовательностью).
+
+Использование:
+    import numpy as np
+    from vectorized import zeros_switch
+    zeros_switch(np.array([0, 1, 0, 3, 12]))  # array([ 1,  3, 12,  0,  0])
+"""
+
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from solutions import get
+
+
+def as_ndarray(arr):
+    """ndarray-представление входа или None, если нужна исходная реализация."""
+    if np is None:
+        return None
+    if isinstance(arr, np.ndarray):
+        return arr
+    if isinstance(arr, array):
+        # Буфер array.array доступен на запись — вид без копии
+        return np.frombuffer(arr, dtype=arr.typecode)
+    return None
+
+
+def check_dubs(arr):
+    """Есть ли дубликаты. NumPy: сортировка копии + сравнение соседей, O(n log n)."""
+    a = as_ndarray(arr)
+    if a is None:
+        return get('check_dubs')(arr)
+    if a.size < 2:
+        return False
+    s = np.sort(a)
+    return bool((s[1:] == s[:-1]).any())
+
+
+def find_ixs(arr, el):
+    """Индексы всех вхождений el. Для массивов возвращает ndarray индексов."""
+    a = as_ndarray(arr)
+    if a is None:
+        return get('find_ixs')(arr, el)
+    return np.flatnonzero(a == el)
+
+
+# Наибольшее целое, квадрат которого помещается в int64
+INT64_SQRT_MAX = 3037000499
+
+
+def _squares(a):
+    """
+    Квадраты элементов отсортированного массива без переполнения.
+    Целые считаются в int64, а если |x| > INT64_SQRT_MAX — в Python int
+    (dtype=object, медленно, но точно); float16/float32 — в float64.
+    """
+    if a.dtype.kind in 'iu':
+        if a.size and max(abs(int(a[0])), abs(int(a[-1]))) > INT64_SQRT_MAX:
+            a = a.astype(object)
+        else:
+            a = a.astype(np.int64, copy=False)
+    elif a.dtype.kind == 'f':
+        a = a.astype(np.result_type(a.dtype, np.float64), copy=False)
+    return a * a
+
+
+def sort_squares(arr):
+    """
+    Квадраты отсортированного массива в порядке возрастания.
+    Отрицательная часть даёт убывающую серию квадратов, неотрицательная —
+    возрастающую; после разворота первой остаётся слить две серии.
+    Для массивов результат — ndarray int64 (или object при очень больших
+    значениях) либо float64, независимо от dtype входа.
+    """
+    a = as_ndarray(arr)
+    if a is None:
+        return get('sort_squares')(arr)
+    split = np.searchsorted(a, 0)
+    squares = _squares(a)
+    # Устойчивая сортировка (timsort/radix) сливает две готовые серии за O(n)
+    merged = np.concatenate((squares[:split][::-1], squares[split:]))
+    return np.sort(merged, kind='stable')
+
+
+def zeros_switch(arr):
+    """Переместить нули в конец на месте, сохранив порядок остальных."""
+    a = as_ndarray(arr)
+    if a is None:
+        return get('zeros_switch')(arr)
+    non_zero = a[a != 0]
+    a[:non_zero.size] = non_zero
+    a[non_zero.size:] = 0
+    return arr
+
+
+def remove_dubs(arr):
+    """Удалить дубликаты из отсортированного массива на месте, вернуть новую длину."""
+    a = as_ndarray(arr)
+    if a is None:
+        return get('remove_dubs')(arr)
+    if a.size == 0:
+        return 0
+    keep = np.empty(a.size, dtype=bool)
+    keep[0] = True
+    np.not_equal(a[1:], a[:-1], out=keep[1:])
+    unique = a[keep]
+    a[:unique.size] = unique
+    return int(unique.size)
+
+
+def merge_arrays(arr1, arr2):
+    """Слить два отсортированных массива. Для массивов возвращает ndarray."""
+    a1 = as_ndarray(arr1)
+    a2 = as_ndarray(arr2)
+    if a1 is None or a2 is None:
+        return get('merge_arrays')(arr1, arr2)
+    # Две отсортированные серии подряд — устойчивая сортировка сливает их за O(n)
+    return np.sort(np.concatenate((a1, a2)), kind='stable')
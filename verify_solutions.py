@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Проверка решений из tasks.json на примерах из условий.
+
+Из описания задачи вытаскиваются пары «Вход: ... / Выход: ...», решение
+выполняется в отдельном процессе (одновременно — по процессу на ядро) с
+ограничением по времени и памяти, результат сравнивается с ожидаемым.
+
+Время ограничивает родитель: процесс, не уложившийся в лимит, убивается.
+Сигнал внутри процесса не прервал бы решение, застрявшее в C-коде
+(sum(range(10**11))). Решение, уронившее процесс (segfault, OOM, os._exit),
+получает статус crashed, остальные задачи проверяются дальше.
+
+Это не песочница: скрипт рассчитан на доверенные решения из собственного
+банка и защищает только от зависаний, перерасхода памяти и падений.
+Урезанные builtins и список разрешённых модулей ловят случайные open()
+и import os в решении, но не злой умысел — через collections._sys или
+random._os до os всё равно можно добраться. Чужой код так не проверять.
+
+Использование:
+    python verify_solutions.py                   # Проверить все задачи
+    python verify_solutions.py --ids 1 11 35     # Только указанные задачи
+    python verify_solutions.py --timeout 1 --memory-mb 256
+    python verify_solutions.py --json report.json
+"""
+
+import argparse
+import ast
+import builtins
+import json
+import math
+import multiprocessing
+import os
+import re
+import resource
+import sys
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+from task_selector import load_tasks
+
+
+EXAMPLE_RE = re.compile(r'Вход:(.*?)\n\s*Выход:(.*?)(?:\n|$)')
+# «k = 4», «сумма = 9», «s = "ace"» — имена аргументов перед значением
+ARG_NAME_RE = re.compile(r'(^|,)\s*\w+\s*=\s*')
+# Пояснение после ответа: «39 (сумма [4, 2, 10, 23])»
+COMMENT_RE = re.compile(r'\s+\(.*$')
+
+# Модули, которые разрешено импортировать решениям (от случайностей, не от атак)
+ALLOWED_MODULES = {
+    'collections', 'heapq', 'bisect', 'math', 'itertools', 'functools',
+    'typing', 'string', 'operator', 'random', 're',
+}
+
+STATUS_ICONS = {
+    'pass': '✅',
+    'fail': '❌',
+    'error': '💥',
+    'timeout': '⏱',
+    'crashed': '☠',
+    'skipped': '⏭',
+}
+
+
+def parse_literal(text):
+    """Разобрать Python-литерал. Возвращает (ok, значение)."""
+    try:
+        return True, ast.literal_eval(text.strip())
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return False, None
+
+
+def parse_input(text):
+    """
+    «[1, 2], элемент = 2» -> ([1, 2], 2), «граф [[1], [0]]» -> ([[1], [0]],).
+    None, если вход не литерал: деревья задаются словами, а решения ждут TreeNode.
+    """
+    if 'дерево' in text:
+        return None
+    cleaned = ARG_NAME_RE.sub(r'\1 ', text.strip())
+    cleaned = re.sub(r'^[^\W\d_]+\s+(?=[\[\(\{"\'\-\d])', '', cleaned)
+    ok, value = parse_literal(f'({cleaned},)')
+    return value if ok else None
+
+
+def parse_output(text):
+    """Список допустимых ответов: «[2, 7] или индексы [0, 1]» -> [[2, 7], [0, 1]]."""
+    options = []
+    for option in text.split(' или '):
+        option = COMMENT_RE.sub('', option.strip())
+        # Отбрасываем слова перед значением: «индексы [0, 1]»
+        option = re.sub(r'^[^\W\d_]+\s+(?=[\[\(\{"\'\-\d])', '', option)
+        ok, value = parse_literal(option)
+        if ok:
+            options.append(value)
+    return options
+
+
+def extract_examples(description):
+    """Примеры из условия: [(args, [варианты ответа]), ...], только разборчивые."""
+    examples = []
+    for raw_in, raw_out in EXAMPLE_RE.findall(description):
+        args = parse_input(raw_in)
+        expected = parse_output(raw_out)
+        if args is not None and expected:
+            examples.append((args, expected))
+    return examples
+
+
+def entry_point(solution, arity):
+    """Имя функции-решения: первая функция модуля с подходящим числом аргументов."""
+    functions = [node for node in ast.parse(solution).body if isinstance(node, ast.FunctionDef)]
+    for node in functions:
+        if len(node.args.args) == arity:
+            return node.name
+    return functions[0].name if functions else None
+
+
+def results_equal(actual, expected):
+    if isinstance(expected, float) or isinstance(actual, float):
+        try:
+            return math.isclose(actual, expected, rel_tol=1e-9, abs_tol=1e-9)
+        except TypeError:
+            return False
+    if isinstance(actual, tuple) and isinstance(expected, list):
+        actual = list(actual)
+    if isinstance(actual, list) and isinstance(expected, list):
+        return len(actual) == len(expected) and all(
+            results_equal(a, e) for a, e in zip(actual, expected)
+        )
+    return actual == expected
+
+
+# ---------- Воркер ----------
+
+def _limited_import(name, *args, **kwargs):
+    if name.split('.')[0] not in ALLOWED_MODULES:
+        raise ImportError(f"импорт модуля {name!r} запрещён")
+    return builtins.__import__(name, *args, **kwargs)
+
+
+def _solution_builtins():
+    safe = dict(vars(builtins))
+    for name in ('open', 'exec', 'eval', 'compile', 'input', 'breakpoint', 'exit', 'quit'):
+        safe.pop(name, None)
+    safe['__import__'] = _limited_import
+    safe['print'] = lambda *args, **kwargs: None
+    return safe
+
+
+def init_worker(memory_mb):
+    """Инициализация процесса задачи: лимит памяти."""
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def run_task(task_id, solution, examples):
+    """Выполнить решение на всех примерах. Возвращает словарь с отчётом по задаче."""
+    start = time.perf_counter()
+    report = {'id': task_id, 'status': 'pass', 'passed': 0, 'total': len(examples), 'error': None}
+
+    if not examples:
+        report['status'] = 'skipped'
+        report['error'] = 'нет разборчивых примеров'
+        report['time'] = 0.0
+        return report
+
+    try:
+        func_name = entry_point(solution, len(examples[0][0]))
+        namespace = {'__builtins__': _solution_builtins(), '__name__': 'solution'}
+        exec(compile(solution, f'<task {task_id}>', 'exec'), namespace)
+        func = namespace[func_name]
+
+        for args, expected in examples:
+            # Решения могут менять вход на месте — даём копию
+            actual = func(*ast.literal_eval(repr(args)))
+            if any(results_equal(actual, option) for option in expected):
+                report['passed'] += 1
+            else:
+                report['status'] = 'fail'
+                report['error'] = f"{args!r}: ожидалось {expected[0]!r}, получено {actual!r}"
+    except MemoryError:
+        report['status'] = 'error'
+        report['error'] = 'превышен лимит памяти'
+    except Exception as e:
+        report['status'] = 'error'
+        report['error'] = f"{type(e).__name__}: {e}"
+
+    report['time'] = time.perf_counter() - start
+    return report
+
+
+def _task_process(connection, memory_mb, task_id, solution, examples):
+    """Точка входа процесса задачи: отчёт уходит родителю через pipe."""
+    init_worker(memory_mb)
+    connection.send(run_task(task_id, solution, examples))
+    connection.close()
+
+
+def _failed_report(task_id, total, status, error, elapsed):
+    return {'id': task_id, 'status': status, 'passed': 0, 'total': total, 'error': error, 'time': elapsed}
+
+
+# ---------- CLI ----------
+
+def verify(tasks, workers=None, timeout=2.0, memory_mb=512):
+    """
+    Проверить задачи, не больше workers процессов одновременно.
+    Возвращает отчёты в порядке ID.
+    """
+    workers = workers or os.cpu_count() or 1
+    # fork: процесс на задачу стартует за миллисекунды, без повторного импорта
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    pending = deque(tasks)
+    running = {}  # pipe -> (процесс, id, число примеров, начало)
+    reports = []
+
+    while pending or running:
+        while pending and len(running) < workers:
+            task = pending.popleft()
+            examples = extract_examples(task['description'])
+            if not examples:
+                reports.append(run_task(task['id'], task['solution'], examples))
+                continue
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_task_process, daemon=True,
+                args=(sender, memory_mb, task['id'], task['solution'], examples),
+            )
+            process.start()
+            sender.close()
+            running[receiver] = (process, task['id'], len(examples), time.monotonic())
+        if not running:
+            continue
+
+        first_deadline = min(started for *_, started in running.values()) + timeout
+        for receiver in wait(list(running), max(first_deadline - time.monotonic(), 0)):
+            process, task_id, total, started = running.pop(receiver)
+            try:
+                reports.append(receiver.recv())
+            except EOFError:
+                # Процесс умер, не прислав отчёт
+                process.join()
+                reports.append(_failed_report(task_id, total, 'crashed',
+                                              f"процесс завершился с кодом {process.exitcode}",
+                                              time.monotonic() - started))
+            receiver.close()
+            process.join()
+
+        now = time.monotonic()
+        for receiver, (process, task_id, total, started) in list(running.items()):
+            if now - started >= timeout:
+                process.kill()
+                process.join()
+                receiver.close()
+                del running[receiver]
+                reports.append(_failed_report(task_id, total, 'timeout', f"превышен лимит {timeout}s",
+                                              now - started))
+    return sorted(reports, key=lambda x: x['id'])
+
+
+def print_report(reports, elapsed):
+    print("=" * 80)
+    print("ПРОВЕРКА РЕШЕНИЙ")
+    print("=" * 80)
+    for report in reports:
+        icon = STATUS_ICONS[report['status']]
+        print(f"{icon} [{report['id']:3d}] {report['status']:<8} "
+              f"{report['passed']}/{report['total']}  {report['time'] * 1000:7.1f} ms")
+        if report['error'] and report['status'] != 'pass':
+            print(f"      {report['error']}")
+
+    counts = {}
+    for report in reports:
+        counts[report['status']] = counts.get(report['status'], 0) + 1
+    print("=" * 80)
+    print(f"Всего задач: {len(reports)} | " +
+          " | ".join(f"{status}: {count}" for status, count in sorted(counts.items())))
+    print(f"Время: {elapsed:.2f}s")
+    print("=" * 80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Проверка решений из tasks.json на примерах')
+    parser.add_argument('--file', default='tasks.json', help='Путь к файлу с задачами')
+    parser.add_argument('--ids', type=int, nargs='+', metavar='ID', help='Проверить только эти задачи')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Число процессов')
+    parser.add_argument('--timeout', type=float, default=2.0, help='Лимит времени на задачу, с')
+    parser.add_argument('--memory-mb', type=int, default=512, help='Лимит памяти на процесс, МБ (0 — без лимита)')
+    parser.add_argument('--json', metavar='PATH', help='Сохранить отчёт в JSON')
+    args = parser.parse_args()
+
+    tasks = load_tasks(args.file)
+    if args.ids:
+        wanted = set(args.ids)
+        tasks = [task for task in tasks if task['id'] in wanted]
+
+    start = time.perf_counter()
+    reports = verify(tasks, args.workers, args.timeout, args.memory_mb)
+    elapsed = time.perf_counter() - start
+
+    print_report(reports, elapsed)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'elapsed': elapsed, 'tasks': reports}, f, ensure_ascii=False, indent=2)
+
+    if any(report['status'] in ('fail', 'error', 'timeout', 'crashed') for report in reports):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()